@@ -0,0 +1,90 @@
+"""add listings snapshot tables
+
+Revision ID: 4f7a2c9e1b03
+Revises: 1d28bffd8ff7
+Create Date: 2026-10-19 10:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f7a2c9e1b03'
+down_revision: Union[str, Sequence[str], None] = '1d28bffd8ff7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('listings',
+    sa.Column('zpid', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('street_address', sa.String(), nullable=True),
+    sa.Column('city', sa.String(), nullable=True),
+    sa.Column('state', sa.String(), nullable=True),
+    sa.Column('zip_code', sa.String(), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.Column('price_per_sqft', sa.Float(), nullable=True),
+    sa.Column('price_change', sa.Float(), nullable=True),
+    sa.Column('price_changed_date', sa.DateTime(), nullable=True),
+    sa.Column('listing_status', sa.String(), nullable=True),
+    sa.Column('days_on_zillow', sa.Integer(), nullable=True),
+    sa.Column('listing_date', sa.DateTime(), nullable=True),
+    sa.Column('property_type', sa.String(), nullable=True),
+    sa.Column('beds', sa.Integer(), nullable=True),
+    sa.Column('baths', sa.Float(), nullable=True),
+    sa.Column('sqft', sa.Float(), nullable=True),
+    sa.Column('lot_size', sa.Float(), nullable=True),
+    sa.Column('lot_size_unit', sa.String(), nullable=True),
+    sa.Column('year_built', sa.Integer(), nullable=True),
+    sa.Column('is_new_construction', sa.Boolean(), nullable=True),
+    sa.Column('zestimate', sa.Float(), nullable=True),
+    sa.Column('rent_zestimate', sa.Float(), nullable=True),
+    sa.Column('tax_assessed_value', sa.Float(), nullable=True),
+    sa.Column('tax_assessment_year', sa.String(), nullable=True),
+    sa.Column('has_vr_model', sa.Boolean(), nullable=True),
+    sa.Column('has_videos', sa.Boolean(), nullable=True),
+    sa.Column('has_floor_plan', sa.Boolean(), nullable=True),
+    sa.Column('is_showcase_listing', sa.Boolean(), nullable=True),
+    sa.Column('open_house_start', sa.DateTime(), nullable=True),
+    sa.Column('open_house_end', sa.DateTime(), nullable=True),
+    sa.Column('broker_name', sa.String(), nullable=True),
+    sa.Column('photo_url', sa.String(), nullable=True),
+    sa.Column('fetched_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('zpid')
+    )
+    op.create_index('ix_listings_zip_price', 'listings', ['zip_code', 'price'], unique=False)
+    op.create_index('ix_listings_beds_baths', 'listings', ['beds', 'baths'], unique=False)
+    op.create_index('ix_listings_status', 'listings', ['listing_status'], unique=False)
+    op.create_table('listing_areas',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('location', sa.String(), nullable=False),
+    sa.Column('listing_status', sa.String(), nullable=False),
+    sa.Column('listing_count', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_table('listing_area_members',
+    sa.Column('area_key', sa.String(), nullable=False),
+    sa.Column('zpid', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['area_key'], ['listing_areas.key'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['zpid'], ['listings.zpid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('area_key', 'zpid')
+    )
+    op.create_index(op.f('ix_listing_area_members_zpid'), 'listing_area_members', ['zpid'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_listing_area_members_zpid'), table_name='listing_area_members')
+    op.drop_table('listing_area_members')
+    op.drop_table('listing_areas')
+    op.drop_index('ix_listings_status', table_name='listings')
+    op.drop_index('ix_listings_beds_baths', table_name='listings')
+    op.drop_index('ix_listings_zip_price', table_name='listings')
+    op.drop_table('listings')
@@ -0,0 +1,36 @@
+"""add explain cache table
+
+Revision ID: b81e5d0c7a42
+Revises: 4f7a2c9e1b03
+Create Date: 2026-10-19 14:03:27.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81e5d0c7a42'
+down_revision: Union[str, Sequence[str], None] = '4f7a2c9e1b03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('explain_cache',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('template_version', sa.String(), nullable=False),
+    sa.Column('explanation', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_explain_cache_template_version'), 'explain_cache', ['template_version'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_explain_cache_template_version'), table_name='explain_cache')
+    op.drop_table('explain_cache')
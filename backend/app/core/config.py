@@ -9,6 +9,18 @@ CLERK_SECRET_KEY = os.getenv("CLERK_SECRET_KEY", "sk-...")
 CLERK_WEBHOOK_SECRET = os.getenv("CLERK_WEBHOOK_SECRET")
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# In-process entries kept in front of the explain_cache table
+EXPLAIN_CACHE_MAX_ENTRIES = int(os.getenv("EXPLAIN_CACHE_MAX_ENTRIES", "2048"))
+
+# LLM latency bounds (seconds): past the deadline a template fallback is
+# served; after HEDGE_AFTER a backup request is started (0 disables hedging)
+EXPLAIN_DEADLINE = float(os.getenv("EXPLAIN_DEADLINE", "8"))
+EXPLAIN_HEDGE_AFTER = float(os.getenv("EXPLAIN_HEDGE_AFTER", "3"))
+CHAT_DEADLINE = float(os.getenv("CHAT_DEADLINE", "12"))
+CHAT_HEDGE_AFTER = float(os.getenv("CHAT_HEDGE_AFTER", "4"))
+
+# Shared secret for admin-only endpoints (sent as X-Admin-Token); unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
 
 ENV = os.getenv("ENV", "production")
 DEBUG = os.getenv("DEBUG", "true").lower() in ("true", "1", "yes")
@@ -18,8 +30,52 @@ ZHVI_CSV_PATH = os.getenv(
     os.path.join(os.path.dirname(__file__), "..", "..", "data", "data.csv"),
 )
 
+# Binary price store maintained by model/ingest_zhvi.py; used instead of the
+# CSV when present
+PRICE_STORE_DIR = os.getenv(
+    "PRICE_STORE_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "..", "output", "price_store"),
+)
+
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY", "")
 
+# Zillow (RapidAPI) proxy; point ZILLOW_BASE_URL at a local stub for testing
+ZILLOW_BASE_URL = os.getenv("ZILLOW_BASE_URL", "https://private-zillow.p.rapidapi.com")
+ZILLOW_CONNECT_TIMEOUT = float(os.getenv("ZILLOW_CONNECT_TIMEOUT", "3"))
+ZILLOW_READ_TIMEOUT = float(os.getenv("ZILLOW_READ_TIMEOUT", "10"))
+ZILLOW_MAX_RETRIES = int(os.getenv("ZILLOW_MAX_RETRIES", "3"))
+ZILLOW_BACKOFF_BASE = float(os.getenv("ZILLOW_BACKOFF_BASE", "0.5"))
+ZILLOW_MAX_CONNECTIONS = int(os.getenv("ZILLOW_MAX_CONNECTIONS", "20"))
+ZILLOW_HTTP2 = os.getenv("ZILLOW_HTTP2", "true").lower() in ("true", "1", "yes")
+
+# Search result cache: fresh for TTL seconds, then served stale (and refreshed
+# in the background) for STALE_TTL more. Backend is "memory" or "redis".
+ZILLOW_CACHE_BACKEND = os.getenv("ZILLOW_CACHE_BACKEND", "memory")
+ZILLOW_CACHE_TTL = float(os.getenv("ZILLOW_CACHE_TTL", "300"))
+ZILLOW_CACHE_STALE_TTL = float(os.getenv("ZILLOW_CACHE_STALE_TTL", "3600"))
+ZILLOW_CACHE_MAX_ENTRIES = int(os.getenv("ZILLOW_CACHE_MAX_ENTRIES", "1024"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Pages fetched at once by the multi-page /zillow/search/all endpoint
+ZILLOW_PAGE_CONCURRENCY = int(os.getenv("ZILLOW_PAGE_CONCURRENCY", "5"))
+
+# Listings snapshot: areas older than this (seconds) are refreshed in the
+# background; a refresh fetches this many search pages
+LISTINGS_STALE_AFTER = float(os.getenv("LISTINGS_STALE_AFTER", "21600"))
+LISTINGS_REFRESH_PAGES = max(1, int(os.getenv("LISTINGS_REFRESH_PAGES", "5")))
+
 MC_NUM_SIMULATIONS = int(os.getenv("MC_NUM_SIMULATIONS", "1000"))
 
 HF_TOKEN = os.getenv("HF_TOKEN", "")
+# OpenAI-compatible inference server to use instead of the HF router, e.g. a
+# local TGI/vLLM or a fake server in tests
+HF_BASE_URL = os.getenv("HF_BASE_URL", "")
+
+# Server-side chat sessions: recent history kept in the prompt (approximate
+# tokens), idle expiry (seconds), and store ("memory" or "redis")
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1024"))
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", "86400"))
+CHAT_SESSION_MAX = int(os.getenv("CHAT_SESSION_MAX", "10000"))
+CHAT_SESSION_BACKEND = os.getenv("CHAT_SESSION_BACKEND", "memory")
+# Upper bound (seconds) on how long a cached liked-properties prompt is reused
+LIKED_CONTEXT_TTL = float(os.getenv("LIKED_CONTEXT_TTL", "600"))
@@ -5,9 +5,15 @@ Base = declarative_base()
 from .user import User
 from .analysis import Analysis
 from .properties import Properties
+from .listing import Listing, ListingArea, ListingAreaMember
+from .explain_cache import ExplainCacheEntry
 
 __all__ = [
     "User",
     "Analysis",
-    "Properties"
+    "Properties",
+    "Listing",
+    "ListingArea",
+    "ListingAreaMember",
+    "ExplainCacheEntry",
 ]
@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import DateTime, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.models import Base
+
+
+class ExplainCacheEntry(Base):
+    """A generated /explain text, keyed on its rendered prompt."""
+
+    __tablename__ = "explain_cache"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    template_version: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    explanation: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
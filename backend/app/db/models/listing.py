@@ -0,0 +1,98 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.models import Base
+
+
+class Listing(Base):
+    """Latest snapshot of a Zillow listing, upserted by zpid."""
+
+    __tablename__ = "listings"
+    __table_args__ = (
+        Index("ix_listings_zip_price", "zip_code", "price"),
+        Index("ix_listings_beds_baths", "beds", "baths"),
+        Index("ix_listings_status", "listing_status"),
+    )
+
+    zpid: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+
+    # Address
+    street_address: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    city: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    state: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    zip_code: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    # Coordinates
+    latitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    longitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    # Listing info
+    price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    price_per_sqft: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    price_change: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    price_changed_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    listing_status: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    days_on_zillow: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    listing_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # Property details
+    property_type: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    beds: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    baths: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    sqft: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    lot_size: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    lot_size_unit: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    year_built: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    is_new_construction: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+
+    # Estimates
+    zestimate: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    rent_zestimate: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    # Tax
+    tax_assessed_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    tax_assessment_year: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    # Media flags
+    has_vr_model: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    has_videos: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    has_floor_plan: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    is_showcase_listing: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+
+    # Open house
+    open_house_start: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    open_house_end: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # Broker
+    broker_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    # Thumbnail
+    photo_url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
+
+
+class ListingArea(Base):
+    """A searched (location, listing_status) and when its listings were last fetched."""
+
+    __tablename__ = "listing_areas"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    location: Mapped[str] = mapped_column(String, nullable=False)
+    listing_status: Mapped[str] = mapped_column(String, nullable=False)
+    listing_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
+
+
+class ListingAreaMember(Base):
+    """Which listings the last refresh of an area returned."""
+
+    __tablename__ = "listing_area_members"
+
+    area_key: Mapped[str] = mapped_column(
+        String, ForeignKey("listing_areas.key", ondelete="CASCADE"), primary_key=True
+    )
+    zpid: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("listings.zpid", ondelete="CASCADE"), primary_key=True, index=True
+    )
@@ -1,7 +1,9 @@
+import hmac
+
 from clerk_backend_api import AuthenticateRequestOptions, Clerk
-from fastapi import HTTPException, Request, status
+from fastapi import Header, HTTPException, Request, status
 
-from app.core.config import CLERK_SECRET_KEY
+from app.core.config import ADMIN_TOKEN, CLERK_SECRET_KEY
 
 clerk = Clerk(bearer_auth=CLERK_SECRET_KEY)
 
@@ -28,3 +30,16 @@ def require_clerk_auth(request: Request) -> str:
         )
 
     return auth_state.payload["sub"]
+
+
+def require_admin_token(x_admin_token: str | None = Header(default=None)) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={"message": "Admin endpoints are disabled"},
+        )
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"message": "Unauthorized", "reason": "Invalid admin token"},
+        )
@@ -1,11 +1,20 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import user, analyze, chat, properties, appreciation, zillow
+from app.routers import user, analyze, chat, properties, appreciation, zillow, zhvi, listings
+from app.services.zillow_client import close_client
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="Realease", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_client()
+
+
+app = FastAPI(title="Realease", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +33,8 @@ app.include_router(chat.router)
 app.include_router(properties.router)
 app.include_router(appreciation.router)
 app.include_router(zillow.router)
+app.include_router(zhvi.router)
+app.include_router(listings.router)
 
 
 @app.get("/health")
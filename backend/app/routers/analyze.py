@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from app.schemas.analyze import (
     AnalyzeRequest,
     AnalyzeResponse,
@@ -6,7 +6,8 @@ from app.schemas.analyze import (
     ExplainResponse,
 )
 from app.services.monte_carlo import run_simulation
-from app.services.llm_explain import generate_explanation
+from app.services.llm_explain import explain_stats, generate_explanation, purge_cache
+from app.deps.auth import require_admin_token
 
 router = APIRouter(tags=["analysis"])
 
@@ -35,6 +36,7 @@ def analyze(req: AnalyzeRequest):
         fair_value_low=result.fair_value_low,
         fair_value_high=result.fair_value_high,
         fragility_index=result.fragility_index,
+        data_level=result.data_level,
     )
 
 
@@ -58,3 +60,15 @@ def explain(req: ExplainRequest):
         raise HTTPException(status_code=502, detail=f"LLM error: {e}")
 
     return ExplainResponse(explanation=text)
+
+
+@router.get("/explain/stats")
+def explain_metrics():
+    """Explanation cache hit rate and upstream LLM calls made vs. collapsed."""
+    return explain_stats()
+
+
+@router.delete("/explain/cache", dependencies=[Depends(require_admin_token)])
+def purge_explain_cache(stale_only: bool = False):
+    """Drop cached explanations (only older template versions with stale_only)."""
+    return {"removed": purge_cache(stale_only)}
@@ -1,6 +1,11 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from app.services.appreciation import get_appreciation, get_appreciation_bulk
+from app.services.appreciation import (
+    get_appreciation,
+    get_appreciation_bulk,
+    get_appreciation_interval,
+    get_explanation,
+)
 
 router = APIRouter(tags=["appreciation"])
 
@@ -8,6 +13,8 @@ router = APIRouter(tags=["appreciation"])
 class AppreciationOut(BaseModel):
     zip: str
     predicted_12m_appreciation: float | None
+    p10_12m_appreciation: float | None = None
+    p90_12m_appreciation: float | None = None
 
 
 class BulkAppreciationRequest(BaseModel):
@@ -18,12 +25,35 @@ class BulkAppreciationOut(BaseModel):
     results: dict[str, float | None]
 
 
+class FeatureContribution(BaseModel):
+    feature: str
+    label: str
+    value: float
+    shap: float
+
+
+class AppreciationExplanationOut(BaseModel):
+    zip: str
+    as_of: str
+    base_value: float
+    predicted_12m_appreciation: float
+    contributions: list[FeatureContribution]
+
+
 @router.get("/appreciation/{zip_code}", response_model=AppreciationOut)
 def appreciation_single(zip_code: str):
     value = get_appreciation(zip_code)
     if value is None:
         raise HTTPException(status_code=404, detail=f"No prediction available for ZIP {zip_code}")
-    return AppreciationOut(zip=zip_code, predicted_12m_appreciation=round(value, 6))
+    interval = get_appreciation_interval(zip_code)
+    if interval is None:
+        return AppreciationOut(zip=zip_code, predicted_12m_appreciation=round(value, 6))
+    return AppreciationOut(
+        zip=zip_code,
+        predicted_12m_appreciation=round(value, 6),
+        p10_12m_appreciation=round(interval[0], 6),
+        p90_12m_appreciation=round(interval[1], 6),
+    )
 
 
 @router.post("/appreciation/bulk", response_model=BulkAppreciationOut)
@@ -32,3 +62,11 @@ def appreciation_bulk(req: BulkAppreciationRequest):
     return BulkAppreciationOut(
         results={z: round(v, 6) if v is not None else None for z, v in results.items()}
     )
+
+
+@router.get("/appreciation/{zip_code}/explain", response_model=AppreciationExplanationOut)
+def appreciation_explain(zip_code: str):
+    explanation = get_explanation(zip_code)
+    if explanation is None:
+        raise HTTPException(status_code=404, detail=f"No explanation available for ZIP {zip_code}")
+    return AppreciationExplanationOut(**explanation)
@@ -1,37 +1,29 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import Annotated, Callable, Iterator
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from starlette.background import BackgroundTask
 
-from app.schemas.chat import ChatRequest, ChatResponse
-from app.services.chatbot import chat
-from app.db.models.properties import Properties
+from app.schemas.chat import (
+    ChatRequest,
+    ChatResponse,
+    ChatSessionCreate,
+    ChatSessionOut,
+    ChatTurnRequest,
+    ChatTurnResponse,
+)
+from app.services import chat_sessions
+from app.services.chatbot import FallbackReply, chat, chat_hedger, chat_stream
+from app.services.liked_context import get_liked_prompt
 from app.deps.db import get_db
 
 router = APIRouter(tags=["chat"])
 
 
-def _format_property(p: Properties) -> str:
-    parts = []
-    if p.street_address:
-        parts.append(p.street_address)
-    if p.city or p.state or p.zip_code:
-        loc = ", ".join(x for x in (p.city, p.state, p.zip_code) if x)
-        if loc:
-            parts.append(loc)
-    if p.beds is not None or p.baths is not None or p.sqft is not None:
-        specs = []
-        if p.beds is not None:
-            specs.append(f"{p.beds}bd")
-        if p.baths is not None:
-            specs.append(f"{p.baths}ba")
-        if p.sqft is not None:
-            specs.append(f"{p.sqft:.0f} sqft")
-        if specs:
-            parts.append(" ".join(specs))
-    if p.price is not None:
-        parts.append(f"${p.price:,.0f}")
-    return " | ".join(parts) if parts else "Property"
+def _prefer_statement(req: ChatRequest) -> bool:
+    user_msg_count = sum(1 for m in req.messages if m.role == "user")
+    return req.prefer_statement or (user_msg_count == 3)
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -39,63 +31,161 @@ def chat_endpoint(
     req: ChatRequest,
     db: Annotated[Session, Depends(get_db)],
 ):
-    liked_properties: list[dict] = []
-    if req.user_id:
-        rows = (
-            db.query(Properties)
-            .filter(Properties.user_id == req.user_id, Properties.liked == True)
-            .order_by(desc(Properties.created_at))
-            .limit(5)
-            .all()
-        )
-        liked_properties = [
-            {
-                "address": _format_property(p),
-                "street_address": p.street_address,
-                "city": p.city,
-                "state": p.state,
-                "zip_code": p.zip_code,
-                "price": p.price,
-                "beds": p.beds,
-                "baths": p.baths,
-                "sqft": p.sqft,
-                "zpid": p.zpid,
-                "latitude": p.latitude,
-                "longitude": p.longitude,
-                "price_per_sqft": p.price_per_sqft,
-                "price_change": p.price_change,
-                "listing_status": p.listing_status,
-                "days_on_zillow": p.days_on_zillow,
-                "property_type": p.property_type,
-                "lot_size": p.lot_size,
-                "lot_size_unit": p.lot_size_unit,
-                "year_built": p.year_built,
-                "is_new_construction": p.is_new_construction,
-                "zestimate": p.zestimate,
-                "rent_zestimate": p.rent_zestimate,
-                "tax_assessed_value": p.tax_assessed_value,
-                "broker_name": p.broker_name,
-                "photo_url": p.photo_url,
-                "has_vr_model": p.has_vr_model,
-                "has_videos": p.has_videos,
-                "has_floor_plan": p.has_floor_plan,
-                "open_house_start": p.open_house_start.isoformat() if p.open_house_start else None,
-                "open_house_end": p.open_house_end.isoformat() if p.open_house_end else None,
-            }
-            for p in rows
-        ]
-
-    user_msg_count = sum(1 for m in req.messages if m.role == "user")
-    prefer_statement = req.prefer_statement or (user_msg_count == 3)
+    liked_prompt = get_liked_prompt(db, req.user_id)
 
     try:
         reply = chat(
             messages=[m.model_dump() for m in req.messages],
             analysis_context=req.analysis_context,
-            liked_properties=liked_properties,
-            prefer_statement=prefer_statement,
+            liked_prompt=liked_prompt,
+            prefer_statement=_prefer_statement(req),
         )
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Chat error: {e}")
 
     return ChatResponse(reply=reply)
+
+
+@router.get("/chat/stats")
+def chat_stats():
+    """Hedged-request and fallback rates for chat replies."""
+    return {"hedging": chat_hedger.stats.snapshot()}
+
+
+def _sse(data: dict, event: str | None = None) -> str:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat/stream")
+def chat_stream_endpoint(
+    req: ChatRequest,
+    db: Annotated[Session, Depends(get_db)],
+):
+    """
+    Streaming /chat as Server-Sent Events: one `data: {"delta": ...}` event
+    per generated chunk, then `event: done` with the full reply (or
+    `event: error` if generation fails part-way).
+    """
+    liked_prompt = get_liked_prompt(db, req.user_id)
+    deltas = chat_stream(
+        messages=[m.model_dump() for m in req.messages],
+        analysis_context=req.analysis_context,
+        liked_prompt=liked_prompt,
+        prefer_statement=_prefer_statement(req),
+    )
+
+    return _sse_response(deltas)
+
+
+def _sse_response(deltas: Iterator[str], on_done: Callable[[str], None] | None = None,
+                  background: BackgroundTask | None = None) -> StreamingResponse:
+    def events() -> Iterator[str]:
+        reply = []
+        try:
+            for delta in deltas:
+                reply.append(delta)
+                yield _sse({"delta": delta})
+        except Exception as e:
+            yield _sse({"detail": f"Chat error: {e}"}, event="error")
+            return
+        # A lone FallbackReply delta is passed on as is, so on_done can tell
+        text = reply[0] if len(reply) == 1 else "".join(reply)
+        if on_done is not None:
+            on_done(text)
+        yield _sse({"reply": text}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background,
+    )
+
+
+# --- server-side sessions ------------------------------------------------------
+
+
+@router.post("/chat/sessions", response_model=ChatSessionOut)
+def create_chat_session(req: ChatSessionCreate):
+    session = chat_sessions.new_session(req.user_id, req.analysis_context)
+    return ChatSessionOut(session_id=session["id"])
+
+
+def _load_session(session_id: str) -> dict:
+    session = chat_sessions.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Chat session not found or expired")
+    return session
+
+
+@router.get("/chat/sessions/{session_id}", response_model=ChatSessionOut)
+def get_chat_session(session_id: str):
+    session = _load_session(session_id)
+    return ChatSessionOut(
+        session_id=session["id"],
+        summary=session["summary"],
+        messages=[{"role": m["role"], "content": m["content"]} for m in session["messages"]],
+    )
+
+
+@router.delete("/chat/sessions/{session_id}", status_code=204)
+def delete_chat_session(session_id: str):
+    chat_sessions.delete_session(session_id)
+
+
+def _start_turn(session_id: str, req: ChatTurnRequest, db: Session) -> tuple[dict, dict]:
+    """Record the user's message; returns (session, kwargs for chat/chat_stream)."""
+    session = _load_session(session_id)
+    if req.analysis_context is not None:
+        session["analysis_context"] = req.analysis_context
+    chat_sessions.append_message(session, "user", req.message)
+    return session, dict(
+        messages=chat_sessions.window(session),
+        analysis_context=session["analysis_context"],
+        liked_prompt=get_liked_prompt(db, session["user_id"]),
+        prefer_statement=req.prefer_statement or session["user_turns"] == 3,
+        summary=session["summary"],
+    )
+
+
+def _finish_turn(session: dict, reply: str):
+    # A templated fallback isn't the model's answer; don't feed it back as one
+    if not isinstance(reply, FallbackReply):
+        chat_sessions.append_message(session, "assistant", reply)
+    chat_sessions.save_session(session)
+
+
+@router.post("/chat/sessions/{session_id}/messages", response_model=ChatTurnResponse)
+def chat_session_turn(
+    session_id: str,
+    req: ChatTurnRequest,
+    db: Annotated[Session, Depends(get_db)],
+    background: BackgroundTasks,
+):
+    """One turn of a server-side session: send only the new message."""
+    session, kwargs = _start_turn(session_id, req, db)
+    try:
+        reply = chat(**kwargs)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Chat error: {e}")
+
+    _finish_turn(session, reply)
+    if chat_sessions.needs_compaction(session):
+        background.add_task(chat_sessions.compact, session_id)
+    return ChatTurnResponse(session_id=session_id, reply=reply)
+
+
+@router.post("/chat/sessions/{session_id}/messages/stream")
+def chat_session_turn_stream(
+    session_id: str,
+    req: ChatTurnRequest,
+    db: Annotated[Session, Depends(get_db)],
+):
+    """Streaming session turn, with the same SSE events as /chat/stream."""
+    session, kwargs = _start_turn(session_id, req, db)
+    return _sse_response(
+        chat_stream(**kwargs),
+        on_done=lambda reply: _finish_turn(session, reply),
+        background=BackgroundTask(chat_sessions.compact, session_id),
+    )
@@ -0,0 +1,75 @@
+from typing import Annotated, Literal, Optional
+
+import anyio
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.deps.db import get_db
+from app.schemas.listings import ListingOut, ListingPage
+from app.services.listings import (
+    SORT_FIELDS,
+    get_area,
+    is_stale,
+    query_listings,
+    refresh_area,
+    refresh_area_background,
+)
+from app.services.zillow_client import ZillowError
+
+router = APIRouter(tags=["listings"])
+
+SortField = Literal[tuple(SORT_FIELDS)]
+
+
+@router.get("/listings", response_model=ListingPage)
+def get_listings(
+    db: Annotated[Session, Depends(get_db)],
+    background: BackgroundTasks,
+    location: str = Query("Irvine, CA", description="City, state or ZIP"),
+    listing_status: str = Query("For_Sale"),
+    zip_code: Optional[str] = Query(None, pattern=r"^\d{5}$"),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_beds: Optional[int] = Query(None, ge=0),
+    min_baths: Optional[float] = Query(None, ge=0),
+    min_sqft: Optional[float] = Query(None, ge=0),
+    max_sqft: Optional[float] = Query(None, ge=0),
+    property_type: Optional[str] = None,
+    sort: SortField = "price",
+    order: Literal["asc", "desc"] = "asc",
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Filter, sort and paginate the stored listings for a searched area.
+    An area never searched before is fetched from Zillow first; a stale one
+    is served as-is and refreshed in the background.
+    """
+    area = get_area(db, location, listing_status)
+    stale = False
+    if area is None:
+        try:
+            anyio.from_thread.run(refresh_area, location, listing_status)
+        except ZillowError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        db.expire_all()
+        area = get_area(db, location, listing_status)
+    elif is_stale(area):
+        stale = True
+        background.add_task(refresh_area_background, location, listing_status)
+
+    total, rows = query_listings(
+        db, location, listing_status,
+        zip_code=zip_code, min_price=min_price, max_price=max_price,
+        min_beds=min_beds, min_baths=min_baths, min_sqft=min_sqft, max_sqft=max_sqft,
+        property_type=property_type, sort=sort, descending=order == "desc",
+        limit=limit, offset=offset,
+    )
+    return ListingPage(
+        total=total,
+        limit=limit,
+        offset=offset,
+        refreshed_at=area.refreshed_at if area else None,
+        stale=stale,
+        results=[ListingOut.model_validate(r) for r in rows],
+    )
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from app.schemas.properties import PropertiesCreate, PropertiesOut
 from app.db.models.properties import Properties
 from app.deps.db import get_db
+from app.services.liked_context import invalidate as invalidate_liked_context
 
 router = APIRouter(tags=["properties"])
 
@@ -82,6 +83,7 @@ def create_properties(
     db.add(new_property)
     db.commit()
     db.refresh(new_property)
+    invalidate_liked_context(new_property.user_id)
     return new_property
 
 
@@ -95,4 +97,5 @@ def delete_property(
         raise HTTPException(status_code=404, detail="Property not found")
     db.delete(prop)
     db.commit()
+    invalidate_liked_context(prop.user_id)
     return {"ok": True}
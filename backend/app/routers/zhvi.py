@@ -0,0 +1,98 @@
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from app.schemas.zhvi import AutocompleteOut, ZhviMultiSeriesOut, ZhviSeriesOut
+from app.services.search_index import autocomplete
+from app.services.zhvi_loader import data_version
+from app.services.zhvi_series import encode_values, get_series, series_etag
+
+router = APIRouter(tags=["zhvi"])
+
+MAX_ZIPS_PER_REQUEST = 50
+
+Freq = Literal["monthly", "quarterly", "yearly", "lttb"]
+Encoding = Literal["json", "delta", "float32"]
+
+
+def _not_modified(request: Request, response: Response, etag: str) -> bool:
+    """Set caching headers; True if the client already has this version."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    match = request.headers.get("if-none-match", "")
+    return etag in (t.strip() for t in match.split(",")) or match.strip() == "*"
+
+
+def _series_out(zip_code, start, end, freq, points, encoding) -> ZhviSeriesOut | None:
+    found = get_series(zip_code, start, end, freq, points)
+    if found is None:
+        return None
+    dates, values = found
+    return ZhviSeriesOut(
+        zip=str(zip_code).zfill(5),
+        freq=freq,
+        encoding=encoding,
+        dates=dates.strftime("%Y-%m-%d").tolist(),
+        values=encode_values(values, encoding),
+    )
+
+
+@router.get("/zhvi/search", response_model=AutocompleteOut)
+def zhvi_search(
+    q: str = Query(..., min_length=1, description="ZIP, city, county, metro or state prefix"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    return AutocompleteOut(query=q, matches=autocomplete(q, limit))
+
+
+@router.get("/zhvi/{zip_code}", response_model=ZhviSeriesOut)
+def zhvi_series(
+    zip_code: str,
+    request: Request,
+    response: Response,
+    start: date | None = Query(None, description="first month (inclusive)"),
+    end: date | None = Query(None, description="last month (inclusive)"),
+    freq: Freq = Query("monthly"),
+    points: int = Query(120, ge=3, le=1000, description="target points for freq=lttb"),
+    encoding: Encoding = Query("json"),
+):
+    etag = series_etag(zip_code, start, end, freq, points, encoding)
+    if _not_modified(request, response, etag):
+        return Response(status_code=304, headers=dict(response.headers))
+
+    out = _series_out(zip_code, start, end, freq, points, encoding)
+    if out is None:
+        raise HTTPException(status_code=404, detail=f"ZIP code {zip_code} not found in ZHVI data")
+    return out
+
+
+@router.get("/zhvi", response_model=ZhviMultiSeriesOut)
+def zhvi_multi_series(
+    request: Request,
+    response: Response,
+    zips: str = Query(..., description="comma-separated ZIP codes"),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    freq: Freq = Query("monthly"),
+    points: int = Query(120, ge=3, le=1000),
+    encoding: Encoding = Query("json"),
+):
+    zip_list = list(dict.fromkeys(z.strip() for z in zips.split(",") if z.strip()))
+    if not zip_list:
+        raise HTTPException(status_code=422, detail="zips must list at least one ZIP code")
+    if len(zip_list) > MAX_ZIPS_PER_REQUEST:
+        raise HTTPException(status_code=422,
+                            detail=f"At most {MAX_ZIPS_PER_REQUEST} ZIP codes per request")
+
+    etag = series_etag(",".join(zip_list), start, end, freq, points, encoding)
+    if _not_modified(request, response, etag):
+        return Response(status_code=304, headers=dict(response.headers))
+
+    series, missing = [], []
+    for z in zip_list:
+        out = _series_out(z, start, end, freq, points, encoding)
+        if out is None:
+            missing.append(z)
+        else:
+            series.append(out)
+    return ZhviMultiSeriesOut(version=data_version(), series=series, missing=missing)
@@ -1,53 +1,65 @@
-import os
-from typing import Annotated, List
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends, HTTPException, Query
-from app.schemas.properties import PropertiesCreate, PropertiesOut
-from app.db.models.properties import Properties
-from app.deps.db import get_db
-from app.core.config import RAPIDAPI_KEY
-import requests
+import json
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.core.config import ZILLOW_PAGE_CONCURRENCY
+from app.services.zillow_client import ZillowError, cache_stats, search_by_address
+from app.services.zillow_search import MAX_PAGES, stream_search
 
 router = APIRouter(tags=["zillow"])
 
 
 @router.get("/zillow/search")
-def search_zillow_properties(
+async def search_zillow_properties(
     location: str = Query("Irvine, CA", description="City, state or ZIP"),
     listing_status: str = Query("For_Sale"),
-    page: int = Query(1),
+    page: int = Query(1, ge=1),
 ):
-    url = "https://private-zillow.p.rapidapi.com/search/byaddress"
+    try:
+        results = await search_by_address(
+            location or "Irvine, CA", listing_status or "For_Sale", page
+        )
+    except ZillowError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    headers = {
-        "X-RapidAPI-Key": RAPIDAPI_KEY,
-        "X-RapidAPI-Host": "private-zillow.p.rapidapi.com",
+    return {
+        "count": len(results),
+        "results": results
     }
 
-    params = {
-        "location": location or "Irvine, CA",
-        "listingStatus": listing_status or "For_Sale",
-        "page": page or q1,
-    }
 
-    response = requests.get(url, headers=headers, params=params)
+@router.get("/zillow/search/all")
+async def search_zillow_pages(
+    location: str = Query("Irvine, CA", description="City, state or ZIP"),
+    listing_status: str = Query("For_Sale"),
+    start_page: int = Query(1, ge=1),
+    end_page: Optional[int] = Query(None, ge=1, description="Last page (inclusive)"),
+    max_results: Optional[int] = Query(None, ge=1, description="Stop after this many listings"),
+):
+    """
+    Fetch a page range concurrently and stream merged listings as NDJSON:
+    one {"page", "results"} (or {"page", "error"}) line per page in arrival
+    order, then a {"done": true, ...} summary.
+    """
+    if end_page is None and max_results is None:
+        raise HTTPException(status_code=400, detail="Pass end_page or max_results")
+    if end_page is not None:
+        if end_page < start_page:
+            raise HTTPException(status_code=400, detail="end_page must be >= start_page")
+        if end_page - start_page + 1 > MAX_PAGES:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_PAGES} pages per request")
 
-    if response.status_code != 200:
-        raise HTTPException(
-            status_code=response.status_code,
-            detail=response.text
-        )
+    async def lines():
+        async for event in stream_search(location or "Irvine, CA", listing_status or "For_Sale",
+                                         start_page, end_page, max_results,
+                                         ZILLOW_PAGE_CONCURRENCY):
+            yield json.dumps(event) + "\n"
 
-    data = response.json()
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
-    # Zillow wraps actual properties here
-    results = [
-        r["property"]
-        for r in data.get("searchResults", [])
-        if "property" in r
-    ]
 
-    return {
-        "count": len(results),
-        "results": results
-    }
\ No newline at end of file
+@router.get("/zillow/stats")
+def zillow_stats():
+    """Search cache hit rate and upstream call counters."""
+    return cache_stats()
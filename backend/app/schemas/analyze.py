@@ -28,6 +28,7 @@ class AnalyzeResponse(BaseModel):
     fair_value_low: float
     fair_value_high: float
     fragility_index: str
+    data_level: str = "zip"
 
 
 class ExplainRequest(BaseModel):
@@ -17,3 +17,25 @@ class ChatRequest(BaseModel):
 
 class ChatResponse(BaseModel):
     reply: str
+
+
+class ChatSessionCreate(BaseModel):
+    user_id: str | None = None
+    analysis_context: dict | None = None
+
+
+class ChatSessionOut(BaseModel):
+    session_id: str
+    summary: str | None = None
+    messages: list[ChatMessage] = []
+
+
+class ChatTurnRequest(BaseModel):
+    message: str
+    analysis_context: dict | None = None  # Replaces the session's context when given
+    prefer_statement: bool = False
+
+
+class ChatTurnResponse(BaseModel):
+    session_id: str
+    reply: str
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+
+
+class ZhviSeriesOut(BaseModel):
+    zip: str
+    freq: str
+    encoding: str
+    dates: list[str]
+    # json: floats; delta: first value then differences (whole dollars);
+    # float32: base64-encoded little-endian float32 array
+    values: list[float] | list[int] | str
+
+
+class ZhviMultiSeriesOut(BaseModel):
+    version: str
+    series: list[ZhviSeriesOut]
+    missing: list[str]
+
+
+class AutocompleteMatch(BaseModel):
+    kind: str               # zip | city | county | metro | state
+    value: str
+    label: str
+    state: str | None = None
+    zip: str                # most prominent ZIP in the area
+    size_rank: int
+    zip_count: int
+
+
+class AutocompleteOut(BaseModel):
+    query: str
+    matches: list[AutocompleteMatch]
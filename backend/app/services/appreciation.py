@@ -3,7 +3,14 @@ Predicted 12-month appreciation lookup per ZIP code.
 
 Uses the pre-computed zip_rankings.csv generated by the XGBoost training
 pipeline. Falls back to live model prediction if the joblib exists and
-the ZIP isn't in the CSV.
+the ZIP isn't in the CSV, scoring the nearest aggregate series (county,
+metro, state) for ZIPs without enough history of their own.
+
+When the pipeline also trained the quantile model, the rankings carry a
+P10/P90 band per ZIP, served alongside the point estimate.
+
+Per-ZIP explanations come from zip_shap.npz, written next to the rankings
+by the same pipeline, so serving one is a dict lookup.
 """
 from __future__ import annotations
 
@@ -21,6 +28,16 @@ _OUTPUT_DIR = os.path.normpath(
 )
 _RANKINGS_PATH = os.path.join(_OUTPUT_DIR, "zip_rankings.csv")
 _XGB_MODEL_PATH = os.path.join(_OUTPUT_DIR, "xgb_model.joblib")
+_SHAP_PATH = os.path.join(_OUTPUT_DIR, "zip_shap.npz")
+
+FEATURE_LABELS = {
+    "growth_3m": "3-month price growth",
+    "growth_6m": "6-month price growth",
+    "growth_12m": "12-month price growth",
+    "cagr_3y": "3-year annualized growth",
+    "volatility_12m": "12-month price volatility",
+    "momentum_accel": "Momentum (3m vs 6m growth)",
+}
 
 
 @lru_cache(maxsize=1)
@@ -33,6 +50,21 @@ def _load_rankings() -> dict[str, float]:
     return dict(zip(df["RegionName"], df["predicted_12m_appreciation"]))
 
 
+@lru_cache(maxsize=1)
+def _load_intervals() -> dict[str, tuple[float, float]]:
+    """Load ZIP → (P10, P90) appreciation band, if the rankings have one."""
+    if not os.path.exists(_RANKINGS_PATH):
+        return {}
+    df = pd.read_csv(_RANKINGS_PATH)
+    if "p10_12m_appreciation" not in df.columns:
+        return {}
+    df["RegionName"] = df["RegionName"].astype(str).str.zfill(5)
+    return dict(zip(
+        df["RegionName"],
+        zip(df["p10_12m_appreciation"], df["p90_12m_appreciation"]),
+    ))
+
+
 @lru_cache(maxsize=1)
 def _load_model():
     """Attempt to load the trained XGBoost model."""
@@ -42,11 +74,25 @@ def _load_model():
     return joblib.load(_XGB_MODEL_PATH)
 
 
+@lru_cache(maxsize=1)
+def _load_shap() -> Optional[dict]:
+    """Load precomputed SHAP values and index them by ZIP."""
+    if not os.path.exists(_SHAP_PATH):
+        return None
+    with np.load(_SHAP_PATH) as npz:
+        data = {k: npz[k] for k in npz.files}
+    data["index"] = {z: i for i, z in enumerate(data["region"].tolist())}
+    return data
+
+
 def _compute_features_for_zip(zip_code: str) -> Optional[np.ndarray]:
-    """Build the 6-feature vector for the latest month of a given ZIP."""
+    """
+    Build the 6-feature vector for the latest month of a given ZIP, or of
+    its county/metro/state aggregate when the ZIP has no usable series.
+    """
     try:
-        from app.services.zhvi_loader import get_zip_series
-        values = get_zip_series(zip_code)
+        from app.services.zhvi_loader import resolve_series
+        values = resolve_series(zip_code).values
     except (ValueError, Exception):
         return None
 
@@ -92,6 +138,44 @@ def get_appreciation(zip_code: str) -> Optional[float]:
     return None
 
 
+def get_appreciation_interval(zip_code: str) -> Optional[tuple[float, float]]:
+    """Return the precomputed (P10, P90) 12-month appreciation band for a ZIP."""
+    return _load_intervals().get(str(zip_code).zfill(5))
+
+
 def get_appreciation_bulk(zip_codes: list[str]) -> dict[str, Optional[float]]:
     """Return predicted appreciation for multiple ZIPs at once."""
     return {z: get_appreciation(z) for z in zip_codes}
+
+
+def get_explanation(zip_code: str) -> Optional[dict]:
+    """
+    Return the precomputed SHAP breakdown of a ZIP's predicted appreciation:
+    the model's base value plus one contribution per feature, largest first.
+    """
+    shap = _load_shap()
+    if shap is None:
+        return None
+    i = shap["index"].get(str(zip_code).zfill(5))
+    if i is None:
+        return None
+
+    values = shap["shap"][i].astype(float)
+    feats = shap["features"][i].astype(float)
+    base_value = float(shap["base_value"])
+    cols = shap["feature_cols"].tolist()
+    return {
+        "zip": str(zip_code).zfill(5),
+        "as_of": str(shap["as_of"]),
+        "base_value": base_value,
+        "predicted_12m_appreciation": base_value + float(values.sum()),
+        "contributions": [
+            {
+                "feature": cols[j],
+                "label": FEATURE_LABELS.get(cols[j], cols[j]),
+                "value": feats[j],
+                "shap": values[j],
+            }
+            for j in np.argsort(-np.abs(values))
+        ],
+    }
@@ -0,0 +1,214 @@
+"""
+TTL cache with stale-while-revalidate over a pluggable key/value backend.
+
+Entries are fresh for ``ttl`` seconds, then stale for another
+``stale_ttl`` seconds. A stale hit is returned immediately and refreshed by
+one background task. After that window the entry counts as a miss.
+
+Backends are synchronous (the chat session store uses them from sync code).
+``SWRCache`` calls blocking ones (``blocking = True``) on a worker thread so
+a slow or unreachable server never stalls the event loop.
+
+Backends:
+  MemoryBackend  in-process, size-bounded LRU (default)
+  RedisBackend   any Redis-compatible server; needs the optional ``redis``
+                 package. Eviction is left to the server's maxmemory policy.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Optional, Protocol
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    blocking: bool  # does a call wait on I/O?
+
+    def get(self, key: str) -> Optional[tuple[Any, float]]: ...
+    def set(self, key: str, value: Any, stored_at: float, expire_s: float) -> None: ...
+    def delete(self, key: str) -> None: ...
+    def clear(self) -> None: ...
+
+
+class MemoryBackend:
+    """LRU dict of key → (value, stored_at), bounded at `max_entries`."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[Any, float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[tuple[Any, float]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, stored_at, expires_at = item
+            if time.time() >= expires_at:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value, stored_at
+
+    def set(self, key: str, value: Any, stored_at: float, expire_s: float) -> None:
+        with self._lock:
+            self._data[key] = (value, stored_at, stored_at + expire_s)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """JSON values in a Redis-compatible store under `prefix`."""
+
+    blocking = True
+
+    def __init__(self, url: str, prefix: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RedisBackend needs the 'redis' package") from e
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.25,
+                                           socket_connect_timeout=0.25)
+
+    def get(self, key: str) -> Optional[tuple[Any, float]]:
+        raw = self._redis.get(self.prefix + key)
+        if raw is None:
+            return None
+        item = json.loads(raw)
+        return item["v"], item["t"]
+
+    def set(self, key: str, value: Any, stored_at: float, expire_s: float) -> None:
+        self._redis.set(self.prefix + key, json.dumps({"v": value, "t": stored_at}),
+                        ex=max(1, int(expire_s)))
+
+    def delete(self, key: str) -> None:
+        self._redis.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        keys = list(self._redis.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self._redis.delete(*keys)
+
+
+def make_backend(kind: str, max_entries: int, redis_url: str, prefix: str) -> CacheBackend:
+    """`kind` is "memory" or "redis"; falls back to memory if Redis is unusable."""
+    if kind == "redis":
+        try:
+            return RedisBackend(redis_url, prefix)
+        except RuntimeError as e:
+            logger.warning("%s; using the in-process cache", e)
+    return MemoryBackend(max_entries)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    fetches: int = 0          # fetch() invocations (misses + refreshes)
+    refresh_errors: int = 0
+    backend_errors: int = 0
+
+    def snapshot(self) -> dict:
+        out = asdict(self)
+        lookups = self.hits + self.stale_hits + self.misses
+        out["hit_rate"] = round((self.hits + self.stale_hits) / lookups, 4) if lookups else None
+        return out
+
+
+class SWRCache:
+    def __init__(self, backend: CacheBackend, ttl: float, stale_ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = CacheStats()
+        self._refreshing: set[str] = set()
+        # The loop only holds weak references to tasks; keep them until done
+        self._tasks: set[asyncio.Task] = set()
+
+    async def _call(self, fn: Callable, *args) -> Any:
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    async def _lookup(self, key: str) -> Optional[tuple[Any, float]]:
+        try:
+            return await self._call(self.backend.get, key)
+        except Exception as e:  # a cache outage must not fail the request
+            self.stats.backend_errors += 1
+            logger.warning("cache get failed: %r", e)
+            return None
+
+    async def _store(self, key: str, value: Any):
+        try:
+            await self._call(self.backend.set, key, value, time.time(),
+                             self.ttl + self.stale_ttl)
+        except Exception as e:
+            self.stats.backend_errors += 1
+            logger.warning("cache set failed: %r", e)
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats.fetches += 1
+        value = await fetch()
+        await self._store(key, value)
+        return value
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]):
+        try:
+            await self._fetch(key, fetch)
+        except Exception as e:
+            self.stats.refresh_errors += 1
+            logger.warning("background refresh of %s failed: %r", key, e)
+        finally:
+            self._refreshing.discard(key)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached value for `key`, calling `fetch()` on a miss or (in the background) when stale."""
+        item = await self._lookup(key)
+        if item is None:
+            self.stats.misses += 1
+            return await self._fetch(key, fetch)
+
+        value, stored_at = item
+        age = time.time() - stored_at
+        if age < self.ttl:
+            self.stats.hits += 1
+            return value
+        if age >= self.ttl + self.stale_ttl:
+            self.stats.misses += 1
+            return await self._fetch(key, fetch)
+
+        self.stats.stale_hits += 1
+        if key not in self._refreshing:
+            self._refreshing.add(key)
+            task = asyncio.get_running_loop().create_task(self._refresh(key, fetch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return value
+
+    def clear(self):
+        self.backend.clear()
@@ -0,0 +1,140 @@
+"""
+Server-side chat sessions with a bounded prompt.
+
+A session holds the conversation, so clients send only the new message.
+Each turn the model sees the rolling summary plus the most recent messages
+that fit in CHAT_HISTORY_TOKEN_BUDGET. Once the stored history outgrows the
+budget, the oldest turns are folded into the summary after the reply is sent,
+by a background task. If summarizing fails, those turns are dropped without
+being summarized, so the stored history stays bounded either way.
+
+Sessions live in the same pluggable store as the Zillow cache (in-process LRU
+by default, Redis-compatible optionally) and expire after CHAT_SESSION_TTL
+seconds of inactivity.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import time
+import uuid
+from typing import Optional
+
+from app.core.config import (
+    CHAT_HISTORY_TOKEN_BUDGET,
+    CHAT_SESSION_BACKEND,
+    CHAT_SESSION_MAX,
+    CHAT_SESSION_TTL,
+    REDIS_URL,
+)
+from app.services.cache import make_backend
+from app.services.chatbot import summarize
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token for Llama-style tokenizers on English text
+CHARS_PER_TOKEN = 4
+
+_store = make_backend(CHAT_SESSION_BACKEND, CHAT_SESSION_MAX, REDIS_URL, "chat:session:")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN) + 4  # + per-message overhead
+
+
+def new_session(user_id: str | None = None, analysis_context: dict | None = None) -> dict:
+    session = {
+        "id": uuid.uuid4().hex,
+        "user_id": user_id,
+        "analysis_context": analysis_context,
+        "summary": None,
+        "messages": [],        # {"seq", "role", "content", "tokens"}
+        "next_seq": 0,
+        "user_turns": 0,       # user messages ever sent, including summarized ones
+    }
+    save_session(session)
+    return session
+
+
+def get_session(session_id: str) -> Optional[dict]:
+    item = _store.get(session_id)
+    return item[0] if item else None
+
+
+def save_session(session: dict):
+    # Re-saving on every turn makes the TTL an inactivity timeout
+    _store.set(session["id"], session, time.time(), CHAT_SESSION_TTL)
+
+
+def delete_session(session_id: str):
+    _store.delete(session_id)
+
+
+def append_message(session: dict, role: str, content: str):
+    session["messages"].append({
+        "seq": session["next_seq"],
+        "role": role,
+        "content": content,
+        "tokens": estimate_tokens(content),
+    })
+    session["next_seq"] += 1
+    if role == "user":
+        session["user_turns"] += 1
+
+
+def window(session: dict, budget: int = CHAT_HISTORY_TOKEN_BUDGET) -> list[dict[str, str]]:
+    """Most recent messages within `budget` tokens (always at least the last one)."""
+    kept, used = [], 0
+    for m in reversed(session["messages"]):
+        if kept and used + m["tokens"] > budget:
+            break
+        kept.append({"role": m["role"], "content": m["content"]})
+        used += m["tokens"]
+    kept.reverse()
+    # Llama chat templates expect the history to open with a user turn
+    while len(kept) > 1 and kept[0]["role"] != "user":
+        kept.pop(0)
+    return kept
+
+
+def history_tokens(session: dict) -> int:
+    return sum(m["tokens"] for m in session["messages"])
+
+
+def needs_compaction(session: dict, budget: int = CHAT_HISTORY_TOKEN_BUDGET) -> bool:
+    return history_tokens(session) > budget
+
+
+def compact(session_id: str, budget: int = CHAT_HISTORY_TOKEN_BUDGET):
+    """
+    Fold the oldest messages into the summary until the history fits in half
+    the budget, leaving headroom for the next few turns. Runs as a background
+    task after a reply; a concurrent turn that already compacted wins. If the
+    summary can't be updated, the old messages are dropped all the same.
+    """
+    session = get_session(session_id)
+    if session is None or not needs_compaction(session, budget):
+        return
+
+    messages = session["messages"]
+    keep_tokens, cut = 0, len(messages)
+    while cut > 1 and keep_tokens + messages[cut - 1]["tokens"] <= budget // 2:
+        cut -= 1
+        keep_tokens += messages[cut]["tokens"]
+    old = messages[:cut]
+    through = old[-1]["seq"]
+
+    try:
+        summary = summarize(session["summary"],
+                            [{"role": m["role"], "content": m["content"]} for m in old])
+    except Exception as e:
+        logger.warning("summarizing chat session %s failed, dropping %d messages: %r",
+                       session_id, len(old), e)
+        summary = session["summary"]
+
+    latest = get_session(session_id)
+    if latest is None or not latest["messages"] or latest["messages"][0]["seq"] != old[0]["seq"]:
+        return
+    latest["summary"] = summary
+    latest["messages"] = [m for m in latest["messages"] if m["seq"] > through]
+    save_session(latest)
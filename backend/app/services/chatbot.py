@@ -1,17 +1,29 @@
 from __future__ import annotations
 
+import logging
+from typing import Iterator
+
 from huggingface_hub import InferenceClient
-from app.core.config import HF_TOKEN
+from app.core.config import CHAT_DEADLINE, CHAT_HEDGE_AFTER, HF_BASE_URL, HF_TOKEN
+from app.services.hedge import Hedger
+
+logger = logging.getLogger(__name__)
 
 MODEL_ID = "meta-llama/Meta-Llama-3-8B-Instruct"
 
 _client: InferenceClient | None = None
 
+chat_hedger = Hedger(CHAT_DEADLINE, CHAT_HEDGE_AFTER)
+
 
 def _get_client() -> InferenceClient:
     global _client
     if _client is None:
-        _client = InferenceClient(model=MODEL_ID, token=HF_TOKEN)
+        if HF_BASE_URL:
+            _client = InferenceClient(base_url=HF_BASE_URL, token=HF_TOKEN or None,
+                                      timeout=CHAT_DEADLINE)
+        else:
+            _client = InferenceClient(model=MODEL_ID, token=HF_TOKEN, timeout=CHAT_DEADLINE)
     return _client
 
 
@@ -88,30 +100,137 @@ def build_liked_properties_prompt(liked_properties: list[dict]) -> str:
     return "\n".join(lines) + "\n"
 
 
-def chat(
+def build_messages(
     messages: list[dict[str, str]],
     analysis_context: dict | None = None,
-    liked_properties: list[dict] | None = None,
+    liked_prompt: str = "",
     prefer_statement: bool = False,
-) -> str:
+    summary: str | None = None,
+) -> list[dict[str, str]]:
     system = (
         SYSTEM_PROMPT
         + build_context_prompt(analysis_context)
-        + build_liked_properties_prompt(liked_properties or [])
+        + liked_prompt
     )
+    if summary:
+        system += f"\n\nSummary of the conversation so far:\n{summary}\n"
     if prefer_statement:
         system += "\n\nThe user is about to see property cards. End with a brief, reassuring statement — do not ask a question."
 
     formatted: list[dict[str, str]] = [{"role": "system", "content": system}]
     for msg in messages:
         formatted.append({"role": msg["role"], "content": msg["content"]})
+    return formatted
+
 
+def chat(
+    messages: list[dict[str, str]],
+    analysis_context: dict | None = None,
+    liked_prompt: str = "",
+    prefer_statement: bool = False,
+    summary: str | None = None,
+) -> str:
     client = _get_client()
-    response = client.chat_completion(
-        messages=formatted,
-        max_tokens=256,
-        temperature=0.6,
-        top_p=0.9,
-    )
+    formatted = build_messages(messages, analysis_context, liked_prompt,
+                               prefer_statement, summary)
+    try:
+        response = chat_hedger.call(lambda: client.chat_completion(
+            messages=formatted,
+            max_tokens=256,
+            temperature=0.6,
+            top_p=0.9,
+        ))
+    except Exception as e:
+        chat_hedger.count("fallbacks")
+        logger.warning("chat reply fell back to the template: %r", e)
+        return fallback_reply(analysis_context)
 
     return response.choices[0].message.content or ""
+
+
+def chat_stream(
+    messages: list[dict[str, str]],
+    analysis_context: dict | None = None,
+    liked_prompt: str = "",
+    prefer_statement: bool = False,
+    summary: str | None = None,
+) -> Iterator[str]:
+    """
+    Same as `chat`, but yields the reply's text deltas as they are generated.
+    The deadline and hedge apply to the first token; once the reply is
+    flowing it is not interrupted. A stream that loses the hedge, or opens
+    after the deadline, is closed.
+    """
+    client = _get_client()
+    formatted = build_messages(messages, analysis_context, liked_prompt,
+                               prefer_statement, summary)
+
+    def first_delta() -> tuple[Iterator[str], str]:
+        deltas = (
+            chunk.choices[0].delta.content
+            for chunk in client.chat_completion(
+                messages=formatted,
+                max_tokens=256,
+                temperature=0.6,
+                top_p=0.9,
+                stream=True,
+            )
+            if chunk.choices and chunk.choices[0].delta.content
+        )
+        return deltas, next(deltas, "")
+
+    try:
+        deltas, first = chat_hedger.call(first_delta, abandon=lambda late: late[0].close())
+    except Exception as e:
+        chat_hedger.count("fallbacks")
+        logger.warning("chat stream fell back to the template: %r", e)
+        yield fallback_reply(analysis_context)
+        return
+
+    if first:
+        yield first
+    yield from deltas
+
+
+class FallbackReply(str):
+    """A templated reply served in place of the model's; not worth keeping in history."""
+
+
+def fallback_reply(analysis_context: dict | None = None) -> FallbackReply:
+    """Deterministic reply for when the model misses its deadline or fails."""
+    reply = "Sorry, I'm having trouble putting together a full answer right now. Please try again in a moment."
+    ctx = analysis_context
+    if ctx and ctx.get("confidence_score") is not None:
+        try:
+            reply += (
+                f" In the meantime, the analysis you're viewing shows a "
+                f"{float(ctx['confidence_score']):.0%} confidence score, about a "
+                f"{float(ctx.get('prob_downside', 0)):.0%} chance of losing value, and a "
+                f"median projected value of ${float(ctx.get('p50', 0)):,.0f}."
+            )
+        except (TypeError, ValueError):
+            pass
+    return FallbackReply(reply)
+
+
+SUMMARY_PROMPT = """\
+You maintain a running summary of a conversation between a home buyer and \
+their assistant. Merge the new turns into the existing summary. Keep every \
+fact the buyer shared (budget, location, preferences, concerns) and any \
+numbers discussed; drop pleasantries. Reply with the summary only, in at most \
+{max_words} words."""
+
+
+def summarize(summary: str | None, messages: list[dict[str, str]], max_words: int = 120) -> str:
+    """Fold `messages` into the rolling conversation `summary`."""
+    turns = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    client = _get_client()
+    response = client.chat_completion(
+        messages=[
+            {"role": "system", "content": SUMMARY_PROMPT.format(max_words=max_words)},
+            {"role": "user", "content": f"Existing summary:\n{summary or '(none)'}\n\nNew turns:\n{turns}"},
+        ],
+        max_tokens=max_words * 2,
+        temperature=0.2,
+    )
+    return (response.choices[0].message.content or "").strip()
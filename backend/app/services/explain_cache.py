@@ -0,0 +1,96 @@
+"""
+Two-level cache of /explain texts: an in-process LRU in front of the
+``explain_cache`` table.
+
+Keys are hashes of the template version plus the rendered prompt (see
+llm_explain), so equal inputs after rounding share an entry and a prompt
+change never serves old text. The database is best-effort; if it is down
+the cache degrades to memory only and never fails the request.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from sqlalchemy import delete
+
+from app.core.config import EXPLAIN_CACHE_MAX_ENTRIES
+from app.db.models.explain_cache import ExplainCacheEntry
+from app.deps.db import SessionLocal
+from app.services.cache import MemoryBackend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExplainCacheStats:
+    memory_hits: int = 0
+    db_hits: int = 0
+    misses: int = 0
+    db_errors: int = 0
+
+    def snapshot(self) -> dict:
+        out = asdict(self)
+        lookups = self.memory_hits + self.db_hits + self.misses
+        out["hit_rate"] = round((self.memory_hits + self.db_hits) / lookups, 4) if lookups else None
+        return out
+
+
+class ExplainCache:
+    def __init__(self, max_entries: int = EXPLAIN_CACHE_MAX_ENTRIES):
+        self.memory = MemoryBackend(max_entries)
+        self.stats = ExplainCacheStats()
+        self._lock = threading.Lock()
+
+    def count(self, stat: str):
+        """Add one to an ExplainCacheStats counter; lookups run on many threads."""
+        with self._lock:
+            setattr(self.stats, stat, getattr(self.stats, stat) + 1)
+
+    def get(self, key: str) -> Optional[str]:
+        item = self.memory.get(key)
+        if item is not None:
+            self.count("memory_hits")
+            return item[0]
+        try:
+            with SessionLocal() as db:
+                entry = db.get(ExplainCacheEntry, key)
+        except Exception as e:
+            self.count("db_errors")
+            logger.warning("explain cache read failed: %r", e)
+            entry = None
+        if entry is None:
+            self.count("misses")
+            return None
+        self.count("db_hits")
+        self.memory.set(key, entry.explanation, time.time(), math.inf)
+        return entry.explanation
+
+    def put(self, key: str, template_version: str, explanation: str):
+        self.memory.set(key, explanation, time.time(), math.inf)
+        try:
+            with SessionLocal() as db:
+                db.merge(ExplainCacheEntry(key=key, template_version=template_version,
+                                           explanation=explanation))
+                db.commit()
+        except Exception as e:
+            self.count("db_errors")
+            logger.warning("explain cache write failed: %r", e)
+
+    def purge(self, keep_version: Optional[str] = None) -> int:
+        """
+        Delete cached explanations; with `keep_version`, only those from other
+        template versions. Returns the number of rows removed.
+        """
+        self.memory.clear()
+        stmt = delete(ExplainCacheEntry)
+        if keep_version is not None:
+            stmt = stmt.where(ExplainCacheEntry.template_version != keep_version)
+        with SessionLocal() as db:
+            removed = db.execute(stmt).rowcount
+            db.commit()
+        return removed
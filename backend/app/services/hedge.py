@@ -0,0 +1,106 @@
+"""
+Deadlines and hedged requests for blocking LLM calls.
+
+``Hedger.call(fn)`` runs ``fn`` on a worker thread and waits at most
+``deadline`` seconds. If it hasn't answered after ``hedge_after`` seconds
+(or fails before then), one identical backup call is started and whichever
+succeeds first wins. Past the deadline ``DeadlineExceeded`` is raised and
+the caller serves its fallback; abandoned calls finish on their own, bounded
+by the SDK client's own timeout, and ``abandon`` (if given) is called with
+each late result so it can release it, e.g. close a response stream.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+@dataclass
+class HedgeStats:
+    calls: int = 0
+    hedged: int = 0          # calls that started a backup request
+    hedge_wins: int = 0      # ... where the backup answered first
+    timeouts: int = 0        # deadline passed with no answer
+    errors: int = 0          # every attempt failed before the deadline
+    fallbacks: int = 0       # calls whose caller served its fallback instead
+
+    def snapshot(self) -> dict:
+        out = asdict(self)
+        out["hedge_rate"] = round(self.hedged / self.calls, 4) if self.calls else None
+        out["fallback_rate"] = round(self.fallbacks / self.calls, 4) if self.calls else None
+        return out
+
+
+class Hedger:
+    def __init__(self, deadline: float, hedge_after: float = 0):
+        self.deadline = deadline
+        # 0 (or anything past the deadline) disables hedging
+        self.hedge_after = hedge_after if 0 < hedge_after < deadline else None
+        self.stats = HedgeStats()
+        self._lock = threading.Lock()
+
+    def count(self, stat: str):
+        """Add one to a HedgeStats counter; calls run on many threads."""
+        with self._lock:
+            setattr(self.stats, stat, getattr(self.stats, stat) + 1)
+
+    def call(self, fn: Callable[[], Any],
+             abandon: Callable[[Any], None] | None = None) -> Any:
+        self.count("calls")
+        start = time.monotonic()
+        end = start + self.deadline
+        hedge_at = start + self.hedge_after if self.hedge_after is not None else None
+        pending: list[Future] = [_executor.submit(fn)]
+        try:
+            return self._wait(fn, pending, end, hedge_at)
+        finally:
+            if abandon is not None:
+                for future in pending:
+                    future.add_done_callback(lambda f: _release(f, abandon))
+
+    def _wait(self, fn: Callable[[], Any], pending: list[Future], end: float,
+              hedge_at: float | None) -> Any:
+        backup: Future | None = None
+        error: BaseException | None = None
+
+        while True:
+            if hedge_at is not None and (not pending or time.monotonic() >= hedge_at):
+                backup = _executor.submit(fn)
+                pending.append(backup)
+                hedge_at = None
+                self.count("hedged")
+            if not pending:
+                self.count("errors")
+                raise error
+
+            wake = end if hedge_at is None else min(end, hedge_at)
+            done, _ = wait(pending, timeout=max(0.0, wake - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is backup:
+                    self.count("hedge_wins")
+                return result
+
+            if time.monotonic() >= end:
+                self.count("timeouts")
+                raise DeadlineExceeded(f"no answer within {self.deadline:.1f}s")
+
+
+def _release(future: Future, abandon: Callable[[Any], None]):
+    if future.exception() is None:
+        abandon(future.result())
@@ -0,0 +1,117 @@
+"""
+Per-user cache of the rendered liked-properties chat context.
+
+The prompt text for a user's five most recent liked properties is built once
+and reused on every chat turn until the user saves or deletes a property
+(properties router → invalidate). The query projects only the columns the
+prompt reads. Entries also expire after LIKED_CONTEXT_TTL seconds, which
+bounds staleness when another worker process made the change.
+"""
+from __future__ import annotations
+
+import time
+
+from sqlalchemy import desc, select
+from sqlalchemy.orm import Session
+
+from app.core.config import LIKED_CONTEXT_TTL
+from app.db.models.properties import Properties
+from app.services.cache import MemoryBackend
+from app.services.chatbot import build_liked_properties_prompt
+
+LIKED_LIMIT = 5
+
+PROMPT_COLUMNS = (
+    Properties.street_address,
+    Properties.city,
+    Properties.state,
+    Properties.zip_code,
+    Properties.price,
+    Properties.beds,
+    Properties.baths,
+    Properties.sqft,
+    Properties.price_change,
+    Properties.days_on_zillow,
+    Properties.property_type,
+    Properties.lot_size,
+    Properties.lot_size_unit,
+    Properties.year_built,
+    Properties.zestimate,
+    Properties.broker_name,
+    Properties.open_house_start,
+    Properties.open_house_end,
+)
+
+_cache = MemoryBackend(max_entries=4096)
+
+# Bumped on invalidate, so a render that raced with a change isn't cached
+_generation: dict[str, int] = {}
+
+
+def format_property(p) -> str:
+    parts = []
+    if p.street_address:
+        parts.append(p.street_address)
+    if p.city or p.state or p.zip_code:
+        loc = ", ".join(x for x in (p.city, p.state, p.zip_code) if x)
+        if loc:
+            parts.append(loc)
+    if p.beds is not None or p.baths is not None or p.sqft is not None:
+        specs = []
+        if p.beds is not None:
+            specs.append(f"{p.beds}bd")
+        if p.baths is not None:
+            specs.append(f"{p.baths}ba")
+        if p.sqft is not None:
+            specs.append(f"{p.sqft:.0f} sqft")
+        if specs:
+            parts.append(" ".join(specs))
+    if p.price is not None:
+        parts.append(f"${p.price:,.0f}")
+    return " | ".join(parts) if parts else "Property"
+
+
+def _load(db: Session, user_id: str) -> list[dict]:
+    rows = db.execute(
+        select(*PROMPT_COLUMNS)
+        .where(Properties.user_id == user_id, Properties.liked == True)
+        .order_by(desc(Properties.created_at))
+        .limit(LIKED_LIMIT)
+    ).all()
+    return [
+        {
+            "address": format_property(p),
+            "price": p.price,
+            "price_change": p.price_change,
+            "days_on_zillow": p.days_on_zillow,
+            "property_type": p.property_type,
+            "lot_size": p.lot_size,
+            "lot_size_unit": p.lot_size_unit,
+            "year_built": p.year_built,
+            "zestimate": p.zestimate,
+            "broker_name": p.broker_name,
+            "open_house_start": p.open_house_start.isoformat() if p.open_house_start else None,
+            "open_house_end": p.open_house_end.isoformat() if p.open_house_end else None,
+        }
+        for p in rows
+    ]
+
+
+def get_liked_prompt(db: Session, user_id: str | None) -> str:
+    """Rendered liked-properties context for `user_id` ("" if none)."""
+    if not user_id:
+        return ""
+    item = _cache.get(user_id)
+    if item is not None:
+        return item[0]
+    generation = _generation.get(user_id, 0)
+    prompt = build_liked_properties_prompt(_load(db, user_id))
+    if _generation.get(user_id, 0) == generation:
+        _cache.set(user_id, prompt, time.time(), LIKED_CONTEXT_TTL)
+    return prompt
+
+
+def invalidate(user_id: str | None):
+    if user_id:
+        _generation[user_id] = _generation.get(user_id, 0) + 1
+        _cache.delete(user_id)
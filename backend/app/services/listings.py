@@ -0,0 +1,229 @@
+"""
+Local snapshot of Zillow listings, queryable server-side.
+
+Searched areas (a normalized location + listing status) are fetched with the
+concurrent multi-page search and upserted into ``listings`` by zpid;
+``listing_area_members`` records which listings the area's last refresh
+returned. Queries filter, sort and paginate that snapshot in the database.
+An area older than LISTINGS_STALE_AFTER is still served from the snapshot and
+refreshed in the background; an area never fetched is fetched inline once.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import LISTINGS_REFRESH_PAGES, LISTINGS_STALE_AFTER, ZILLOW_PAGE_CONCURRENCY
+from app.deps.db import SessionLocal
+from app.db.models.listing import Listing, ListingArea, ListingAreaMember
+from app.services.zillow_client import ZillowError, normalize_search
+from app.services.zillow_search import iter_search_pages
+
+logger = logging.getLogger(__name__)
+
+LISTING_FIELDS = [c.name for c in Listing.__table__.columns if c.name != "fetched_at"]
+DATETIME_FIELDS = [c.name for c in Listing.__table__.columns
+                   if c.name != "fetched_at" and c.type.python_type is datetime]
+
+SORT_FIELDS = {
+    "price": Listing.price,
+    "price_per_sqft": Listing.price_per_sqft,
+    "beds": Listing.beds,
+    "baths": Listing.baths,
+    "sqft": Listing.sqft,
+    "days_on_zillow": Listing.days_on_zillow,
+    "listing_date": Listing.listing_date,
+    "year_built": Listing.year_built,
+}
+
+# Rows per INSERT … ON CONFLICT statement
+UPSERT_BATCH = 500
+
+# Dialects with a native INSERT … ON CONFLICT; others select, then update or insert
+NATIVE_UPSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+_refreshing: set[str] = set()
+
+
+def area_key(location: str, listing_status: str) -> str:
+    location, listing_status, _ = normalize_search(location, listing_status, 0)
+    return f"{location}|{listing_status}"
+
+
+def _utcnow() -> datetime:
+    # Columns are naive UTC; the database's now() would be in its session
+    # time zone, which is_stale can't tell apart
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        dt = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    # Columns are naive UTC, like the rest of the schema
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def _row(listing: dict) -> dict:
+    row = {f: listing.get(f) for f in LISTING_FIELDS}
+    for f in DATETIME_FIELDS:
+        row[f] = _parse_datetime(row[f])
+    if row["zip_code"] is not None:
+        row["zip_code"] = str(row["zip_code"]).zfill(5)
+    return row
+
+
+def _upsert(db: Session, model, rows: list[dict]):
+    """Insert `rows`, overwriting any existing row with the same primary key."""
+    (key,) = model.__table__.primary_key.columns
+    native = NATIVE_UPSERT.get(db.get_bind().dialect.name)
+    for i in range(0, len(rows), UPSERT_BATCH):
+        batch = rows[i:i + UPSERT_BATCH]
+        if native is not None:
+            stmt = native(model).values(batch)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[key],
+                set_={f: stmt.excluded[f] for f in batch[0] if f != key.name},
+            ))
+            continue
+        existing = set(db.scalars(select(key).where(key.in_([r[key.name] for r in batch]))))
+        updates = [r for r in batch if r[key.name] in existing]
+        inserts = [r for r in batch if r[key.name] not in existing]
+        if updates:
+            db.execute(update(model), updates)
+        if inserts:
+            db.execute(insert(model), inserts)
+
+
+def upsert_listings(db: Session, listings: Iterable[dict],
+                    fetched_at: Optional[datetime] = None) -> list[int]:
+    """Insert or update listings by zpid; returns the zpids written."""
+    fetched_at = fetched_at or _utcnow()
+    rows = {}
+    for listing in listings:
+        if listing.get("zpid") is not None:
+            rows[int(listing["zpid"])] = {**_row(listing), "fetched_at": fetched_at}
+    rows = list(rows.values())
+    _upsert(db, Listing, rows)
+    return [r["zpid"] for r in rows]
+
+
+def save_area(db: Session, location: str, listing_status: str, listings: list[dict]):
+    """Upsert an area's listings and replace its membership, in one transaction."""
+    key = area_key(location, listing_status)
+    now = _utcnow()
+    zpids = upsert_listings(db, listings, now)
+
+    _upsert(db, ListingArea, [{
+        "key": key, "location": location, "listing_status": listing_status,
+        "listing_count": len(zpids), "refreshed_at": now,
+    }])
+    db.execute(delete(ListingAreaMember).where(ListingAreaMember.area_key == key))
+    if zpids:
+        db.execute(insert(ListingAreaMember), [{"area_key": key, "zpid": z} for z in zpids])
+    db.commit()
+
+
+def get_area(db: Session, location: str, listing_status: str) -> Optional[ListingArea]:
+    return db.get(ListingArea, area_key(location, listing_status))
+
+
+def is_stale(area: ListingArea) -> bool:
+    age = _utcnow() - area.refreshed_at
+    return age.total_seconds() > LISTINGS_STALE_AFTER
+
+
+async def refresh_area(location: str, listing_status: str) -> int:
+    """Re-fetch an area's first LISTINGS_REFRESH_PAGES pages and store them."""
+    listings, failed, last_error = [], 0, None
+    async for event in iter_search_pages(location, listing_status, 1,
+                                         end_page=LISTINGS_REFRESH_PAGES,
+                                         concurrency=ZILLOW_PAGE_CONCURRENCY):
+        if "error" in event:
+            failed += 1
+            last_error = event["error"]
+        else:
+            listings.extend(event["results"])
+    if failed == LISTINGS_REFRESH_PAGES:
+        # Keep the previous snapshot rather than replacing it with nothing
+        raise ZillowError(last_error["status_code"], last_error["detail"])
+
+    def save():
+        with SessionLocal() as db:
+            save_area(db, location, listing_status, listings)
+
+    await run_in_threadpool(save)
+    return len(listings)
+
+
+async def refresh_area_background(location: str, listing_status: str):
+    """`refresh_area`, skipped if this area is already being refreshed."""
+    key = area_key(location, listing_status)
+    if key in _refreshing:
+        return
+    _refreshing.add(key)
+    try:
+        n = await refresh_area(location, listing_status)
+        logger.info("refreshed listings for %s: %d", key, n)
+    except Exception as e:
+        logger.warning("listings refresh for %s failed: %r", key, e)
+    finally:
+        _refreshing.discard(key)
+
+
+def query_listings(
+    db: Session,
+    location: str,
+    listing_status: str,
+    zip_code: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_beds: Optional[int] = None,
+    min_baths: Optional[float] = None,
+    min_sqft: Optional[float] = None,
+    max_sqft: Optional[float] = None,
+    property_type: Optional[str] = None,
+    sort: str = "price",
+    descending: bool = False,
+    limit: int = 50,
+    offset: int = 0,
+) -> tuple[int, list[Listing]]:
+    """(total matches, one page of listings) from an area's snapshot."""
+    stmt = (
+        select(Listing)
+        .join(ListingAreaMember, ListingAreaMember.zpid == Listing.zpid)
+        .where(ListingAreaMember.area_key == area_key(location, listing_status))
+    )
+    if zip_code is not None:
+        stmt = stmt.where(Listing.zip_code == zip_code)
+    if min_price is not None:
+        stmt = stmt.where(Listing.price >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(Listing.price <= max_price)
+    if min_beds is not None:
+        stmt = stmt.where(Listing.beds >= min_beds)
+    if min_baths is not None:
+        stmt = stmt.where(Listing.baths >= min_baths)
+    if min_sqft is not None:
+        stmt = stmt.where(Listing.sqft >= min_sqft)
+    if max_sqft is not None:
+        stmt = stmt.where(Listing.sqft <= max_sqft)
+    if property_type is not None:
+        stmt = stmt.where(Listing.property_type == property_type)
+
+    total = db.scalar(select(func.count()).select_from(stmt.subquery()))
+    column = SORT_FIELDS[sort]
+    order = column.desc() if descending else column.asc()
+    rows = db.scalars(
+        stmt.order_by(order.nulls_last(), Listing.zpid).limit(limit).offset(offset)
+    ).all()
+    return total, list(rows)
@@ -1,15 +1,33 @@
 from __future__ import annotations
 
+import hashlib
+import logging
+
 from openai import OpenAI
-from app.core.config import OPENAI_API_KEY
+from app.core.config import EXPLAIN_DEADLINE, EXPLAIN_HEDGE_AFTER, OPENAI_API_KEY
+from app.services.explain_cache import ExplainCache
+from app.services.hedge import Hedger
+from app.services.singleflight import ThreadSingleFlight
+
+logger = logging.getLogger(__name__)
 
 _client: OpenAI | None = None
 
+# Identical prompts in flight at the same time share one completion
+explain_flight = ThreadSingleFlight()
+explain_cache = ExplainCache()
+explain_hedger = Hedger(EXPLAIN_DEADLINE, EXPLAIN_HEDGE_AFTER)
+
+MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.4
+MAX_TOKENS = 400
+
 
 def _get_client() -> OpenAI:
     global _client
     if _client is None:
-        _client = OpenAI(api_key=OPENAI_API_KEY)
+        # Retries are the hedger's job; the timeout only bounds abandoned calls
+        _client = OpenAI(api_key=OPENAI_API_KEY, timeout=EXPLAIN_DEADLINE, max_retries=0)
     return _client
 
 
@@ -50,6 +68,13 @@ def _risk_label(risk_tolerance: float) -> str:
     return "High"
 
 
+# Changes whenever the prompts or generation settings do, so cached text from
+# an older prompt is never served
+TEMPLATE_VERSION = hashlib.sha256(
+    f"{MODEL}|{TEMPERATURE}|{MAX_TOKENS}|{SYSTEM_PROMPT}|{USER_TEMPLATE}".encode()
+).hexdigest()[:12]
+
+
 def generate_explanation(
     confidence_score: float,
     prob_downside: float,
@@ -63,7 +88,7 @@ def generate_explanation(
     fragility_index: str,
     risk_tolerance: float,
 ) -> str:
-    user_msg = USER_TEMPLATE.format(
+    fields = dict(
         confidence_score=confidence_score,
         prob_downside=prob_downside,
         prob_underwater=prob_underwater,
@@ -76,16 +101,101 @@ def generate_explanation(
         fragility_index=fragility_index,
         risk_tolerance_label=_risk_label(risk_tolerance),
     )
-
+    user_msg = USER_TEMPLATE.format(**fields)
+
+    # The rendered prompt is the normalized key: the template rounds every
+    # input (whole percents and dollars), so inputs that format the same
+    # produce the same request upstream
+    key = hashlib.sha256(f"{TEMPLATE_VERSION}|{user_msg}".encode()).hexdigest()
+    cached = explain_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        return explain_flight.do(key, lambda: _complete_and_store(key, user_msg))
+    except Exception as e:
+        logger.warning("explanation fell back to the template: %r", e)
+        return fallback_explanation(**fields)
+
+
+def _complete_and_store(key: str, user_msg: str) -> str:
+    try:
+        text = explain_hedger.call(lambda: _complete(user_msg))
+    except Exception:
+        # Counted here, once per hedged call, not once per coalesced caller
+        explain_hedger.count("fallbacks")
+        raise
+    if text:
+        explain_cache.put(key, TEMPLATE_VERSION, text)
+    return text
+
+
+def _complete(user_msg: str) -> str:
     client = _get_client()
     response = client.chat.completions.create(
-        model="gpt-4o-mini",
+        model=MODEL,
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_msg},
         ],
-        temperature=0.4,
-        max_tokens=400,
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
     )
 
     return response.choices[0].message.content or ""
+
+
+FALLBACK_TEMPLATE = """\
+{assessment}
+
+- There is about a {prob_downside:.0%} chance the home loses value, and a {prob_underwater:.0%} chance it ends up worth less than the ${offer_price:,.0f} offer.
+- Projected values range from ${p10:,.0f} in a weak market to ${p90:,.0f} in a strong one, with ${p50:,.0f} as the middle estimate.
+- The offer is {fair_value_position} the ${fair_value_low:,.0f} – ${fair_value_high:,.0f} fair value range for this ZIP.
+
+{suggestion}
+"""
+
+
+def fallback_explanation(**fields) -> str:
+    """
+    Deterministic explanation from the same fields as USER_TEMPLATE, served
+    when the LLM misses its deadline or fails. Never cached.
+    """
+    confidence = fields["confidence_score"]
+    if confidence >= 0.7:
+        assessment = f"Overall, the numbers look favorable for this home, with a {confidence:.0%} confidence score."
+    elif confidence >= 0.4:
+        assessment = f"Overall, this home looks like a reasonable but uncertain purchase, with a {confidence:.0%} confidence score."
+    else:
+        assessment = f"Overall, this home carries meaningful risk, with a {confidence:.0%} confidence score."
+
+    offer = fields["offer_price"]
+    if offer < fields["fair_value_low"]:
+        position = "below"
+    elif offer > fields["fair_value_high"]:
+        position = "above"
+    else:
+        position = "within"
+
+    if position == "above":
+        suggestion = "Consider negotiating toward the fair value range before committing."
+    elif fields["risk_tolerance_label"] == "Low" and fields["prob_downside"] >= 0.3:
+        suggestion = "Since you prefer lower risk, consider a larger down payment or a longer time horizon before buying."
+    else:
+        suggestion = "Compare this home with a few others in the same ZIP before making a final decision."
+
+    return FALLBACK_TEMPLATE.format(
+        assessment=assessment, fair_value_position=position, suggestion=suggestion, **fields
+    )
+
+
+def purge_cache(stale_only: bool = False) -> int:
+    return explain_cache.purge(keep_version=TEMPLATE_VERSION if stale_only else None)
+
+
+def explain_stats() -> dict:
+    return {
+        "template_version": TEMPLATE_VERSION,
+        "cache": explain_cache.stats.snapshot(),
+        "coalescing": explain_flight.stats.snapshot(),
+        "hedging": explain_hedger.stats.snapshot(),
+    }
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import numpy as np
 from dataclasses import dataclass
-from app.services.zhvi_loader import compute_monthly_stats, get_zip_series, get_zip_median
+from app.services.zhvi_loader import resolve_series
 from app.core.config import MC_NUM_SIMULATIONS
 
 
@@ -17,6 +17,7 @@ class SimulationResult:
     fair_value_low: float
     fair_value_high: float
     fragility_index: str
+    data_level: str = "zip"  # zip, or the aggregate it fell back to
 
 
 # ZHVI is a smoothed index; individual homes carry significantly more variance.
@@ -82,9 +83,9 @@ def run_simulation(
     horizon_years: int,
     risk_tolerance: float,
 ) -> SimulationResult:
-    values = get_zip_series(zip_code)
-    mu, sigma = compute_monthly_stats(values)
-    zip_median = get_zip_median(zip_code)
+    market = resolve_series(zip_code)
+    mu, sigma = market.mu, market.sigma
+    zip_median = market.median
 
     vol_adj = _volatility_adjustment(current_price, zip_median)
     adj_sigma = sigma * vol_adj * _INDIVIDUAL_VOL_MULTIPLIER
@@ -153,4 +154,5 @@ def run_simulation(
         fair_value_low=fair_value_low,
         fair_value_high=fair_value_high,
         fragility_index=fragility_index,
+        data_level=market.level,
     )
@@ -0,0 +1,144 @@
+"""
+Prefix autocomplete over ZHVI metadata (ZIP, city, county, metro, state).
+
+Every searchable name is normalized and stored in one sorted key array;
+a query is two bisects for the [prefix, prefix + U+FFFF) range, and the
+best matches in that range are picked by SizeRank with argpartition. Each
+word of a multi-word name is also indexed, so "beach" finds
+"Long Beach". Built from the zhvi_loader metadata and rebuilt only when
+its metadata version changes.
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from app.services.zhvi_loader import get_matrix
+
+# Tie-break between equally ranked entities: broader areas first
+KIND_PRIORITY = {"state": 0, "metro": 1, "county": 2, "city": 3, "zip": 4}
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    return _NON_WORD.sub(" ", str(text).lower()).strip()
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    keys: list[str]            # sorted normalized keys
+    entity: np.ndarray         # key → entity id
+    score: np.ndarray          # key → sort score (lower is better)
+    entities: list[dict]       # kind, value, label, state, zip, size_rank, zip_count
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        q = normalize(query)
+        if not q:
+            return []
+        lo = bisect_left(self.keys, q)
+        hi = bisect_left(self.keys, q + "\uffff", lo)
+        if lo == hi:
+            return []
+
+        # Over-fetch so entities matched through several words still fill `limit`
+        scores = self.score[lo:hi]
+        k = min(len(scores), limit * 4)
+        top = np.argpartition(scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(scores[top], kind="stable")]
+        ids = self.entity[lo + top]
+        _, first = np.unique(ids, return_index=True)
+        ids = ids[np.sort(first)][:limit]
+        return [self.entities[i] for i in ids]
+
+
+def _entities(meta: pd.DataFrame) -> pd.DataFrame:
+    meta = meta.assign(
+        SizeRank=pd.to_numeric(meta.get("SizeRank"), errors="coerce")
+        .fillna(np.iinfo(np.int32).max).astype(np.int64),
+    ).sort_values("SizeRank", kind="stable")
+
+    city = meta["City"].fillna("") if "City" in meta else ""
+    place = (city + ", " + meta["State"].fillna("")).str.strip(", ")
+    zips = pd.DataFrame({
+        "kind": "zip",
+        "value": meta["RegionName"],
+        "label": meta["RegionName"].where(place == "", meta["RegionName"] + " · " + place),
+        "state": meta["State"],
+        "zip": meta["RegionName"],
+        "size_rank": meta["SizeRank"],
+        "zip_count": 1,
+    })
+
+    def grouped(kind: str, cols: list[str], label) -> pd.DataFrame:
+        g = (meta.dropna(subset=cols)
+             .groupby(cols, sort=False)
+             .agg(zip=("RegionName", "first"), size_rank=("SizeRank", "min"),
+                  zip_count=("RegionName", "size"), state=("State", "first"))
+             .reset_index())
+        return pd.DataFrame({
+            "kind": kind,
+            "value": g[cols[0]],
+            "label": label(g),
+            "state": g["state"],
+            "zip": g["zip"],
+            "size_rank": g["size_rank"],
+            "zip_count": g["zip_count"],
+        })
+
+    parts = [zips]
+    if "City" in meta:
+        parts.append(grouped("city", ["City", "State"],
+                             lambda g: g["City"] + ", " + g["State"]))
+    if "CountyName" in meta:
+        parts.append(grouped("county", ["CountyName", "State"],
+                             lambda g: g["CountyName"] + ", " + g["State"]))
+    if "Metro" in meta:
+        parts.append(grouped("metro", ["Metro"], lambda g: g["Metro"]))
+    parts.append(grouped("state", ["State"], lambda g: g["State"]))
+    entities = pd.concat(parts, ignore_index=True)
+    # A blank State cell is NaN here; the API schema wants None
+    entities["state"] = entities["state"].astype(object).where(entities["state"].notna(), None)
+    return entities
+
+
+def build_index(meta: pd.DataFrame) -> SearchIndex:
+    entities = _entities(meta)
+    score = (entities["size_rank"].to_numpy(np.int64) * len(KIND_PRIORITY)
+             + entities["kind"].map(KIND_PRIORITY).to_numpy(np.int64))
+
+    keys, ids = [], []
+    for i, value in enumerate(entities["value"].map(normalize)):
+        words = value.split(" ")
+        for w in range(len(words)):
+            keys.append(" ".join(words[w:]))
+            ids.append(i)
+
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    entity = np.asarray(ids, dtype=np.int64)[order]
+    return SearchIndex(
+        keys=[keys[j] for j in order],
+        entity=entity,
+        score=score[entity],
+        entities=entities.to_dict("records"),
+    )
+
+
+def get_search_index() -> SearchIndex:
+    return _index_for(get_matrix().meta_version)
+
+
+@lru_cache(maxsize=1)
+def _index_for(meta_version: str) -> SearchIndex:
+    # Only rebuilt when ZIPs are added, not on every price update
+    return build_index(get_matrix().meta)
+
+
+def autocomplete(query: str, limit: int = 10) -> list[dict]:
+    """Best `limit` matches for a typed prefix, most prominent (SizeRank) first."""
+    return get_search_index().search(query, limit)
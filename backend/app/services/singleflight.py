@@ -0,0 +1,92 @@
+"""
+Single-flight request coalescing.
+
+Concurrent calls with the same key share one in-flight upstream call: the
+first caller runs it, the rest wait for its result (or exception). Nothing is
+remembered once the call finishes; that is the cache's job.
+
+  SingleFlight        for coroutines (Zillow proxy)
+  ThreadSingleFlight  for blocking calls made from the threadpool (OpenAI)
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable
+
+
+@dataclass
+class FlightStats:
+    calls: int = 0       # upstream calls actually made
+    collapsed: int = 0   # callers that joined one already in flight
+
+    def snapshot(self) -> dict:
+        return asdict(self)
+
+
+class SingleFlight:
+    def __init__(self):
+        self.stats = FlightStats()
+        self._calls: dict[str, asyncio.Task] = {}
+
+    def _done(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every waiter went away
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            self.stats.calls += 1
+            # Run as its own task so one caller disconnecting doesn't cancel the others
+            task = asyncio.get_running_loop().create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.stats.collapsed += 1
+        return await asyncio.shield(task)
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class ThreadSingleFlight:
+    def __init__(self):
+        self.stats = FlightStats()
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats.calls += 1
+            else:
+                self.stats.collapsed += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
@@ -1,36 +1,201 @@
 from __future__ import annotations
 
+import hashlib
 import os
+import threading
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass
 from functools import lru_cache
-from app.core.config import ZHVI_CSV_PATH
+from app.core.config import PRICE_STORE_DIR, ZHVI_CSV_PATH
+from model.price_store import PriceStore
+from model.zhvi_clean import clean_prices
+
+META_COLS = ["RegionID", "SizeRank", "RegionName", "RegionType", "StateName",
+             "State", "City", "Metro", "CountyName"]
+
+
+@dataclass(frozen=True)
+class ZhviMatrix:
+    """
+    All ZIP price series as one (n_zips, n_months) array plus lookups.
+    Prices are validated and gap-filled once at load (model/zhvi_clean.py,
+    shared with training), so a ZIP's history is the NaN-free slice
+    ``prices[i, start[i]:last_valid[i] + 1]``.
+    """
+    zips: np.ndarray              # (n_zips,) 5-char ZIP strings
+    dates: pd.DatetimeIndex       # (n_months,) month-end dates
+    prices: np.ndarray            # (n_zips, n_months) float64, NaN = missing
+    meta: pd.DataFrame            # META_COLS, row-aligned with prices
+    row: dict[str, int]           # ZIP → row index
+    version: str                  # changes whenever the source data changes
+    meta_version: str             # changes only when ZIPs are added
+    first_valid: np.ndarray       # (n_zips,) first observed month, -1 if none
+    start: np.ndarray             # (n_zips,) first month of the usable run
+    last_valid: np.ndarray        # (n_zips,) last observed month, -1 if none
+    coverage: np.ndarray          # (n_zips,) observed share of [first, last]
 
 
-@lru_cache(maxsize=1)
 def _load_dataframe() -> pd.DataFrame:
     path = os.path.normpath(ZHVI_CSV_PATH)
     df = pd.read_csv(path)
     return df
 
 
-def get_available_zips() -> list[str]:
+def _file_version(path: str) -> str:
+    st = os.stat(path)
+    return hashlib.sha1(f"{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=8)
+def _store_versions(manifest_mtime_ns: int) -> tuple[str, str]:
+    store = PriceStore(os.path.normpath(PRICE_STORE_DIR))
+    return f"store-{store.version}", f"store-{store.meta_version}"
+
+
+def _source_versions() -> tuple[str, str]:
+    """
+    (data version, metadata version) of the current source: the price
+    store if model/ingest_zhvi.py has created one, else the CSV. Costs one
+    stat() per call, so every request sees a freshly ingested month.
+    """
+    manifest = os.path.join(os.path.normpath(PRICE_STORE_DIR), "manifest.json")
+    try:
+        return _store_versions(os.stat(manifest).st_mtime_ns)
+    except FileNotFoundError:
+        version = _file_version(os.path.normpath(ZHVI_CSV_PATH))
+        return version, version
+
+
+def _read_source(version: str) -> tuple[pd.DataFrame, np.ndarray, pd.DatetimeIndex]:
+    if version.startswith("store-"):
+        return PriceStore(os.path.normpath(PRICE_STORE_DIR)).read()
+
     df = _load_dataframe()
-    return df["RegionName"].astype(str).str.zfill(5).tolist()
+    zips = df["RegionName"].astype(str).str.zfill(5)
+    df = df[~zips.duplicated()].reset_index(drop=True)
+    date_cols = [c for c in df.columns if c[0:2] in ("19", "20")]
+    meta = df[[c for c in META_COLS if c in df.columns]].assign(
+        RegionName=zips.drop_duplicates().to_numpy())
+    prices = df[date_cols].apply(pd.to_numeric, errors="coerce").to_numpy(np.float64)
+    return meta, prices, pd.DatetimeIndex(pd.to_datetime(date_cols))
+
+
+def _changed_rows(old_version: str, new_version: str) -> np.ndarray | None:
+    """
+    Rows written to the price store between two of its versions, or None
+    when only a full rebuild is safe (CSV source, or the store can't tell).
+    """
+    if not (old_version.startswith("store-") and new_version.startswith("store-")):
+        return None
+    return PriceStore(os.path.normpath(PRICE_STORE_DIR)).changes_since(
+        int(old_version[len("store-"):]))
+
+
+def _load_matrix(version: str, meta_version: str) -> ZhviMatrix:
+    meta, prices, dates = _read_source(version)
+    meta = meta.reset_index(drop=True)
+    zips = meta["RegionName"].astype(str).str.zfill(5).to_numpy()
+    cleaned = clean_prices(prices)
+    return ZhviMatrix(
+        zips=zips,
+        dates=dates,
+        prices=np.ascontiguousarray(cleaned.prices),
+        meta=meta.assign(RegionName=zips),
+        row={z: i for i, z in enumerate(zips)},
+        version=version,
+        meta_version=meta_version,
+        first_valid=cleaned.first_valid,
+        start=cleaned.start,
+        last_valid=cleaned.last_valid,
+        coverage=cleaned.coverage,
+    )
+
+
+def _update_matrix(old: ZhviMatrix, rows: np.ndarray, version: str,
+                   meta_version: str) -> ZhviMatrix:
+    """
+    `old` with only `rows` re-read and re-cleaned. Cleaning is per ZIP, so
+    this matches a full load; unchanged ZIPs just gain NaN for new months.
+    """
+    store = PriceStore(os.path.normpath(PRICE_STORE_DIR))
+    dates = store.months
+    n_zips, n_old = store.n_zips, len(old.zips)
+    if meta_version == old.meta_version:
+        meta, zips, row = old.meta, old.zips, old.row
+    else:
+        meta = store.meta.reset_index(drop=True)
+        zips = meta["RegionName"].astype(str).str.zfill(5).to_numpy()
+        meta, row = meta.assign(RegionName=zips), {z: i for i, z in enumerate(zips)}
+
+    prices = np.full((n_zips, len(dates)), np.nan)
+    prices[:n_old, :old.prices.shape[1]] = old.prices
+    # ZIPs added without any value yet look like an all-NaN cleaned row
+    first_valid, start, last_valid, coverage = (
+        np.r_[old.first_valid, np.full(n_zips - n_old, -1)],
+        np.r_[old.start, np.zeros(n_zips - n_old, old.start.dtype)],
+        np.r_[old.last_valid, np.full(n_zips - n_old, -1)],
+        np.r_[old.coverage, np.zeros(n_zips - n_old)],
+    )
+    if len(rows):
+        cleaned = clean_prices(store.read_zips(rows))
+        prices[rows] = cleaned.prices
+        first_valid[rows] = cleaned.first_valid
+        start[rows] = cleaned.start
+        last_valid[rows] = cleaned.last_valid
+        coverage[rows] = cleaned.coverage
+    return ZhviMatrix(
+        zips=zips, dates=dates, prices=prices, meta=meta, row=row,
+        version=version, meta_version=meta_version,
+        first_valid=first_valid.astype(old.first_valid.dtype), start=start,
+        last_valid=last_valid.astype(old.last_valid.dtype), coverage=coverage,
+    )
+
+
+_lock = threading.Lock()
+_matrix: ZhviMatrix | None = None
+
+
+def get_matrix() -> ZhviMatrix:
+    """
+    The clean, dense price matrix for the current data version. After a
+    store ingest only the ZIPs it touched are re-read and re-cleaned.
+    """
+    global _matrix
+    version, meta_version = _source_versions()
+    m = _matrix
+    if m is not None and m.version == version:
+        return m
+    with _lock:
+        m = _matrix
+        if m is None or m.version != version:
+            rows = _changed_rows(m.version, version) if m is not None else None
+            if rows is None:
+                m = _load_matrix(version, meta_version)
+            else:
+                m = _update_matrix(m, rows, version, meta_version)
+            _matrix = m
+        return m
+
+
+def data_version() -> str:
+    return get_matrix().version
+
+
+def get_available_zips() -> list[str]:
+    return get_matrix().zips.tolist()
 
 
 def get_zip_series(zip_code: str | int) -> np.ndarray:
     """Return monthly ZHVI values as a numpy array for the given ZIP."""
-    df = _load_dataframe()
+    m = get_matrix()
     zip_str = str(zip_code).zfill(5)
-    row = df[df["RegionName"].astype(str).str.zfill(5) == zip_str]
+    i = m.row.get(zip_str)
 
-    if row.empty:
+    if i is None:
         raise ValueError(f"ZIP code {zip_str} not found in ZHVI data")
 
-    date_cols = [c for c in df.columns if c[0:2] in ("19", "20")]
-    values = row[date_cols].values.flatten().astype(float)
-    values = values[~np.isnan(values)]
+    values = m.prices[i, m.start[i]:m.last_valid[i] + 1]
 
     if len(values) < 12:
         raise ValueError(f"Insufficient data for ZIP {zip_str} ({len(values)} months)")
@@ -50,3 +215,181 @@ def get_zip_median(zip_code: str | int) -> float:
     """Return the latest ZHVI value (proxy for ZIP median)."""
     values = get_zip_series(zip_code)
     return float(values[-1])
+
+
+# ---------------------------------------------------------------------------
+# County / metro / state / national aggregates
+# ---------------------------------------------------------------------------
+
+MIN_MONTHS = 12
+
+# Fallback order for ZIPs without a usable series of their own
+AREA_LEVELS = ("county", "metro", "state", "national")
+
+
+@dataclass(frozen=True)
+class AreaSeries:
+    level: str                    # zip | county | metro | state | national
+    name: str
+    values: np.ndarray            # monthly prices, NaN-free
+    mu: float
+    sigma: float
+    median: float                 # latest value
+
+
+@dataclass(frozen=True)
+class Aggregates:
+    series: dict[tuple[str, str], AreaSeries]        # (level, name) → series
+    zip_areas: dict[str, dict[str, str]]             # ZIP → level → name
+    zip3_areas: dict[str, dict[str, str]]            # 3-digit prefix → level → name
+    version: str                                     # ZhviMatrix.version built from
+    meta_version: str
+
+
+def _area_keys(meta: pd.DataFrame) -> dict[str, pd.Series]:
+    keys = {}
+    if "CountyName" in meta and "State" in meta:
+        keys["county"] = meta["CountyName"] + ", " + meta["State"]
+    if "Metro" in meta:
+        keys["metro"] = meta["Metro"]
+    if "State" in meta:
+        keys["state"] = meta["State"]
+    keys["national"] = pd.Series("US", index=meta.index)
+    return keys
+
+
+def _grouped_returns(returns: np.ndarray, valid: np.ndarray, weights: np.ndarray,
+                     codes: np.ndarray, n_groups: int) -> np.ndarray:
+    """Weighted mean of member returns per (group, month); NaN where no member has data."""
+    member = codes >= 0
+    order = np.argsort(codes[member], kind="stable")
+    sorted_codes = codes[member][order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+
+    w = weights[member][order, None]
+    num = np.add.reduceat(np.where(valid, returns, 0.0)[member][order] * w, starts, axis=0)
+    den = np.add.reduceat(valid[member][order] * w, starts, axis=0)
+    out = np.full((n_groups, returns.shape[1]), np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[sorted_codes[starts]] = np.where(den > 0, num / den, np.nan)
+    return out
+
+
+_aggregates: Aggregates | None = None
+
+
+def get_aggregates() -> Aggregates:
+    global _aggregates
+    m = get_matrix()
+    agg = _aggregates
+    if agg is not None and agg.version == m.version:
+        return agg
+    with _lock:
+        agg = _aggregates
+        if agg is None or agg.version != m.version:
+            rows = None
+            if agg is not None and agg.meta_version == m.meta_version:
+                rows = _changed_rows(agg.version, m.version)
+            agg = _aggregates = _build_aggregates(m, agg if rows is not None else None, rows)
+        return agg
+
+
+def _build_aggregates(m: ZhviMatrix, base: Aggregates | None = None,
+                      rows: np.ndarray | None = None) -> Aggregates:
+    """
+    SizeRank-weighted price series for every county, metro, state and the
+    nation, built in one grouped pass per level.
+
+    Each area's series chains the weighted mean of its ZIPs' monthly returns,
+    so ZIPs entering or leaving the index don't cause level jumps, and is
+    scaled to the weighted mean price of its latest month.
+
+    Given the previous `base` (same ZIP set) and the `rows` changed since,
+    only areas containing a changed ZIP are rebuilt.
+    """
+    prices = m.prices
+    # Zipf-style size proxy: the k-th largest ZIP weighs 1/k
+    rank = pd.to_numeric(m.meta.get("SizeRank"), errors="coerce").to_numpy(np.float64)
+    weights = 1.0 / np.where(np.isfinite(rank) & (rank > 0), rank, np.nanmax(rank, initial=1.0))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = prices[:, 1:] / prices[:, :-1] - 1
+    valid = np.isfinite(returns)
+    has_price = ~np.isnan(prices)
+
+    series: dict[tuple[str, str], AreaSeries] = dict(base.series) if base else {}
+    keys = _area_keys(m.meta)
+    for level, key in keys.items():
+        codes, names = pd.factorize(key)
+        groups = np.arange(len(names))
+        if base is not None:
+            groups = np.unique(codes[rows][codes[rows] >= 0])
+            if not len(groups):
+                continue
+            affected = np.zeros(len(names), bool)
+            affected[groups] = True
+            codes = np.where((codes >= 0) & affected[codes], codes, -1)
+        agg_ret = _grouped_returns(returns, valid, weights, codes, len(names))
+        latest = _grouped_returns(np.nan_to_num(prices), has_price, weights, codes, len(names))
+
+        for g in groups:
+            name = names[g]
+            r = agg_ret[g]
+            ok = np.flatnonzero(np.isfinite(r))
+            if len(ok) < MIN_MONTHS - 1:
+                series.pop((level, str(name)), None)
+                continue
+            r = r[ok[0]:ok[-1] + 1]
+            r = np.where(np.isfinite(r), r, 0.0)
+            index = np.cumprod(np.r_[1.0, 1.0 + r])
+            last_level = latest[g, ok[-1] + 1]
+            values = index * (last_level / index[-1])
+            series[(level, str(name))] = AreaSeries(
+                level=level, name=str(name), values=values,
+                mu=float(r.mean()), sigma=float(r.std(ddof=1)),
+                median=float(values[-1]),
+            )
+
+    if base is not None:
+        return Aggregates(series=series, zip_areas=base.zip_areas,
+                          zip3_areas=base.zip3_areas, version=m.version,
+                          meta_version=m.meta_version)
+
+    area_table = pd.DataFrame({lvl: k for lvl, k in keys.items()}).astype(object)
+    area_table = area_table.where(area_table.notna(), None)
+    areas = area_table.to_dict("records")
+    zip_areas = dict(zip(m.zips.tolist(), areas))
+
+    # Unknown ZIPs borrow the areas of the largest known ZIP sharing their prefix
+    by_size = np.argsort(np.where(np.isfinite(rank), rank, np.inf), kind="stable")
+    zip3_areas: dict[str, dict[str, str]] = {}
+    for i in by_size:
+        zip3_areas.setdefault(m.zips[i][:3], areas[i])
+
+    return Aggregates(series=series, zip_areas=zip_areas, zip3_areas=zip3_areas,
+                      version=m.version, meta_version=m.meta_version)
+
+
+def resolve_series(zip_code: str | int) -> AreaSeries:
+    """
+    The ZIP's own series if it has at least MIN_MONTHS of data, otherwise
+    the nearest aggregate (county → metro → state → national). ZIPs absent
+    from ZHVI are placed by their 3-digit prefix.
+    """
+    zip_str = str(zip_code).zfill(5)
+    try:
+        values = get_zip_series(zip_str)
+    except ValueError:
+        pass
+    else:
+        mu, sigma = compute_monthly_stats(values)
+        return AreaSeries("zip", zip_str, values, mu, sigma, float(values[-1]))
+
+    agg = get_aggregates()
+    areas = agg.zip_areas.get(zip_str) or agg.zip3_areas.get(zip_str[:3]) or {}
+    for level in AREA_LEVELS:
+        name = "US" if level == "national" else areas.get(level)
+        found = agg.series.get((level, name)) if name else None
+        if found is not None:
+            return found
+    raise ValueError(f"No ZHVI data available for ZIP {zip_str} or its region")
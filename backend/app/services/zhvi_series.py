@@ -0,0 +1,101 @@
+"""
+Range slicing, downsampling and compact encoding of ZHVI price series.
+
+Series are cut straight out of the in-memory price matrix from
+zhvi_loader, so a request touches only its own row. Missing months are
+dropped from the output and every point carries its date, so gaps are
+visible to the client rather than joined over.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.zhvi_loader import get_matrix
+
+FREQUENCIES = ("monthly", "quarterly", "yearly", "lttb")
+ENCODINGS = ("json", "delta", "float32")
+
+
+def _period_end(dates: pd.DatetimeIndex, freq: str) -> np.ndarray:
+    """Index of the last point in each quarter/year of an ordered series."""
+    if freq == "quarterly":
+        key = dates.year * 4 + (dates.month - 1) // 3
+    else:
+        key = dates.year
+    key = np.asarray(key)
+    return np.flatnonzero(np.r_[key[1:] != key[:-1], True])
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the
+    visual shape of (x, y). Always keeps the first and last point.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # average of the next bucket (or the last point) is the third vertex
+        nlo, nhi = hi, edges[b + 2] if b + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[b + 1] = a
+    return keep
+
+
+def get_series(zip_code: str, start: Optional[date] = None,
+               end: Optional[date] = None, freq: str = "monthly",
+               points: int = 120) -> Optional[tuple[pd.DatetimeIndex, np.ndarray]]:
+    """(dates, values) for a ZIP within [start, end], or None if unknown."""
+    m = get_matrix()
+    i = m.row.get(str(zip_code).zfill(5))
+    if i is None:
+        return None
+
+    lo = 0 if start is None else m.dates.searchsorted(pd.Timestamp(start))
+    hi = len(m.dates) if end is None else m.dates.searchsorted(pd.Timestamp(end), side="right")
+    values = m.prices[i, lo:hi]
+    ok = ~np.isnan(values)
+    dates, values = m.dates[lo:hi][ok], values[ok]
+
+    if freq in ("quarterly", "yearly") and len(values):
+        idx = _period_end(dates, freq)
+    elif freq == "lttb":
+        idx = lttb(np.arange(len(values), dtype=np.float64), values, points)
+    else:
+        return dates, values
+    return dates[idx], values[idx]
+
+
+def encode_values(values: np.ndarray, encoding: str):
+    """
+    json    → list of floats (cents)
+    delta   → whole dollars: first value, then month-over-month differences
+    float32 → base64 of little-endian float32
+    """
+    if encoding == "delta":
+        dollars = np.rint(values).astype(np.int64)
+        return np.diff(dollars, prepend=0).tolist()
+    if encoding == "float32":
+        return base64.b64encode(values.astype("<f4").tobytes()).decode("ascii")
+    return np.round(values, 2).tolist()
+
+
+def series_etag(*parts) -> str:
+    """Weak ETag over the data version and the request parameters."""
+    payload = "|".join(map(str, (get_matrix().version, *parts)))
+    return 'W/"' + hashlib.sha1(payload.encode()).hexdigest()[:20] + '"'
@@ -0,0 +1,183 @@
+"""
+Shared async client for the Zillow (RapidAPI) search proxy.
+
+One connection-pooled ``httpx.AsyncClient`` is reused across requests, so
+searches skip the TCP/TLS handshake and multiplex over HTTP/2 when ``h2``
+is installed. Upstream 429/5xx responses and transport errors are retried
+with exponential backoff (honouring ``Retry-After``). The base URL comes
+from config, so tests can point it at a local stub server.
+
+Search results are cached per normalized (location, listing_status, page)
+with stale-while-revalidate (app.services.cache), and concurrent misses or
+refreshes for the same key share one upstream call (app.services.singleflight).
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import re
+from typing import Optional
+
+import httpx
+
+from app.core.config import (
+    RAPIDAPI_KEY,
+    REDIS_URL,
+    ZILLOW_BACKOFF_BASE,
+    ZILLOW_BASE_URL,
+    ZILLOW_CACHE_BACKEND,
+    ZILLOW_CACHE_MAX_ENTRIES,
+    ZILLOW_CACHE_STALE_TTL,
+    ZILLOW_CACHE_TTL,
+    ZILLOW_CONNECT_TIMEOUT,
+    ZILLOW_HTTP2,
+    ZILLOW_MAX_CONNECTIONS,
+    ZILLOW_MAX_RETRIES,
+    ZILLOW_READ_TIMEOUT,
+)
+from app.services.cache import SWRCache, make_backend
+from app.services.singleflight import SingleFlight
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Never wait longer than this between attempts, whatever Retry-After says
+MAX_BACKOFF_SECONDS = 8.0
+
+_client: Optional[httpx.AsyncClient] = None
+
+search_cache = SWRCache(
+    make_backend(ZILLOW_CACHE_BACKEND, ZILLOW_CACHE_MAX_ENTRIES, REDIS_URL, "zillow:search:"),
+    ttl=ZILLOW_CACHE_TTL,
+    stale_ttl=ZILLOW_CACHE_STALE_TTL,
+)
+search_flight = SingleFlight()
+
+# HTTP requests actually sent upstream, including retries
+request_stats = {"requests": 0, "retries": 0, "errors": 0}
+
+_SPACE = re.compile(r"\s+")
+_COMMA = re.compile(r"\s*,\s*")
+
+
+class ZillowError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_client(base_url: str = ZILLOW_BASE_URL,
+                 transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    host = httpx.URL(base_url).host
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers={"X-RapidAPI-Key": RAPIDAPI_KEY, "X-RapidAPI-Host": host},
+        timeout=httpx.Timeout(ZILLOW_READ_TIMEOUT, connect=ZILLOW_CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=ZILLOW_MAX_CONNECTIONS,
+                            max_keepalive_connections=ZILLOW_MAX_CONNECTIONS,
+                            keepalive_expiry=60),
+        http2=ZILLOW_HTTP2 and _http2_available(),
+        transport=transport,
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_client()
+    return _client
+
+
+def set_client(client: Optional[httpx.AsyncClient]):
+    """Swap the shared client (e.g. for one bound to a stub server)."""
+    global _client
+    _client = client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _backoff(attempt: int, response: Optional[httpx.Response]) -> float:
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        except ValueError:
+            pass
+    delay = ZILLOW_BACKOFF_BASE * 2 ** attempt
+    return min(delay + random.uniform(0, delay / 2), MAX_BACKOFF_SECONDS)
+
+
+async def zillow_get(path: str, params: dict) -> dict:
+    """GET an upstream path with retries; returns the decoded JSON body."""
+    client = get_client()
+    for attempt in range(ZILLOW_MAX_RETRIES + 1):
+        response = None
+        request_stats["requests"] += 1
+        request_stats["retries"] += attempt > 0
+        try:
+            response = await client.get(path, params=params)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            if attempt == ZILLOW_MAX_RETRIES:
+                request_stats["errors"] += 1
+                raise ZillowError(504 if isinstance(e, httpx.TimeoutException) else 502,
+                                  f"Zillow upstream unreachable: {e!r}")
+        else:
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code not in RETRY_STATUSES or attempt == ZILLOW_MAX_RETRIES:
+                request_stats["errors"] += 1
+                raise ZillowError(response.status_code, response.text)
+        await asyncio.sleep(_backoff(attempt, response))
+
+
+def normalize_search(location: str, listing_status: str, page: int) -> tuple[str, str, int]:
+    """Canonical form of a search, so "irvine,  CA" and "Irvine, CA" share a cache entry."""
+    location = _COMMA.sub(", ", _SPACE.sub(" ", location)).strip().lower()
+    return location, listing_status.strip().lower(), int(page)
+
+
+def search_key(location: str, listing_status: str, page: int) -> str:
+    return "|".join(map(str, normalize_search(location, listing_status, page)))
+
+
+async def search_by_address(location: str, listing_status: str, page: int) -> list[dict]:
+    """Cached search; a stale entry is returned at once and refreshed in the background."""
+    key = search_key(location, listing_status, page)
+    return await search_cache.get_or_fetch(
+        key,
+        lambda: search_flight.do(key, lambda: fetch_search(location, listing_status, page)),
+    )
+
+
+def cache_stats() -> dict:
+    return {
+        "cache": search_cache.stats.snapshot(),
+        "coalescing": search_flight.stats.snapshot(),
+        "upstream": dict(request_stats),
+    }
+
+
+async def fetch_search(location: str, listing_status: str, page: int) -> list[dict]:
+    data = await zillow_get(
+        "/search/byaddress",
+        {"location": location, "listingStatus": listing_status, "page": page},
+    )
+    # Zillow wraps actual properties here
+    return [
+        r["property"]
+        for r in data.get("searchResults", [])
+        if "property" in r
+    ]
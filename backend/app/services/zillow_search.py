@@ -0,0 +1,189 @@
+"""
+Multi-page Zillow search, fetched concurrently and merged server-side.
+
+Pages go through the cached, coalesced ``search_by_address``, at most
+``concurrency`` at a time in a sliding window, and each page's new listings
+(deduplicated by zpid) are yielded as soon as that page lands, so the whole
+range takes about as long as its slowest page rather than the sum of all of
+them.
+
+Listings are projected from Zillow's raw ``property`` dict down to the
+PropertiesCreate fields (the same mapping as the frontend's
+mapZillowToPropertyCard).
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Optional
+
+from app.services.zillow_client import ZillowError, search_by_address
+
+# Upper bound on pages fetched by one "until N results" request
+MAX_PAGES = 20
+
+
+def _get(d: Any, *path: Any) -> Any:
+    for key in path:
+        if isinstance(d, dict):
+            d = d.get(key)
+        elif isinstance(d, list) and isinstance(key, int):
+            d = d[key] if -len(d) <= key < len(d) else None
+        else:
+            return None
+    return d
+
+
+def _timestamp(value: Any) -> Optional[str]:
+    """Zillow sends epoch milliseconds or ISO strings; normalize to ISO 8601."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc).isoformat()
+    return str(value)
+
+
+def project_property(p: dict) -> dict:
+    """Raw Zillow search ``property`` → PropertiesCreate fields (minus user_id/liked)."""
+    return {
+        "zpid": p.get("zpid"),
+
+        # Address
+        "street_address": _get(p, "address", "streetAddress"),
+        "city": _get(p, "address", "city"),
+        "state": _get(p, "address", "state"),
+        "zip_code": _get(p, "address", "zipcode"),
+
+        # Coordinates
+        "latitude": _get(p, "location", "latitude"),
+        "longitude": _get(p, "location", "longitude"),
+
+        # Listing info
+        "price": _get(p, "price", "value"),
+        "price_per_sqft": _get(p, "price", "pricePerSquareFoot"),
+        "price_change": _get(p, "price", "priceChange"),
+        "price_changed_date": _timestamp(_get(p, "price", "changedDate")),
+        "listing_status": _get(p, "listing", "listingStatus"),
+        "days_on_zillow": p.get("daysOnZillow"),
+        "listing_date": _timestamp(p.get("listingDateTimeOnZillow")),
+
+        # Property details
+        "property_type": p.get("propertyType"),
+        "beds": p.get("bedrooms"),
+        "baths": p.get("bathrooms"),
+        "sqft": p.get("livingArea"),
+        "lot_size": _get(p, "lotSizeWithUnit", "lotSize"),
+        "lot_size_unit": _get(p, "lotSizeWithUnit", "lotSizeUnit"),
+        "year_built": p.get("yearBuilt"),
+        "is_new_construction": _get(p, "listing", "listingSubType", "isNewConstruction"),
+
+        # Estimates
+        "zestimate": _get(p, "estimates", "zestimate"),
+        "rent_zestimate": _get(p, "estimates", "rentZestimate"),
+
+        # Tax
+        "tax_assessed_value": _get(p, "taxAssessment", "taxAssessedValue"),
+        "tax_assessment_year": _get(p, "taxAssessment", "taxAssessmentYear"),
+
+        # Media flags
+        "has_vr_model": _get(p, "media", "hasVRModel"),
+        "has_videos": _get(p, "media", "hasVideos"),
+        "has_floor_plan": p.get("hasFloorPlan"),
+        "is_showcase_listing": p.get("isShowcaseListing"),
+
+        # Open house
+        "open_house_start": _timestamp(_get(p, "openHouseShowingList", 0, "startTime")),
+        "open_house_end": _timestamp(_get(p, "openHouseShowingList", 0, "endTime")),
+
+        # Broker
+        "broker_name": _get(p, "propertyDisplayRules", "mls", "brokerName"),
+
+        # Thumbnail
+        "photo_url": _get(p, "media", "propertyPhotoLinks", "highResolutionLink"),
+    }
+
+
+async def iter_search_pages(
+    location: str,
+    listing_status: str,
+    start_page: int,
+    end_page: Optional[int] = None,
+    max_results: Optional[int] = None,
+    concurrency: int = 5,
+) -> AsyncIterator[dict]:
+    """
+    Yield one event per page as it completes:
+      {"page", "results": [new projected listings]}  or  {"page", "error"}
+
+    Without `end_page`, pages are fetched until `max_results` unique listings
+    are collected, a page comes back empty, or MAX_PAGES pages were tried.
+    """
+    last_page = end_page if end_page is not None else start_page + MAX_PAGES - 1
+    seen: set = set()
+    count = 0
+    pending: dict[asyncio.Task, int] = {}
+    next_page = start_page
+    exhausted = False  # an empty page was seen; later pages are empty too
+
+    def launch():
+        nonlocal next_page
+        while len(pending) < concurrency and next_page <= last_page and not exhausted:
+            task = asyncio.ensure_future(search_by_address(location, listing_status, next_page))
+            pending[task] = next_page
+            next_page += 1
+
+    launch()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=pending.__getitem__):
+                page = pending.pop(task)
+                try:
+                    raw = task.result()
+                except ZillowError as e:
+                    yield {"page": page, "error": {"status_code": e.status_code, "detail": e.detail}}
+                    continue
+
+                if not raw and end_page is None:
+                    exhausted = True
+                fresh = []
+                for prop in raw:
+                    zpid = prop.get("zpid")
+                    if zpid is not None:
+                        if zpid in seen:
+                            continue
+                        seen.add(zpid)
+                    fresh.append(project_property(prop))
+                if max_results is not None:
+                    fresh = fresh[:max_results - count]
+                count += len(fresh)
+                yield {"page": page, "results": fresh}
+
+                if max_results is not None and count >= max_results:
+                    return
+            launch()
+    finally:
+        # Target reached (or the client went away): drop pages still in flight
+        for task in pending:
+            task.cancel()
+
+
+async def stream_search(
+    location: str,
+    listing_status: str,
+    start_page: int,
+    end_page: Optional[int] = None,
+    max_results: Optional[int] = None,
+    concurrency: int = 5,
+) -> AsyncIterator[dict]:
+    """`iter_search_pages` followed by the {"done": True, ...} summary event."""
+    count, pages, failed = 0, [], []
+    async for event in iter_search_pages(location, listing_status, start_page,
+                                         end_page, max_results, concurrency):
+        if "error" in event:
+            failed.append(event["page"])
+        else:
+            pages.append(event["page"])
+            count += len(event["results"])
+        yield event
+    yield {"done": True, "count": count, "pages": sorted(pages), "failed": sorted(failed)}
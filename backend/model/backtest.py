@@ -0,0 +1,216 @@
+"""
+Walk-forward Backtest for the Appreciation Model
+=================================================
+For every cutoff month, trains on the rows whose 12-month target was already
+known at the cutoff, then scores the following 12 months in one batched
+predict. Folds run in parallel across a process pool and reuse previously
+trained fold models when the data, params and cutoff are unchanged.
+
+Features are computed once (via the stage cache) and every fold is a pair
+of contiguous row slices of the month-ordered training table. Errors are
+reduced inside each worker with bincount, so only small per-month and
+per-state tables cross process boundaries.
+
+Outputs (under output/backtest/):
+  by_month_<model>.csv   cutoff × scored month: n, MAE, RMSE, bias
+  by_state_<model>.csv   cutoff × state:        n, MAE, RMSE, bias
+
+Usage:
+  python model/backtest.py --model xgb --step 3 --params output/best_params_xgb.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import trainedmodel as tm
+from hyperparam_search import SHARED, TRAINERS, init_worker, share_arrays
+from stage_cache import StageCache
+
+DEFAULT_PARAMS = {"xgb": tm.XGB_PARAMS, "rf": tm.RF_PARAMS}
+
+
+def _group_errors(err: np.ndarray, groups: np.ndarray, n_groups: int) -> dict:
+    """n / sum(err) / sum(|err|) / sum(err²) per group, via bincount."""
+    return {
+        "n": np.bincount(groups, minlength=n_groups),
+        "sum": np.bincount(groups, weights=err, minlength=n_groups),
+        "abs": np.bincount(groups, weights=np.abs(err), minlength=n_groups),
+        "sq": np.bincount(groups, weights=err * err, minlength=n_groups),
+    }
+
+
+def _run_fold(model_kind: str, params: dict, cutoff: int,
+              train_rows: tuple[int, int], test_rows: tuple[int, int],
+              n_states: int, model_path: str, threads: int) -> dict:
+    X, y = SHARED["X"], SHARED["y"]
+    (tr_lo, tr_hi), (te_lo, te_hi) = train_rows, test_rows
+
+    t0 = time.time()
+    if os.path.exists(model_path):
+        model, reused = joblib.load(model_path), True
+    else:
+        X_train, y_train = tm.subsample(X[tr_lo:tr_hi], y[tr_lo:tr_hi])
+        model = TRAINERS[model_kind](X_train, y_train, **{**params, "n_jobs": threads})
+        joblib.dump(model, model_path)
+        reused = False
+    fit_s = time.time() - t0
+
+    t0 = time.time()
+    err = model.predict(X[te_lo:te_hi]).astype(np.float64) - y[te_lo:te_hi]
+    predict_s = time.time() - t0
+
+    offsets = SHARED["month_idx"][te_lo:te_hi] - cutoff
+    states = SHARED["zip_state"][SHARED["zip_idx"][te_lo:te_hi]]
+    return {
+        "cutoff": cutoff,
+        "n_train": tr_hi - tr_lo,
+        "reused": reused,
+        "fit_s": fit_s,
+        "predict_s": predict_s,
+        "by_month": _group_errors(err, offsets, tm.FORWARD_HORIZON),
+        "by_state": _group_errors(err, states, n_states),
+    }
+
+
+def _to_frame(groups: dict, **cols) -> pd.DataFrame:
+    n = groups["n"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df = pd.DataFrame({
+            **cols,
+            "n": n,
+            "mae": groups["abs"] / n,
+            "rmse": np.sqrt(groups["sq"] / n),
+            "bias": groups["sum"] / n,
+        })
+    return df[df["n"] > 0]
+
+
+def backtest_cutoffs(table: tm.TrainingTable, step: int, start: int | None,
+                     min_train_months: int) -> list[int]:
+    """Cutoff month indices whose 12-month scoring window has labels."""
+    first, last = int(table.month_idx[0]), int(table.month_idx[-1])
+    earliest = first + min_train_months + tm.FORWARD_HORIZON
+    start = earliest if start is None else max(start, earliest)
+    return list(range(start, last + 1, step))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--data", default=tm.DATA_PATH, help="wide-format ZHVI CSV")
+    parser.add_argument("--model", choices=sorted(TRAINERS), default="xgb")
+    parser.add_argument("--params", help="JSON file of params (e.g. best_params_xgb.json)")
+    parser.add_argument("--start", help="first cutoff month (YYYY-MM-DD)")
+    parser.add_argument("--step", type=int, default=1, help="months between cutoffs")
+    parser.add_argument("--min-train-months", type=int, default=36)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--threads-per-worker", type=int, default=2)
+    parser.add_argument("--float32", action="store_true")
+    parser.add_argument("--force-recompute", action="store_true",
+                        help="ignore cached stages and cached fold models")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    dtype = np.float32 if args.float32 else np.float64
+    t_start = time.time()
+    backtest_dir = os.path.join(tm.MODEL_DIR, "backtest")
+    fold_model_dir = os.path.join(backtest_dir, "models")
+    os.makedirs(fold_model_dir, exist_ok=True)
+
+    cache = StageCache(tm.CACHE_DIR, force=args.force_recompute)
+    meta, _, _, dates, table = tm.prepare_data(cache, args.data, dtype)
+
+    params = dict(DEFAULT_PARAMS[args.model])
+    if args.params:
+        with open(args.params) as f:
+            loaded = json.load(f)
+        params.update(loaded.get("params", loaded))
+
+    state_codes, state_names = pd.factorize(meta["State"].fillna("??"))
+    start = None if args.start is None else int(
+        dates.searchsorted(pd.Timestamp(args.start)))
+    cutoffs = backtest_cutoffs(table, args.step, start, args.min_train_months)
+    if not cutoffs:
+        raise SystemExit("[backtest] not enough history for a single cutoff")
+
+    base_key = StageCache.key(cache.last_keys.get("build_table"), args.model,
+                              json.dumps(params, sort_keys=True), tm.MAX_TRAIN)
+    print(f"[backtest] {len(cutoffs)} cutoffs "
+          f"{dates[cutoffs[0]].strftime('%Y-%m')} … {dates[cutoffs[-1]].strftime('%Y-%m')} "
+          f"on {args.workers} workers × {args.threads_per_worker} threads")
+
+    by_month, by_state = [], []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = share_arrays({
+            "X": table.X, "y": table.y,
+            "zip_idx": table.zip_idx, "month_idx": table.month_idx,
+            "zip_state": state_codes.astype(np.int32),
+        }, tmpdir)
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(paths,),
+        ) as pool:
+            futures = []
+            for c in cutoffs:
+                model_path = os.path.join(
+                    fold_model_dir, f"{args.model}-{StageCache.key(base_key, c)}.joblib")
+                if args.force_recompute and os.path.exists(model_path):
+                    os.remove(model_path)
+                futures.append(pool.submit(
+                    _run_fold, args.model, params, c,
+                    table.row_bounds(stop_month=c - tm.FORWARD_HORIZON),
+                    table.row_bounds(c, c + tm.FORWARD_HORIZON),
+                    len(state_names), model_path, args.threads_per_worker,
+                ))
+
+            for i, fut in enumerate(as_completed(futures), 1):
+                r = fut.result()
+                cutoff = dates[r["cutoff"]]
+                m = _to_frame(r["by_month"], cutoff=cutoff,
+                              horizon=np.arange(tm.FORWARD_HORIZON) + 1)
+                m.insert(1, "month", dates[r["cutoff"] + m["horizon"].to_numpy() - 1])
+                by_month.append(m)
+                by_state.append(_to_frame(r["by_state"], cutoff=cutoff,
+                                          state=np.asarray(state_names)))
+                total = m["n"].sum()
+                print(f"[backtest] cutoff {cutoff.strftime('%Y-%m')}: "
+                      f"MAE {(m['mae'] * m['n']).sum() / total:.5f} on {total:,} rows "
+                      f"({'reused' if r['reused'] else 'trained'} in {r['fit_s']:.1f}s, "
+                      f"predict {r['predict_s']:.2f}s) [{i}/{len(cutoffs)}]")
+
+    by_month = pd.concat(by_month).sort_values(["cutoff", "horizon"])
+    by_state = pd.concat(by_state).sort_values(["cutoff", "state"])
+    month_path = os.path.join(backtest_dir, f"by_month_{args.model}.csv")
+    state_path = os.path.join(backtest_dir, f"by_state_{args.model}.csv")
+    by_month.to_csv(month_path, index=False)
+    by_state.to_csv(state_path, index=False)
+    print(f"[saved] {month_path}")
+    print(f"[saved] {state_path}")
+
+    yearly = by_month.assign(year=by_month["cutoff"].dt.year).groupby("year").apply(
+        lambda g: pd.Series({"mae": (g["mae"] * g["n"]).sum() / g["n"].sum(),
+                             "bias": (g["bias"] * g["n"]).sum() / g["n"].sum()}),
+        include_groups=False,
+    )
+    print(f"\n{'=' * 50}")
+    print("  Backtest error by cutoff year")
+    print(f"{'=' * 50}")
+    print(yearly.to_string())
+
+    print(f"\n✓ Backtest complete in {time.time() - t_start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
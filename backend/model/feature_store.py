@@ -0,0 +1,182 @@
+"""
+On-disk monthly feature store for the appreciation pipeline.
+
+Layout under ``root``:
+
+  manifest.json          months, labelled months, feature names, dtype, and
+                         the model the rankings are served from
+  meta.csv               ZIP metadata; row order defines the store's ZIP axis
+  features/<date>.npy    (n_zips_at_write, n_features) feature rows for a month
+  target/<date>.npy      (n_zips_at_write,) 12-month forward target, written
+                         once that month's target is known
+
+ZIPs are only ever appended, so a month written earlier may hold fewer rows
+than the current ZIP axis; reads pad those rows with NaN.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+STORE_VERSION = 1
+
+
+def _month_key(date) -> str:
+    return pd.Timestamp(date).strftime("%Y-%m-%d")
+
+
+def _atomic_save(path: str, arr: np.ndarray):
+    tmp = path + ".tmp.npy"
+    np.save(tmp, arr)
+    os.replace(tmp, path)
+
+
+class FeatureStore:
+    def __init__(self, root: str):
+        self.root = root
+        self._manifest: dict | None = None
+        self._meta: pd.DataFrame | None = None
+
+    # --- manifest -------------------------------------------------------------
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.root, "manifest.json")
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    @property
+    def manifest(self) -> dict:
+        if self._manifest is None:
+            with open(self.manifest_path) as f:
+                self._manifest = json.load(f)
+            if self._manifest.get("version") != STORE_VERSION:
+                raise ValueError(
+                    f"Feature store at {self.root} is version "
+                    f"{self._manifest.get('version')}, expected {STORE_VERSION}"
+                )
+        return self._manifest
+
+    def create(self, meta: pd.DataFrame, feature_cols: list[str], dtype,
+               model: str | None = None):
+        """Start an empty store (any existing months are discarded)."""
+        os.makedirs(os.path.join(self.root, "features"), exist_ok=True)
+        os.makedirs(os.path.join(self.root, "target"), exist_ok=True)
+        for sub in ("features", "target"):
+            for name in os.listdir(os.path.join(self.root, sub)):
+                os.remove(os.path.join(self.root, sub, name))
+        self._manifest = {
+            "version": STORE_VERSION,
+            "feature_cols": list(feature_cols),
+            "dtype": np.dtype(dtype).name,
+            "months": [],
+            "labelled_months": [],
+            "model": model,
+        }
+        self.write_meta(meta)
+        self.save_manifest()
+
+    def save_manifest(self):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self.manifest["dtype"])
+
+    @property
+    def model(self) -> str | None:
+        """Name of the model the full run ranked ZIPs with (e.g. "XGBoost")."""
+        return self.manifest.get("model")
+
+    @model.setter
+    def model(self, name: str):
+        self.manifest["model"] = name
+        self.save_manifest()
+
+    @property
+    def months(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(pd.to_datetime(self.manifest["months"]))
+
+    @property
+    def labelled_months(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(pd.to_datetime(self.manifest["labelled_months"]))
+
+    # --- ZIP axis -------------------------------------------------------------
+
+    @property
+    def meta(self) -> pd.DataFrame:
+        if self._meta is None:
+            self._meta = pd.read_csv(os.path.join(self.root, "meta.csv"))
+        return self._meta
+
+    @property
+    def n_zips(self) -> int:
+        return len(self.meta)
+
+    def write_meta(self, meta: pd.DataFrame):
+        self._meta = meta.reset_index(drop=True)
+        self._meta.to_csv(os.path.join(self.root, "meta.csv"), index=False)
+
+    def align_zips(self, meta: pd.DataFrame) -> np.ndarray:
+        """
+        Map each row of `meta` to its position on the store's ZIP axis,
+        appending ZIPs the store has not seen before. Returns the positions.
+        """
+        known = self.meta["RegionName"].astype(str).str.zfill(5)
+        pos = pd.Series(np.arange(len(known)), index=known.values)
+        incoming = meta["RegionName"].astype(str).str.zfill(5)
+        rows = incoming.map(pos)
+
+        unseen = rows.isna().to_numpy()
+        if unseen.any():
+            added = meta.loc[unseen, self.meta.columns]
+            rows[unseen] = np.arange(self.n_zips, self.n_zips + unseen.sum())
+            self.write_meta(pd.concat([self.meta, added], ignore_index=True))
+        return rows.to_numpy(dtype=np.int64)
+
+    # --- monthly chunks -------------------------------------------------------
+
+    def _path(self, kind: str, date) -> str:
+        return os.path.join(self.root, kind, f"{_month_key(date)}.npy")
+
+    def write_month(self, date, features: np.ndarray):
+        """Write one month's (n_zips, n_features) feature rows."""
+        key = _month_key(date)
+        _atomic_save(self._path("features", date), features.astype(self.dtype))
+        if key not in self.manifest["months"]:
+            self.manifest["months"].append(key)
+            self.manifest["months"].sort()
+
+    def write_target(self, date, target: np.ndarray):
+        """Record the now-known forward target for a month already in the store."""
+        key = _month_key(date)
+        if key not in self.manifest["months"]:
+            raise ValueError(f"Month {key} has no features in the store")
+        _atomic_save(self._path("target", date), target.astype(self.dtype))
+        if key not in self.manifest["labelled_months"]:
+            self.manifest["labelled_months"].append(key)
+            self.manifest["labelled_months"].sort()
+
+    def _read(self, kind: str, months, width: int | None) -> np.ndarray:
+        shape = (self.n_zips, len(months)) + ((width,) if width else ())
+        out = np.full(shape, np.nan, dtype=self.dtype)
+        for j, date in enumerate(months):
+            chunk = np.load(self._path(kind, date), mmap_mode="r")
+            out[: chunk.shape[0], j] = chunk
+        return out
+
+    def read_features(self, months=None) -> np.ndarray:
+        """(n_zips, len(months), n_features) tensor; defaults to all months."""
+        months = self.months if months is None else months
+        return self._read("features", months, len(self.manifest["feature_cols"]))
+
+    def read_target(self, months=None) -> np.ndarray:
+        """(n_zips, len(months)) targets; months must be labelled."""
+        months = self.labelled_months if months is None else months
+        return self._read("target", months, None)
@@ -0,0 +1,279 @@
+"""
+Walk-forward Cross-Validation + Hyperparameter Search
+======================================================
+Scores every hyperparameter candidate for XGBoost or RandomForest on a set
+of walk-forward folds, running (candidate, fold) fits across a process pool.
+
+The training table comes from trainedmodel.prepare_data (stage-cached), and
+workers open its arrays memory-mapped from disk rather than receiving
+pickled copies. Because the table is month-ordered, every fold is a pair of
+contiguous row slices.
+
+Usage:
+  python model/hyperparam_search.py --model xgb --search random --n-iter 12
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+import trainedmodel as tm
+from stage_cache import StageCache
+
+XGB_GRID = {
+    "max_depth": [4, 6, 8],
+    "learning_rate": [0.05, 0.08, 0.15],
+    "n_estimators": [200, 400],
+    "subsample": [0.7, 0.9],
+    "min_child_weight": [1, 10],
+}
+
+RF_GRID = {
+    "n_estimators": [100, 200],
+    "max_depth": [8, 10, 14],
+    "min_samples_leaf": [10, 30, 100],
+    "max_features": [0.5, 1.0],
+}
+
+TRAINERS = {"xgb": tm.train_xgb, "rf": tm.train_rf}
+GRIDS = {"xgb": XGB_GRID, "rf": RF_GRID}
+MODEL_NAMES = {"xgb": "XGBoost", "rf": "RandomForest"}
+
+
+# ---------------------------------------------------------------------------
+# FOLDS + CANDIDATES
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Fold:
+    index: int
+    cutoff: pd.Timestamp       # first test month
+    train_rows: tuple[int, int]
+    test_rows: tuple[int, int]
+
+
+def walk_forward_folds(table: tm.TrainingTable, dates: pd.DatetimeIndex,
+                       n_folds: int, test_months: int = 12, step: int = 12,
+                       embargo: int = tm.FORWARD_HORIZON) -> list[Fold]:
+    """
+    Expanding-window folds ending at the last labelled month. Each fold
+    tests on `test_months` months and trains on everything ending `embargo`
+    months before them, so no training target overlaps the test period.
+    """
+    last = int(table.month_idx[-1])
+    folds = []
+    for k in range(n_folds):
+        test_start = last + 1 - test_months - k * step
+        train_stop = test_start - embargo
+        if train_stop <= int(table.month_idx[0]):
+            break
+        train_rows = table.row_bounds(stop_month=train_stop)
+        test_rows = table.row_bounds(test_start, test_start + test_months)
+        folds.append(Fold(0, dates[test_start], train_rows, test_rows))
+
+    folds.reverse()
+    for i, fold in enumerate(folds):
+        fold.index = i
+    return folds
+
+
+def param_candidates(grid: dict, search: str, n_iter: int,
+                     seed: int = 42) -> list[dict]:
+    """Full grid, or `n_iter` distinct random draws from it."""
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    if search == "random" and n_iter < len(combos):
+        combos = random.Random(seed).sample(combos, n_iter)
+    return combos
+
+
+# ---------------------------------------------------------------------------
+# WORKERS  (arrays shared through memory-mapped .npy files)
+# ---------------------------------------------------------------------------
+
+SHARED: dict[str, np.ndarray] = {}
+
+
+def share_arrays(arrays: dict[str, np.ndarray], tmpdir: str) -> dict[str, str]:
+    """
+    Paths of .npy files holding `arrays`. Stage-cache memmaps are reused
+    in place; anything else is written once to `tmpdir`.
+    """
+    paths = {}
+    for name, arr in arrays.items():
+        path = getattr(arr, "filename", None)
+        if path and np.load(path, mmap_mode="r").shape == arr.shape:
+            paths[name] = path
+            continue
+        paths[name] = os.path.join(tmpdir, f"{name}.npy")
+        np.save(paths[name], arr)
+    return paths
+
+
+def init_worker(paths: dict[str, str]):
+    """Process-pool initializer: map the `share_arrays` files into SHARED."""
+    for name, path in paths.items():
+        SHARED[name] = np.load(path, mmap_mode="r")
+
+
+def _run_fold(model_kind: str, cand_id: int, params: dict, fold: Fold,
+              threads: int) -> dict:
+    X, y = SHARED["X"], SHARED["y"]
+    (tr_lo, tr_hi), (te_lo, te_hi) = fold.train_rows, fold.test_rows
+
+    X_train, y_train = tm.subsample(X[tr_lo:tr_hi], y[tr_lo:tr_hi])
+    t0 = time.time()
+    model = TRAINERS[model_kind](X_train, y_train, **params, n_jobs=threads)
+    fit_s = time.time() - t0
+
+    t0 = time.time()
+    y_test = np.asarray(y[te_lo:te_hi])
+    preds = model.predict(X[te_lo:te_hi])
+    predict_s = time.time() - t0
+
+    return {
+        "candidate": cand_id,
+        "fold": fold.index,
+        "cutoff": fold.cutoff.strftime("%Y-%m-%d"),
+        "n_train": X_train.shape[0],
+        "n_test": te_hi - te_lo,
+        "mae": mean_absolute_error(y_test, preds),
+        "rmse": float(np.sqrt(mean_squared_error(y_test, preds))),
+        "r2": r2_score(y_test, preds),
+        "fit_s": round(fit_s, 2),
+        "predict_s": round(predict_s, 2),
+    }
+
+
+def run_search(model_kind: str, table: tm.TrainingTable, folds: list[Fold],
+               candidates: list[dict], workers: int, threads: int) -> pd.DataFrame:
+    tasks = [(c, f) for c in range(len(candidates)) for f in folds]
+    print(f"[search] {len(candidates)} candidates × {len(folds)} folds = "
+          f"{len(tasks)} fits on {workers} workers × {threads} threads")
+
+    results = []
+    t0 = time.time()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = share_arrays({"X": table.X, "y": table.y}, tmpdir)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(paths,),
+        ) as pool:
+            futures = [
+                pool.submit(_run_fold, model_kind, c, candidates[c], fold, threads)
+                for c, fold in tasks
+            ]
+            for fut in as_completed(futures):
+                r = fut.result()
+                results.append(r)
+                print(f"[cv] cand {r['candidate']:>3} fold {r['fold']} "
+                      f"(test ≥ {r['cutoff']}): R² {r['r2']:.4f}  "
+                      f"RMSE {r['rmse']:.5f}  MAE {r['mae']:.5f}  "
+                      f"fit {r['fit_s']:.1f}s  [{len(results)}/{len(tasks)}]")
+
+    print(f"[search] done ({time.time() - t0:.1f}s)")
+    df = pd.DataFrame(results).sort_values(["candidate", "fold"])
+    df["params"] = df["candidate"].map(lambda c: json.dumps(candidates[c]))
+    return df.reset_index(drop=True)
+
+
+# ---------------------------------------------------------------------------
+# MAIN
+# ---------------------------------------------------------------------------
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--data", default=tm.DATA_PATH, help="wide-format ZHVI CSV")
+    parser.add_argument("--model", choices=sorted(TRAINERS), default="xgb")
+    parser.add_argument("--search", choices=["grid", "random"], default="random")
+    parser.add_argument("--n-iter", type=int, default=12,
+                        help="candidates drawn for --search random")
+    parser.add_argument("--folds", type=int, default=4)
+    parser.add_argument("--test-months", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--threads-per-worker", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--float32", action="store_true")
+    parser.add_argument("--force-recompute", action="store_true",
+                        help="ignore cached load/feature/table stages")
+    parser.add_argument("--no-export", action="store_true",
+                        help="only report CV scores; don't refit or save a model")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    dtype = np.float32 if args.float32 else np.float64
+    t_start = time.time()
+    os.makedirs(tm.MODEL_DIR, exist_ok=True)
+
+    cache = StageCache(tm.CACHE_DIR, force=args.force_recompute)
+    meta, features, _, dates, table = tm.prepare_data(cache, args.data, dtype)
+
+    folds = walk_forward_folds(table, dates, args.folds, test_months=args.test_months)
+    if not folds:
+        raise SystemExit("[search] not enough history for a single walk-forward fold")
+    candidates = param_candidates(GRIDS[args.model], args.search, args.n_iter, args.seed)
+
+    results = run_search(args.model, table, folds, candidates,
+                         args.workers, args.threads_per_worker)
+    results_path = os.path.join(tm.MODEL_DIR, f"cv_results_{args.model}.csv")
+    results.to_csv(results_path, index=False)
+    print(f"[saved] {results_path}")
+
+    summary = (
+        results.groupby(["candidate", "params"])
+        .agg(r2=("r2", "mean"), r2_std=("r2", "std"), rmse=("rmse", "mean"),
+             mae=("mae", "mean"), fit_s=("fit_s", "sum"))
+        .sort_values("r2", ascending=False)
+        .reset_index()
+    )
+    print(f"\n{'=' * 50}")
+    print(f"  Top candidates ({args.model}, mean over {len(folds)} folds)")
+    print(f"{'=' * 50}")
+    print(summary.head(10).to_string(index=False))
+
+    if args.no_export:
+        return
+
+    best = candidates[int(summary.loc[0, "candidate"])]
+    print(f"\n★ Best params: {best}")
+
+    # --- refit on every labelled row and export alongside the main pipeline ---
+    X_all, y_all = tm.subsample(table.X, table.y)
+    model = TRAINERS[args.model](X_all, y_all, **best)
+
+    model_path = os.path.join(tm.MODEL_DIR, tm.RANKING_MODEL_FILES[MODEL_NAMES[args.model]])
+    joblib.dump(model, model_path)
+    params_path = os.path.join(tm.MODEL_DIR, f"best_params_{args.model}.json")
+    with open(params_path, "w") as f:
+        json.dump({"params": best, "cv": summary.loc[0, ["r2", "rmse", "mae"]].to_dict()},
+                  f, indent=2)
+    print(f"[saved] {model_path}")
+    print(f"[saved] {params_path}")
+
+    tm.save_rankings(tm.rank_zip_codes(model, meta, features, dates,
+                                       tm.load_quantile_model()))
+    tm.save_zip_shap(model, meta, features, dates)
+    # Incremental runs keep updating whichever model the rankings now come from
+    tm.record_ranking_model(MODEL_NAMES[args.model])
+
+    print(f"\n✓ Search complete in {time.time() - t_start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Monthly ZHVI Delta Ingestion
+============================
+Folds a newly published ZHVI file into the binary price store
+(price_store.py) instead of replacing data.csv wholesale. The file may be a
+full export or just the new month column(s); only months and ZIPs that are
+new or whose values changed are written, and the store's data version is
+bumped.
+
+Derived tables are refreshed only as far as the change reaches:
+
+  new / revised prices  → feature-store months from the first changed month
+                          on, plus the targets whose 12-month window reaches it
+  new ZIPs              → store metadata (meta_version bump)
+  --retrain             → warm-start the saved models on newly labelled months,
+                          then re-rank and re-explain the latest month
+
+The API picks up the new version on its next request: it re-cleans only the
+ZIPs the ingest touched, rebuilds only the aggregates of their areas, and
+rebuilds the search index only if ZIPs were added.
+
+Usage:
+  python model/ingest_zhvi.py data/data.csv                      # create the store
+  python model/ingest_zhvi.py data/zhvi_2026_01.csv --retrain    # monthly delta
+  python model/trainedmodel.py --data output/price_store         # full retrain
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import trainedmodel as tm
+from feature_store import FeatureStore
+from price_store import PriceStore
+
+PRICE_STORE_DIR = os.path.join(tm.MODEL_DIR, "price_store")
+
+
+def load_delta(path: str) -> tuple[pd.DataFrame, np.ndarray, pd.DatetimeIndex]:
+    """
+    Read a wide ZHVI file that may hold any subset of months. Returns
+    (meta, prices, dates); ZIPs are zero-padded and de-duplicated (last wins).
+    """
+    t0 = time.time()
+    raw = pd.read_csv(path, low_memory=False)
+    raw["RegionName"] = raw["RegionName"].astype(str).str.zfill(5)
+    raw = raw.drop_duplicates("RegionName", keep="last").reset_index(drop=True)
+
+    date_cols = [c for c in raw.columns if c[0:2] in ("19", "20")]
+    dates = pd.DatetimeIndex(pd.to_datetime(date_cols))
+    order = np.argsort(dates.values, kind="stable")
+    prices = raw[date_cols].apply(pd.to_numeric, errors="coerce").to_numpy(np.float64)
+    meta = raw[[c for c in tm.META_COLS if c in raw.columns]]
+
+    print(f"[load_delta] {len(meta):,} ZIPs × {len(dates)} months "
+          f"from {os.path.basename(path)} ({time.time() - t0:.1f}s)")
+    return meta, prices[:, order], dates[order]
+
+
+def refresh_features(store: PriceStore, first_changed: int) -> pd.DatetimeIndex | None:
+    """Recompute the feature-store months affected by a change, if a store exists."""
+    fs = FeatureStore(tm.FEATURE_STORE_DIR)
+    if not fs.exists():
+        print("[ingest] no feature store yet — seed one with "
+              "`trainedmodel.py --incremental`")
+        return None
+    return tm.sync_feature_store(fs, store.root, first_changed)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("file", help="wide-format ZHVI CSV (full export or new months only)")
+    parser.add_argument("--store", default=PRICE_STORE_DIR, help="price store directory")
+    parser.add_argument("--no-features", action="store_true",
+                        help="only update the price store")
+    parser.add_argument("--retrain", action="store_true",
+                        help="warm-start the saved models on newly labelled months")
+    parser.add_argument("--shap-workers", type=int, default=1)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    t_start = time.time()
+    store = PriceStore(args.store)
+    meta, prices, dates = load_delta(args.file)
+
+    if not store.exists():
+        store.create(meta, prices, dates)
+        print(f"[ingest] created price store v{store.version} at {store.root}: "
+              f"{len(meta):,} ZIPs × {len(dates)} months")
+        return
+
+    changes = store.ingest(meta, prices, dates)
+    if changes.empty:
+        print(f"[ingest] no changes — store stays at v{store.version} "
+              f"(through {store.months[-1].strftime('%Y-%m-%d')})")
+        return
+
+    print(f"[ingest] v{changes.version}: {len(changes.new_months)} new month(s), "
+          f"{len(changes.revised_months)} revised month(s), "
+          f"{len(changes.new_zips):,} new ZIP(s); "
+          f"{changes.n_new_cells:,} new + {changes.n_revised_cells:,} revised values "
+          f"across {len(changes.changed_zips):,} ZIPs")
+
+    if not args.no_features and changes.first_changed is not None:
+        newly_labelled = refresh_features(store, changes.first_changed)
+        if args.retrain and newly_labelled is not None:
+            retrain_args = argparse.Namespace(data=None, shap_workers=args.shap_workers)
+            fs = FeatureStore(tm.FEATURE_STORE_DIR)
+            if not tm.run_incremental(retrain_args, fs, newly_labelled):
+                print("[ingest] no saved model to warm-start — run trainedmodel.py")
+
+    print(f"\n✓ Ingest complete in {time.time() - t_start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,99 +1,201 @@
+"""
+Batched Monte Carlo Price Forecast per ZIP Code
+================================================
+Forecasts P10/P50/P90 home values and the probability of a loss over a
+multi-year horizon for every ZIP in the ZHVI file (or a filtered subset).
+
+Model: monthly returns ~ Normal(mu, sigma), with mu/sigma estimated from the
+ZIP's last 120 valid months and the walk started at its latest value.
+
+Simulation is vectorized over (ZIPs × simulations) and stepped through the
+horizon one month at a time, so memory per chunk is chunk_size × n_sims
+floats regardless of horizon. Chunks can be spread across processes; each
+chunk draws from its own seed so results don't depend on the worker count.
+
+Usage:
+  python model/predictivemodel.py                       # all ZIPs
+  python model/predictivemodel.py --zips 92617 92618    # a few ZIPs
+  python model/predictivemodel.py --state CA --workers 4 -o ca.csv.gz
+"""
+
+import argparse
 import os
-import pandas as pd
-import numpy as np
-
-
-# -----------------------------
-# 1. LOAD ZHVI DATA
-# -----------------------------
-
-BASE_DIR = os.path.dirname(__file__)
-CSV_PATH = os.path.join(BASE_DIR, "../data/data.csv")
-
-df = pd.read_csv(CSV_PATH)
-
-# -----------------------------
-# 2. FILTER TO ONE ZIP
-# -----------------------------
-
-TARGET_ZIP = 92617
-
-zip_row = df[df["RegionName"] == TARGET_ZIP]
-
-if zip_row.empty:
-    raise ValueError(f"ZIP {TARGET_ZIP} not found in dataset")
-
-price_data = zip_row.iloc[:, 9:]
-
-price_series = price_data.values.flatten()
-price_series = price_series.astype(float)
-
-price_series = price_series[~np.isnan(price_series)]
-
-if len(price_series) > 120:
-    price_series = price_series[-120:]
-
-# -----------------------------
-# 3. COMPUTE MONTHLY RETURNS
-# -----------------------------
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 
-returns = (price_series[1:] / price_series[:-1]) - 1
-
-mu = np.mean(returns)
-sigma = np.std(returns)
+import numpy as np
+import pandas as pd
 
-print("------ Historical Stats ------")
-print(f"Mean Monthly Return: {mu:.6f}")
-print(f"Volatility (Std Dev): {sigma:.6f}")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.join(BASE_DIR, "..", "data", "data.csv")
+OUTPUT_PATH = os.path.join(BASE_DIR, "..", "output", "zip_forecasts.csv.gz")
 
+HISTORY_MONTHS = 120   # trailing window used to estimate mu / sigma
+MIN_HISTORY = 12       # ZIPs with fewer valid months are skipped
+META_OUT = ["RegionName", "City", "State", "Metro"]
 
-# -----------------------------
-# 4. MONTE CARLO SIMULATION
-# -----------------------------
 
-def run_simulation(current_price, mu, sigma, years=5, simulations=1000):
+# ---------------------------------------------------------------------------
+# 1. LOAD ZHVI DATA
+# ---------------------------------------------------------------------------
+
+def load_prices(path: str, zips: list[str] | None = None,
+                state: str | None = None):
+    """Return (meta, prices) for the selected ZIPs; prices is (n_zips, n_months)."""
+    df = pd.read_csv(path, low_memory=False)
+    df["RegionName"] = df["RegionName"].astype(str).str.zfill(5)
+    if zips:
+        df = df[df["RegionName"].isin([str(z).zfill(5) for z in zips])]
+    if state:
+        df = df[df["State"] == state]
+
+    date_cols = [c for c in df.columns if c[0:2] in ("19", "20")]
+    prices = df[date_cols].apply(pd.to_numeric, errors="coerce").to_numpy(np.float64)
+    meta = df[[c for c in META_OUT if c in df.columns]].reset_index(drop=True)
+    return meta, prices
+
+
+# ---------------------------------------------------------------------------
+# 2. MONTHLY RETURN STATS  (vectorized over ZIPs)
+# ---------------------------------------------------------------------------
+
+def trailing_stats(prices: np.ndarray, window: int = HISTORY_MONTHS):
+    """
+    Latest price, mean and (population) std of monthly returns over each
+    row's last `window` non-NaN prices. NaNs are dropped before windowing,
+    matching the original per-ZIP script.
+
+    Returns (current, mu, sigma, n_valid).
+    """
+    valid = ~np.isnan(prices)
+    n_valid = valid.sum(axis=1)
+
+    # Stable sort pushes NaNs left and keeps valid prices in time order,
+    # so each row's last `window` columns are its last `window` valid prices.
+    order = np.argsort(valid, axis=1, kind="stable")
+    packed = np.take_along_axis(prices, order, axis=1)[:, -window:]
+
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows
+        returns = packed[:, 1:] / packed[:, :-1] - 1
+        mu = np.nanmean(returns, axis=1)
+        sigma = np.nanstd(returns, axis=1)
+    return packed[:, -1], mu, sigma, n_valid
+
+
+# ---------------------------------------------------------------------------
+# 3. MONTE CARLO SIMULATION  (one chunk of ZIPs)
+# ---------------------------------------------------------------------------
+
+def simulate_chunk(current: np.ndarray, mu: np.ndarray, sigma: np.ndarray,
+                   months: int, n_sims: int, seed) -> np.ndarray:
+    """
+    Simulate `n_sims` paths per ZIP and summarise the final prices.
+
+    Returns a (n_zips, 4) array: P10, P50, P90, P(final < current).
+    """
+    rng = np.random.default_rng(seed)
+    n = current.shape[0]
+    price = np.repeat(current[:, None], n_sims, axis=1)
+    shock = np.empty((n, n_sims))
+    for _ in range(months):
+        rng.standard_normal(out=shock)
+        shock *= sigma[:, None]
+        shock += 1 + mu[:, None]
+        price *= shock
+
+    out = np.empty((n, 4))
+    out[:, :3] = np.percentile(price, [10, 50, 90], axis=1).T
+    out[:, 3] = (price < current[:, None]).mean(axis=1)
+    return out
+
+
+def _simulate_task(args):
+    return simulate_chunk(*args)
+
+
+def forecast(current: np.ndarray, mu: np.ndarray, sigma: np.ndarray,
+             years: int = 5, n_sims: int = 1000, chunk_size: int = 2048,
+             workers: int = 1, seed: int | None = None) -> np.ndarray:
+    """Forecast every ZIP in chunks, optionally across `workers` processes."""
     months = years * 12
-    final_prices = []
-
-    for _ in range(simulations):
-        price = current_price
-
-        for _ in range(months):
-            random_return = np.random.normal(mu, sigma)
-            price *= (1 + random_return)
-
-        final_prices.append(price)
-
-    return np.array(final_prices)
-
-
-# -----------------------------
-# 5. RUN FORECAST
-# -----------------------------
-
-current_price = price_series[-1]
-
-results = run_simulation(
-    current_price=current_price,
-    mu=mu,
-    sigma=sigma,
-    years=5,
-    simulations=1000
-)
-
-# -----------------------------
-# 6. OUTPUT METRICS
-# -----------------------------
-
-p10 = np.percentile(results, 10)
-p50 = np.percentile(results, 50)
-p90 = np.percentile(results, 90)
-
-prob_downside = np.mean(results < current_price)
-
-print("\n------ 5 Year Forecast ------")
-print(f"Current Price: ${current_price:,.0f}")
-print(f"P10 (Low Case): ${p10:,.0f}")
-print(f"P50 (Median): ${p50:,.0f}")
-print(f"P90 (High Case): ${p90:,.0f}")
-print(f"Probability of Downside: {prob_downside * 100:.2f}%")
\ No newline at end of file
+    bounds = range(0, current.shape[0], chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(bounds))
+    tasks = [
+        (current[i:i + chunk_size], mu[i:i + chunk_size], sigma[i:i + chunk_size],
+         months, n_sims, s)
+        for i, s in zip(bounds, seeds)
+    ]
+    if not tasks:
+        return np.empty((0, 4))
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_task, tasks))
+    else:
+        parts = [_simulate_task(t) for t in tasks]
+    return np.concatenate(parts)
+
+
+# ---------------------------------------------------------------------------
+# 4. CLI
+# ---------------------------------------------------------------------------
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--data", default=CSV_PATH, help="wide-format ZHVI CSV")
+    parser.add_argument("--zips", nargs="+", help="only these ZIP codes")
+    parser.add_argument("--state", help="only ZIPs in this state (e.g. CA)")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--sims", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=2048,
+                        help="ZIPs simulated per batch (memory ≈ chunk × sims × 16 B)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH,
+                        help="results CSV (.csv or .csv.gz)")
+    args = parser.parse_args(argv)
+    # Checked up front so a bad path fails before the simulation runs
+    if not args.output.endswith((".csv", ".csv.gz")):
+        parser.error(f"--output must end in .csv or .csv.gz, got {args.output!r}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    t0 = time.time()
+
+    meta, prices = load_prices(args.data, args.zips, args.state)
+    current, mu, sigma, n_valid = trailing_stats(prices)
+    keep = n_valid >= MIN_HISTORY
+    if not keep.all():
+        print(f"[forecast] skipping {(~keep).sum():,} ZIPs with < {MIN_HISTORY} months")
+    meta, current, mu, sigma = meta[keep].reset_index(drop=True), current[keep], mu[keep], sigma[keep]
+    if meta.empty:
+        raise SystemExit("[forecast] no ZIPs matched with enough history")
+
+    summary = forecast(current, mu, sigma, years=args.years, n_sims=args.sims,
+                       chunk_size=args.chunk_size, workers=args.workers,
+                       seed=args.seed)
+
+    results = meta.assign(
+        current_price=current.round(0),
+        mu=mu.astype(np.float32),
+        sigma=sigma.astype(np.float32),
+        p10=summary[:, 0].round(0),
+        p50=summary[:, 1].round(0),
+        p90=summary[:, 2].round(0),
+        prob_downside=summary[:, 3].astype(np.float32),
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    results.to_csv(args.output, index=False)
+
+    print(f"[forecast] {len(results):,} ZIPs × {args.sims:,} sims × "
+          f"{args.years * 12} months ({time.time() - t0:.1f}s) → {args.output}")
+    if len(results) <= 10:
+        print(results.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Append-only binary store of ZHVI prices.
+
+Layout under ``root``:
+
+  manifest.json   version, months, ZIP count, change history
+  meta.csv        ZIP metadata; row order defines the ZIP axis
+  prices.npy      (month_capacity, zip_capacity) month-major matrix, NaN-filled
+                  beyond the live [:n_months, :n_zips] region
+  changes/<v>.npy ZIP-axis positions changed by the ingest that made version v
+                  (kept for the versions still in the manifest history)
+
+Rows are months, so publishing a new month writes one contiguous row of the
+memory-mapped file in place. Capacity is over-allocated and only grows (by
+copying) when a month or ZIP no longer fits. The manifest is rewritten
+atomically last, so readers never see a month before its row is flushed.
+
+``version`` is bumped on every ingest that changes anything; ``meta_version``
+only when ZIPs are added. Readers holding derived data for an older version
+can ask ``changes_since`` which ZIPs to recompute instead of reloading all.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+STORE_FORMAT = 1
+
+# Spare rows/columns allocated when the matrix is (re)created
+MONTH_HEADROOM = 36
+ZIP_HEADROOM = 0.05
+
+# Relative difference below which a re-published value is not a revision
+REVISION_RTOL = 1e-6
+
+# Change records kept in the manifest
+HISTORY_LIMIT = 50
+
+
+def _month_key(date) -> str:
+    return pd.Timestamp(date).strftime("%Y-%m-%d")
+
+
+@dataclass
+class ChangeSet:
+    version: int
+    new_months: pd.DatetimeIndex
+    revised_months: pd.DatetimeIndex
+    new_zips: list[str]
+    changed_zips: np.ndarray            # ZIP-axis positions with any new or revised value
+    first_changed: int | None           # earliest month index touched
+    n_revised_cells: int = 0
+    n_new_cells: int = 0
+    meta_changed: bool = False
+
+    @property
+    def empty(self) -> bool:
+        return self.first_changed is None and not self.new_zips
+
+    def record(self) -> dict:
+        return {
+            "version": self.version,
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "new_months": [_month_key(d) for d in self.new_months],
+            "revised_months": [_month_key(d) for d in self.revised_months],
+            "new_zips": len(self.new_zips),
+            "changed_zips": int(len(self.changed_zips)),
+            "new_cells": self.n_new_cells,
+            "revised_cells": self.n_revised_cells,
+        }
+
+
+class PriceStore:
+    def __init__(self, root: str):
+        self.root = root
+        self._manifest: dict | None = None
+        self._meta: pd.DataFrame | None = None
+
+    # --- manifest -------------------------------------------------------------
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.root, "manifest.json")
+
+    @property
+    def prices_path(self) -> str:
+        return os.path.join(self.root, "prices.npy")
+
+    def _changes_path(self, version: int) -> str:
+        return os.path.join(self.root, "changes", f"{version}.npy")
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    @property
+    def manifest(self) -> dict:
+        if self._manifest is None:
+            with open(self.manifest_path) as f:
+                self._manifest = json.load(f)
+            if self._manifest.get("format") != STORE_FORMAT:
+                raise ValueError(
+                    f"Price store at {self.root} is format "
+                    f"{self._manifest.get('format')}, expected {STORE_FORMAT}"
+                )
+        return self._manifest
+
+    def _save_manifest(self):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    @property
+    def version(self) -> int:
+        return self.manifest["version"]
+
+    @property
+    def meta_version(self) -> int:
+        return self.manifest["meta_version"]
+
+    @property
+    def months(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(pd.to_datetime(self.manifest["months"]))
+
+    @property
+    def n_zips(self) -> int:
+        return self.manifest["n_zips"]
+
+    @property
+    def meta(self) -> pd.DataFrame:
+        if self._meta is None:
+            self._meta = pd.read_csv(os.path.join(self.root, "meta.csv"),
+                                     dtype={"RegionName": str})
+        return self._meta
+
+    def _write_meta(self, meta: pd.DataFrame):
+        path = os.path.join(self.root, "meta.csv")
+        meta.to_csv(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        self._meta = meta
+
+    # --- matrix ---------------------------------------------------------------
+
+    def _open(self, mode: str = "r") -> np.ndarray:
+        return np.load(self.prices_path, mmap_mode=mode)
+
+    def _allocate(self, n_months: int, n_zips: int, dtype) -> np.ndarray:
+        shape = (n_months + MONTH_HEADROOM, int(n_zips * (1 + ZIP_HEADROOM)) + 1)
+        tmp = self.prices_path + ".tmp.npy"
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=shape)
+        out[:] = np.nan
+        return out
+
+    def read(self) -> tuple[pd.DataFrame, np.ndarray, pd.DatetimeIndex]:
+        """(meta, prices, dates) with prices as a (n_zips, n_months) array."""
+        months = self.months
+        live = self._open()[:len(months), :self.n_zips]
+        return self.meta, np.ascontiguousarray(live.T), months
+
+    def read_zips(self, rows: np.ndarray) -> np.ndarray:
+        """(len(rows), n_months) prices for the given ZIP-axis positions."""
+        live = self._open()[:len(self.manifest["months"]), :self.n_zips]
+        return np.ascontiguousarray(live[:, rows].T)
+
+    def changes_since(self, version: int) -> np.ndarray | None:
+        """
+        ZIP-axis positions with any value written after `version`, or None
+        if that can't be told (the store was recreated, or the change
+        records have been pruned) and everything must be treated as changed.
+        """
+        if version > self.version:
+            return None
+        recorded = {h["version"]: h for h in self.manifest["history"]}
+        parts = []
+        for v in range(version + 1, self.version + 1):
+            if v not in recorded or recorded[v].get("created"):
+                return None
+            try:
+                parts.append(np.load(self._changes_path(v)))
+            except FileNotFoundError:
+                return None
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, np.int64)
+
+    def _save_changes(self, version: int, rows: np.ndarray):
+        os.makedirs(os.path.dirname(self._changes_path(version)), exist_ok=True)
+        np.save(self._changes_path(version), rows.astype(np.int64))
+        kept = {h["version"] for h in self.manifest["history"]}
+        for name in os.listdir(os.path.join(self.root, "changes")):
+            v = name.split(".")[0]
+            if v.isdigit() and int(v) not in kept:
+                os.remove(os.path.join(self.root, "changes", name))
+
+    def create(self, meta: pd.DataFrame, prices: np.ndarray, dates: pd.DatetimeIndex):
+        """Write a fresh store from a full (n_zips, n_months) matrix."""
+        os.makedirs(self.root, exist_ok=True)
+        n_zips, n_months = prices.shape
+        out = self._allocate(n_months, n_zips, prices.dtype)
+        out[:n_months, :n_zips] = prices.T
+        out.flush()
+        del out
+        os.replace(self.prices_path + ".tmp.npy", self.prices_path)
+
+        self._write_meta(meta.reset_index(drop=True))
+        version = (self.version + 1) if self.exists() else 1
+        self._manifest = {
+            "format": STORE_FORMAT,
+            "version": version,
+            "meta_version": version,
+            "dtype": np.dtype(prices.dtype).name,
+            "months": [_month_key(d) for d in dates],
+            "n_zips": n_zips,
+            "history": [{"version": version,
+                         "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                         "created": True, "months": n_months, "zips": n_zips}],
+        }
+        self._save_manifest()
+
+    def _ensure_capacity(self, n_months: int, n_zips: int):
+        cap_months, cap_zips = self._open().shape
+        if n_months <= cap_months and n_zips <= cap_zips:
+            return
+        old = self._open()
+        live_m, live_z = len(self.manifest["months"]), self.n_zips
+        out = self._allocate(max(n_months, cap_months), max(n_zips, cap_zips), old.dtype)
+        out[:live_m, :live_z] = old[:live_m, :live_z]
+        out.flush()
+        del out, old
+        os.replace(self.prices_path + ".tmp.npy", self.prices_path)
+        print(f"[price_store] grew capacity to fit {n_months} months × {n_zips:,} ZIPs")
+
+    # --- ingest ---------------------------------------------------------------
+
+    def ingest(self, meta: pd.DataFrame, prices: np.ndarray,
+               dates: pd.DatetimeIndex) -> ChangeSet:
+        """
+        Fold a wide (n_rows, n_months) price table into the store.
+
+        Months after the store's last month are appended (skipped months
+        in between are left missing); months already stored are compared
+        cell by cell and only values that differ are written. Missing
+        incoming values never overwrite stored ones, so a file holding a
+        single new month is a valid delta.
+        """
+        zips = meta["RegionName"].astype(str).str.zfill(5)
+        known = pd.Series(np.arange(self.n_zips), index=self.meta["RegionName"].values)
+        cols = zips.map(known)
+        unseen = cols.isna().to_numpy()
+        new_zips = zips[unseen].tolist()
+        cols[unseen] = np.arange(self.n_zips, self.n_zips + unseen.sum())
+        cols = cols.to_numpy(dtype=np.int64)
+        n_zips = self.n_zips + len(new_zips)
+
+        store_months = self.months
+        if len(dates) and dates.min() < store_months[0]:
+            raise ValueError(f"Cannot prepend months before {_month_key(store_months[0])}")
+        last = store_months[-1]
+        appended = pd.date_range(last, dates.max(), freq="ME")[1:] if dates.max() > last \
+            else pd.DatetimeIndex([])
+        all_months = store_months.append(appended)
+        month_idx = all_months.get_indexer(dates)
+        if (month_idx < 0).any():
+            bad = dates[month_idx < 0]
+            raise ValueError(f"Months not on the month-end grid: {list(map(_month_key, bad))}")
+
+        self._ensure_capacity(len(all_months), n_zips)
+        mat = self._open("r+")
+
+        incoming = np.asarray(prices, dtype=mat.dtype).T  # (n_months_in, n_rows)
+        current = mat[month_idx][:, cols]
+        has_value = ~np.isnan(incoming)
+        differs = has_value & ~np.isclose(current, incoming, rtol=REVISION_RTOL, atol=0)
+        was_missing = np.isnan(current)
+        is_new_month = month_idx >= len(store_months)
+
+        revised = differs & ~was_missing
+        added = differs & was_missing
+        changed = revised | added
+        if changed.any():
+            updated = np.where(changed, incoming, current)
+            for j in np.flatnonzero(changed.any(axis=1)):
+                mat[month_idx[j], cols] = updated[j]
+            mat.flush()
+        del mat
+
+        touched = changed.any(axis=1)
+        first_changed = int(month_idx[touched].min()) if touched.any() else None
+        if len(appended) and first_changed is None:
+            first_changed = len(store_months)
+        changes = ChangeSet(
+            version=self.version,
+            new_months=appended,
+            revised_months=dates[revised.any(axis=1) & ~is_new_month],
+            new_zips=new_zips,
+            changed_zips=np.unique(cols[changed.any(axis=0)]),
+            first_changed=first_changed,
+            n_revised_cells=int(revised.sum()),
+            n_new_cells=int(added.sum()),
+            meta_changed=bool(new_zips),
+        )
+        if changes.empty:
+            return changes
+
+        if new_zips:
+            added_meta = meta.loc[unseen].assign(RegionName=zips[unseen])
+            self._write_meta(pd.concat(
+                [self.meta, added_meta.reindex(columns=self.meta.columns)],
+                ignore_index=True))
+            self.manifest["meta_version"] = self.version + 1
+
+        changes.version = self.version + 1
+        self.manifest.update(
+            version=changes.version,
+            months=[_month_key(d) for d in all_months],
+            n_zips=n_zips,
+        )
+        self.manifest["history"] = (self.manifest["history"]
+                                    + [changes.record()])[-HISTORY_LIMIT:]
+        # Before the manifest, so a reader that sees the version finds its changes
+        self._save_changes(changes.version, np.union1d(
+            changes.changed_zips, np.arange(n_zips - len(new_zips), n_zips)))
+        self._save_manifest()
+        return changes
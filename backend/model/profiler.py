@@ -0,0 +1,167 @@
+"""
+Per-stage cost accounting for the training pipeline.
+
+Wrap each stage in ``profiler.stage(name, rows=...)`` to record wall time,
+process CPU time (all threads), resident memory and row throughput. A
+stage's peak RSS is sampled by a background thread while it runs, since the
+kernel's own high-water mark (``ru_maxrss``) only covers the whole process
+lifetime and stops moving after the first big stage (that value is kept as
+``process_peak_rss_mb``). Allocations that come and go faster than
+RSS_SAMPLE_INTERVAL can be missed. The
+run is written as one JSON report, and a single named stage can also be
+captured with cProfile for a ``.prof`` dump (view with snakeviz/pstats).
+"""
+
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (NaN where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb() -> float:
+    """Current resident set size in MB (Linux only; NaN elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return float("nan")
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+# Seconds between RSS samples while a stage runs
+RSS_SAMPLE_INTERVAL = 0.05
+
+
+class RssSampler:
+    """Highest current_rss_mb() seen between start() and stop()."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = float("nan")
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self):
+        rss = current_rss_mb()
+        # NaN never compares greater, so start from the first real sample
+        if not rss <= self.peak:
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> float:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return self.peak
+
+
+class PipelineProfiler:
+    def __init__(self, enabled: bool = True, cprofile_stage: str | None = None,
+                 out_dir: str | None = None):
+        self.enabled = enabled
+        self.cprofile_stage = cprofile_stage
+        self.out_dir = out_dir
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.context: dict = {}
+        self.stages: list[dict] = []
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None):
+        """
+        Time the enclosed block. The yielded dict may be updated inside the
+        block (e.g. ``rec["rows"] = n`` once the row count is known).
+        """
+        rec = {"name": name, "rows": rows}
+        if not self.enabled:
+            yield rec
+            return
+
+        prof = cProfile.Profile() if name == self.cprofile_stage else None
+        rss_before = current_rss_mb()
+        sampler = RssSampler()
+        sampler.start()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        if prof:
+            prof.enable()
+        try:
+            yield rec
+        finally:
+            if prof:
+                prof.disable()
+            wall = time.perf_counter() - wall0
+            cpu = time.process_time() - cpu0
+            stage_peak = sampler.stop()
+            rss_after = current_rss_mb()
+            rec.update(
+                wall_s=round(wall, 4),
+                cpu_s=round(cpu, 4),
+                cpu_util=round(cpu / wall, 2) if wall > 0 else None,
+                rss_mb=round(rss_after, 1),
+                rss_delta_mb=round(rss_after - rss_before, 1),
+                peak_rss_mb=round(stage_peak, 1),
+                process_peak_rss_mb=round(peak_rss_mb(), 1),
+                rows_per_s=(round(rec["rows"] / wall) if rec["rows"] and wall > 0
+                            else None),
+            )
+            if prof:
+                rec["cprofile"] = self._dump_cprofile(prof, name)
+            self.stages.append(rec)
+
+    def _dump_cprofile(self, prof: cProfile.Profile, name: str) -> str:
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"{self.run_id}-{name}.prof")
+        prof.dump_stats(path)
+        print(f"[profiler] cProfile for {name} → {path}")
+        return path
+
+    def report(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            **self.context,
+            "total_wall_s": round(time.perf_counter() - self._t0, 4),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "stages": self.stages,
+        }
+
+    def write(self) -> str | None:
+        """Write the JSON report to ``<out_dir>/<run_id>.json``."""
+        if not self.enabled or self.out_dir is None:
+            return None
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"{self.run_id}.json")
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2, default=str)
+        print(f"[profiler] report → {path}")
+        return path
+
+    def summary(self) -> str:
+        lines = [f"  {'stage':<20s} {'wall':>8s} {'cpu':>8s} {'peak RSS':>10s} {'rows/s':>12s}"]
+        for s in self.stages:
+            rps = f"{s['rows_per_s']:,}" if s.get("rows_per_s") else "—"
+            lines.append(f"  {s['name']:<20s} {s['wall_s']:>7.2f}s {s['cpu_s']:>7.2f}s "
+                         f"{s['peak_rss_mb']:>7,.0f} MB {rps:>12s}")
+        return "\n".join(lines)
@@ -0,0 +1,137 @@
+"""
+Content-addressed on-disk cache for training-pipeline stage outputs.
+
+Each entry lives in ``<root>/<stage>-<key>/`` where ``key`` hashes the
+stage's inputs (file contents, upstream stage keys, options) together with
+the source code of the functions that produce it. Changing the data, an
+option or the stage code therefore produces a new key; nothing is ever
+invalidated in place.
+
+Arrays are stored as ``.npy`` and reopened memory-mapped, so a cache hit
+costs page-ins of whatever the caller actually touches.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+# Bump to invalidate every entry (e.g. when the on-disk layout changes)
+CACHE_VERSION = 1
+
+# Entries kept per stage; older ones are pruned on write
+MAX_ENTRIES_PER_STAGE = 3
+
+
+def hash_file(path: str, chunk_size: int = 1 << 22) -> str:
+    """sha256 of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_code(*objs) -> str:
+    """sha256 over the source of the given functions/classes."""
+    h = hashlib.sha256()
+    for obj in objs:
+        h.update(inspect.getsource(obj).encode())
+    return h.hexdigest()
+
+
+def _save(path: str, name: str, value) -> str:
+    if isinstance(value, pd.DatetimeIndex):
+        np.save(os.path.join(path, f"{name}.npy"), value.values)
+        return "datetimeindex"
+    if isinstance(value, pd.DataFrame):
+        value.to_pickle(os.path.join(path, f"{name}.pkl"))
+        return "dataframe"
+    if isinstance(value, np.ndarray):
+        np.save(os.path.join(path, f"{name}.npy"), value)
+        return "ndarray"
+    raise TypeError(f"Cannot cache {name!r} of type {type(value).__name__}")
+
+
+def _load(path: str, name: str, kind: str):
+    if kind == "datetimeindex":
+        return pd.DatetimeIndex(np.load(os.path.join(path, f"{name}.npy")))
+    if kind == "dataframe":
+        return pd.read_pickle(os.path.join(path, f"{name}.pkl"))
+    return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+
+class StageCache:
+    def __init__(self, root: str, force: bool = False, enabled: bool = True):
+        self.root = root
+        self.force = force
+        self.enabled = enabled
+        # stage → key of the most recent run(), for keying derived artifacts
+        self.last_keys: dict[str, str] = {}
+        self.hits: set[str] = set()
+
+    @staticmethod
+    def key(*parts) -> str:
+        payload = json.dumps([CACHE_VERSION, *map(str, parts)])
+        return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+    def _entry(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, f"{stage}-{key}")
+
+    def get(self, stage: str, key: str) -> dict | None:
+        path = self._entry(stage, key)
+        manifest = os.path.join(path, "manifest.json")
+        if not os.path.exists(manifest):
+            return None
+        with open(manifest) as f:
+            kinds = json.load(f)
+        return {name: _load(path, name, kind) for name, kind in kinds.items()}
+
+    def put(self, stage: str, key: str, outputs: dict):
+        path = self._entry(stage, key)
+        tmp = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        kinds = {name: _save(tmp, name, v) for name, v in outputs.items()}
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            json.dump(kinds, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+        self._prune(stage, keep=path)
+
+    def _prune(self, stage: str, keep: str):
+        entries = [
+            os.path.join(self.root, d) for d in os.listdir(self.root)
+            if d.startswith(f"{stage}-") and ".tmp-" not in d
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[MAX_ENTRIES_PER_STAGE:]:
+            if path != keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def run(self, stage: str, key: str, compute: Callable[[], dict]) -> dict:
+        """Return cached outputs for (stage, key), computing and storing on a miss."""
+        self.last_keys[stage] = key
+        if not self.enabled:
+            return compute()
+        if not self.force:
+            hit = self.get(stage, key)
+            if hit is not None:
+                os.utime(self._entry(stage, key))  # keep recently used entries
+                self.hits.add(stage)
+                print(f"[cache] {stage}: hit {key[:12]}")
+                return hit
+
+        outputs = compute()
+        t0 = time.time()
+        os.makedirs(self.root, exist_ok=True)
+        self.put(stage, key, outputs)
+        print(f"[cache] {stage}: stored {key[:12]} ({time.time() - t0:.1f}s)")
+        # Hand back the memory-mapped copy so hit and miss paths behave alike
+        return self.get(stage, key)
@@ -8,21 +8,34 @@ Performance: operates on wide-format price matrix (26K ZIPs × 313 months)
 using vectorized numpy — avoids melt/groupby entirely.
 """
 
+import argparse
 import os
 import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
 import numpy as np
 import pandas as pd
 import joblib
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from xgboost import XGBRegressor
+from xgboost import DMatrix, XGBRegressor
+
+from feature_store import FeatureStore
+from price_store import PriceStore
+from profiler import PipelineProfiler, peak_rss_mb
+from stage_cache import StageCache, hash_code, hash_file
+from zhvi_clean import MAX_FILL_GAP, CleanPrices, clean_prices
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, "..", "data", "data.csv")
 MODEL_DIR = os.path.join(BASE_DIR, "..", "output")
+FEATURE_STORE_DIR = os.path.join(MODEL_DIR, "feature_store")
+CACHE_DIR = os.path.join(MODEL_DIR, "cache")
+PROFILE_DIR = os.path.join(MODEL_DIR, "profiles")
 META_COLS = [
     "RegionID", "SizeRank", "RegionName", "RegionType",
     "StateName", "State", "City", "Metro", "CountyName",
@@ -33,28 +46,50 @@ FEATURE_COLS = [
     "cagr_3y", "volatility_12m", "momentum_accel",
 ]
 TARGET_COL = "fwd_12m_appreciation"
+FEATURE_LOOKBACK = 36  # longest lag any feature reads (cagr_3y)
+FORWARD_HORIZON = 12   # months ahead the target looks
+
+# Trees appended per incremental (warm-start) XGBoost update
+WARM_START_TREES = 20
+
+# Models the rankings can be served from, and where each is saved
+RANKING_MODEL_FILES = {"XGBoost": "xgb_model.joblib", "RandomForest": "rf_model.joblib"}
+
+# Rows per batch when precomputing per-ZIP SHAP values
+SHAP_CHUNK_ROWS = 8192
 
 
 # ---------------------------------------------------------------------------
 # 1. DATA LOADING
 # ---------------------------------------------------------------------------
 
-def load_data(filepath: str):
+def load_data(filepath: str, dtype=np.float64):
     """
-    Load wide-format CSV. Returns metadata DataFrame, price matrix (numpy),
-    and date array.
+    Load wide-format CSV, or a price store directory written by
+    ingest_zhvi.py. Returns metadata DataFrame, price matrix (numpy,
+    `dtype`), and date array.
     """
     t0 = time.time()
+    if os.path.isdir(filepath):
+        meta, prices, dates = PriceStore(filepath).read()
+        prices = prices.astype(dtype, copy=False)
+        print(f"[load_data] {prices.shape[0]:,} ZIPs × {prices.shape[1]} months "
+              f"from price store ({time.time() - t0:.1f}s)")
+        return meta[META_COLS].copy(), prices, dates
+
     raw = pd.read_csv(filepath, low_memory=False)
 
     date_cols = [c for c in raw.columns if c not in META_COLS]
     dates = pd.to_datetime(date_cols)
 
     meta = raw[META_COLS].copy()
-    prices = raw[date_cols].apply(pd.to_numeric, errors="coerce").values  # (n_zips, n_months)
+    prices = (
+        raw[date_cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=dtype)
+    )  # (n_zips, n_months)
+    del raw
 
     print(f"[load_data] {prices.shape[0]:,} ZIPs × {prices.shape[1]} months "
-          f"({time.time() - t0:.1f}s)")
+          f"({time.time() - t0:.1f}s, peak RSS {peak_rss_mb():,.0f} MB)")
     return meta, prices, dates
 
 
@@ -62,52 +97,96 @@ def load_data(filepath: str):
 # 2. FEATURE ENGINEERING  (vectorized over the wide price matrix)
 # ---------------------------------------------------------------------------
 
-def engineer_features(prices: np.ndarray, dates: pd.DatetimeIndex):
+def _window_sums(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing `window`-length sums along axis 1 via a cumulative sum."""
+    csum = np.cumsum(x, axis=1)
+    out = csum[:, window - 1:].copy()
+    out[:, 1:] -= csum[:, :-window]
+    return out
+
+
+def _rolling_nanstd(x: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """
+    Trailing rolling standard deviation along axis 1, ignoring NaNs.
+
+    Equivalent to ``np.nanstd(x[:, t - window + 1 : t + 1], axis=1, ddof=ddof)``
+    for every t >= window - 1, computed from cumulative sums of x and x² with
+    NaN-aware counts. Positions before the first full window are NaN, as are
+    windows with fewer than ddof + 1 observations or any ±inf.
+    """
+    missing = np.isnan(x)
+    infinite = np.isinf(x)
+
+    # Centre each row first: variance is shift-invariant and this keeps the
+    # x² sums from cancelling catastrophically.
+    x0 = np.where(missing | infinite, 0.0, x)
+    counts_row = (~missing & ~infinite).sum(axis=1, keepdims=True)
+    row_mean = x0.sum(axis=1, keepdims=True) / np.maximum(counts_row, 1)
+    x0 = np.where(missing | infinite, 0.0, x0 - row_mean)
+
+    n = _window_sums((~missing).astype(x.dtype), window)
+    s1 = _window_sums(x0, window)
+    s2 = _window_sums(x0 * x0, window)
+    n_inf = _window_sums(infinite.astype(np.int32), window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = (s2 - s1 * s1 / n) / (n - ddof)
+    std = np.sqrt(np.maximum(var, 0.0))
+    std[(n <= ddof) | (n_inf > 0)] = np.nan
+
+    out = np.full_like(x, np.nan)
+    out[:, window - 1:] = std
+    return out
+
+
+def engineer_features(prices: np.ndarray, dates: pd.DatetimeIndex,
+                      dtype=np.float64):
     """
     Compute features for every (ZIP, month) pair using the wide price matrix.
 
+    Each feature is written in place into one preallocated tensor, so peak
+    memory is roughly the output plus a couple of (n_zips, n_months)
+    temporaries. Pass ``dtype=np.float32`` to halve it again.
+
     Returns:
       features  — (n_zips, n_months, 6) array
       target    — (n_zips, n_months) array of 12-month forward appreciation
     """
     t0 = time.time()
+    prices = np.asarray(prices, dtype=dtype)
     n_zips, n_months = prices.shape
 
-    with np.errstate(divide="ignore", invalid="ignore"):
-        growth_3m = np.full_like(prices, np.nan)
-        growth_3m[:, 3:] = prices[:, 3:] / prices[:, :-3] - 1
-
-        growth_6m = np.full_like(prices, np.nan)
-        growth_6m[:, 6:] = prices[:, 6:] / prices[:, :-6] - 1
-
-        growth_12m = np.full_like(prices, np.nan)
-        growth_12m[:, 12:] = prices[:, 12:] / prices[:, :-12] - 1
+    features = np.full((n_zips, n_months, len(FEATURE_COLS)), np.nan, dtype=dtype)
+    target = np.full((n_zips, n_months), np.nan, dtype=dtype)
+    (growth_3m, growth_6m, growth_12m,
+     cagr_3y, volatility_12m, momentum_accel) = (
+        features[:, :, k] for k in range(len(FEATURE_COLS))
+    )
 
-        ratio_36 = np.full_like(prices, np.nan)
-        ratio_36[:, 36:] = prices[:, 36:] / prices[:, :-36]
-        cagr_3y = np.power(ratio_36, 12.0 / 36.0) - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for out, lag in ((growth_3m, 3), (growth_6m, 6), (growth_12m, 12)):
+            np.divide(prices[:, lag:], prices[:, :-lag], out=out[:, lag:])
+            out[:, lag:] -= 1
 
-        # 12-month rolling volatility of monthly returns
-        monthly_ret = np.full_like(prices, np.nan)
-        monthly_ret[:, 1:] = prices[:, 1:] / prices[:, :-1] - 1
+        np.divide(prices[:, 36:], prices[:, :-36], out=cagr_3y[:, 36:])
+        np.power(cagr_3y[:, 36:], 12.0 / 36.0, out=cagr_3y[:, 36:])
+        cagr_3y[:, 36:] -= 1
 
-        volatility_12m = np.full_like(prices, np.nan)
-        for t in range(12, n_months):
-            volatility_12m[:, t] = np.nanstd(monthly_ret[:, t - 11 : t + 1], axis=1, ddof=1)
+        # 12-month rolling volatility of monthly returns (month 0 has no return,
+        # so the first full window ends at t=12)
+        monthly_ret = prices[:, 1:] / prices[:, :-1] - 1
+        volatility_12m[:, 1:] = _rolling_nanstd(monthly_ret, window=12, ddof=1)
+        del monthly_ret
 
-        momentum_accel = growth_3m - growth_6m
+        np.subtract(growth_3m, growth_6m, out=momentum_accel)
 
         # Target: 12-month forward appreciation
-        target = np.full_like(prices, np.nan)
-        target[:, :-12] = prices[:, 12:] / prices[:, :-12] - 1
-
-    features = np.stack(
-        [growth_3m, growth_6m, growth_12m, cagr_3y, volatility_12m, momentum_accel],
-        axis=-1,
-    )  # (n_zips, n_months, 6)
+        np.divide(prices[:, 12:], prices[:, :-12], out=target[:, :-12])
+        target[:, :-12] -= 1
 
     print(f"[engineer_features] computed 6 features + target "
-          f"({time.time() - t0:.1f}s)")
+          f"({time.time() - t0:.1f}s, {np.dtype(dtype).name}, "
+          f"peak RSS {peak_rss_mb():,.0f} MB)")
     return features, target, dates
 
 
@@ -115,97 +194,179 @@ def engineer_features(prices: np.ndarray, dates: pd.DatetimeIndex):
 # 3. FLATTEN TO TRAINING TABLE
 # ---------------------------------------------------------------------------
 
+@dataclass
+class TrainingTable:
+    """
+    Valid (ZIP, month) rows of the feature tensor, ordered by month.
+
+    Rows are month-major, so ``month_idx`` is non-decreasing and any date
+    range maps to one contiguous slice of every array.
+    """
+    X: np.ndarray          # (n_rows, n_features)
+    y: np.ndarray          # (n_rows,)
+    zip_idx: np.ndarray    # (n_rows,) row in meta / prices
+    month_idx: np.ndarray  # (n_rows,) column in prices / position in dates
+
+    def __len__(self) -> int:
+        return self.y.shape[0]
+
+    def row_bounds(self, start_month: int | None = None,
+                   stop_month: int | None = None) -> tuple[int, int]:
+        """Row range covering months in [start_month, stop_month)."""
+        lo = 0 if start_month is None else int(
+            np.searchsorted(self.month_idx, start_month, side="left"))
+        hi = len(self) if stop_month is None else int(
+            np.searchsorted(self.month_idx, stop_month, side="left"))
+        return lo, hi
+
+    def slice_months(self, start_month: int | None = None,
+                     stop_month: int | None = None) -> "TrainingTable":
+        """View (no copy) of the rows for months in [start_month, stop_month)."""
+        lo, hi = self.row_bounds(start_month, stop_month)
+        return TrainingTable(self.X[lo:hi], self.y[lo:hi],
+                             self.zip_idx[lo:hi], self.month_idx[lo:hi])
+
+
 def build_table(meta: pd.DataFrame, features: np.ndarray, target: np.ndarray,
-                dates: pd.DatetimeIndex):
+                dates: pd.DatetimeIndex) -> TrainingTable:
     """
     Flatten (n_zips, n_months, 6) feature tensor into a 2-D training table.
     Drops any row with NaN in features or target.
+
+    Rows are gathered month-major straight from a transposed view of the
+    tensor, and (zip, month) indices come from arithmetic on the flat row
+    positions — no meshgrid, full reshape copy or DataFrame.
     """
     t0 = time.time()
     n_zips, n_months, n_feat = features.shape
 
-    zip_idx, month_idx = np.meshgrid(np.arange(n_zips), np.arange(n_months), indexing="ij")
-    zip_idx = zip_idx.ravel()
-    month_idx = month_idx.ravel()
+    features_t = features.transpose(1, 0, 2)  # (n_months, n_zips, 6) view
+    valid = np.isfinite(features_t).all(axis=-1)
+    valid &= np.isfinite(target.T)
 
-    X = features.reshape(-1, n_feat)
-    y = target.ravel()
+    flat = np.flatnonzero(valid)
+    month_idx, zip_idx = np.divmod(flat, n_zips)
+    del flat
 
-    valid = np.isfinite(X).all(axis=1) & np.isfinite(y)
-    X = X[valid]
-    y = y[valid]
-    zip_idx = zip_idx[valid]
-    month_idx = month_idx[valid]
-
-    date_arr = dates[month_idx]
-
-    df = pd.DataFrame(X, columns=FEATURE_COLS)
-    df[TARGET_COL] = y
-    df["date"] = date_arr
-    df["_zip_idx"] = zip_idx
+    table = TrainingTable(
+        X=features_t[valid],
+        y=target.T[valid],
+        zip_idx=zip_idx.astype(np.int32),
+        month_idx=month_idx.astype(np.int32),
+    )
 
-    print(f"[build_table] {len(df):,} valid rows from "
-          f"{n_zips * n_months:,} total ({time.time() - t0:.1f}s)")
-    return df
+    print(f"[build_table] {len(table):,} valid rows from "
+          f"{n_zips * n_months:,} total ({time.time() - t0:.1f}s, "
+          f"peak RSS {peak_rss_mb():,.0f} MB)")
+    return table
 
 
 # ---------------------------------------------------------------------------
 # 4. TIME-BASED TRAIN / TEST SPLIT
 # ---------------------------------------------------------------------------
 
-def split_temporal(df: pd.DataFrame, cutoff: str = "2018-01-01"):
-    cutoff_dt = pd.Timestamp(cutoff)
-    train_mask = df["date"] < cutoff_dt
-    test_mask = df["date"] >= cutoff_dt
-
-    X_train = df.loc[train_mask, FEATURE_COLS].values
-    y_train = df.loc[train_mask, TARGET_COL].values
-    X_test = df.loc[test_mask, FEATURE_COLS].values
-    y_test = df.loc[test_mask, TARGET_COL].values
+def split_temporal(table: TrainingTable, dates: pd.DatetimeIndex,
+                   cutoff: str = "2018-01-01"):
+    """
+    Split at the first month on/after `cutoff`. Since the table is
+    month-ordered this is a single boundary slice; all outputs are views.
+    """
+    cutoff_month = int(dates.searchsorted(pd.Timestamp(cutoff), side="left"))
+    train = table.slice_months(stop_month=cutoff_month)
+    test = table.slice_months(start_month=cutoff_month)
 
-    print(f"[split_temporal] train: {X_train.shape[0]:,} rows (< {cutoff}) | "
-          f"test: {X_test.shape[0]:,} rows (>= {cutoff})")
-    return X_train, X_test, y_train, y_test, df.loc[test_mask].copy()
+    print(f"[split_temporal] train: {len(train):,} rows (< {cutoff}) | "
+          f"test: {len(test):,} rows (>= {cutoff})")
+    return train.X, test.X, train.y, test.y, test
 
 
 # ---------------------------------------------------------------------------
 # 5. MODEL TRAINING
 # ---------------------------------------------------------------------------
 
-def train_xgb(X_train: np.ndarray, y_train: np.ndarray) -> XGBRegressor:
+XGB_PARAMS = dict(
+    n_estimators=200,
+    max_depth=6,
+    learning_rate=0.08,
+    subsample=0.7,
+    colsample_bytree=0.8,
+    reg_alpha=0.1,
+    reg_lambda=1.0,
+    tree_method="hist",
+    random_state=42,
+    n_jobs=-1,
+)
+
+RF_PARAMS = dict(
+    n_estimators=100,
+    max_depth=10,
+    min_samples_leaf=30,
+    max_samples=0.3,
+    random_state=42,
+    n_jobs=-1,
+)
+
+# Lower/upper quantiles of the 12-month appreciation band
+QUANTILES = (0.1, 0.9)
+
+# Cap on training rows (keeps memory and fit time manageable)
+MAX_TRAIN = 500_000
+
+
+def subsample(X: np.ndarray, y: np.ndarray, max_rows: int = MAX_TRAIN,
+              seed: int = 42):
+    """Random subset of at most `max_rows` rows, kept in table order."""
+    if X.shape[0] <= max_rows:
+        return X, y
+    rng = np.random.RandomState(seed)
+    idx = np.sort(rng.choice(X.shape[0], max_rows, replace=False))
+    print(f"[subsample] training on {max_rows:,} / {X.shape[0]:,} rows")
+    return X[idx], y[idx]
+
+
+def train_xgb(X_train: np.ndarray, y_train: np.ndarray, **params) -> XGBRegressor:
+    """Fit XGBoost with XGB_PARAMS, overridden by any `params` given."""
     t0 = time.time()
-    model = XGBRegressor(
-        n_estimators=200,
-        max_depth=6,
-        learning_rate=0.08,
-        subsample=0.7,
-        colsample_bytree=0.8,
-        reg_alpha=0.1,
-        reg_lambda=1.0,
-        tree_method="hist",
-        random_state=42,
-        n_jobs=-1,
-    )
+    model = XGBRegressor(**{**XGB_PARAMS, **params})
     model.fit(X_train, y_train, verbose=False)
     print(f"[train_xgb] done ({time.time() - t0:.1f}s)")
     return model
 
 
-def train_rf(X_train: np.ndarray, y_train: np.ndarray) -> RandomForestRegressor:
+def train_rf(X_train: np.ndarray, y_train: np.ndarray,
+             **params) -> RandomForestRegressor:
+    """Fit a RandomForest with RF_PARAMS, overridden by any `params` given."""
     t0 = time.time()
-    model = RandomForestRegressor(
-        n_estimators=100,
-        max_depth=10,
-        min_samples_leaf=30,
-        max_samples=0.3,
-        random_state=42,
-        n_jobs=-1,
-    )
+    model = RandomForestRegressor(**{**RF_PARAMS, **params})
     model.fit(X_train, y_train)
     print(f"[train_rf] done ({time.time() - t0:.1f}s)")
     return model
 
 
+def train_quantile_xgb(X_train: np.ndarray, y_train: np.ndarray,
+                       quantiles=QUANTILES, **params) -> XGBRegressor:
+    """
+    Fit one multi-quantile XGBoost model (pinball loss) with XGB_PARAMS;
+    predict() returns one column per entry of `quantiles`.
+    """
+    t0 = time.time()
+    model = XGBRegressor(**{
+        **XGB_PARAMS,
+        "objective": "reg:quantileerror",
+        "quantile_alpha": np.asarray(quantiles),
+        **params,
+    })
+    model.fit(X_train, y_train, verbose=False)
+    print(f"[train_quantile_xgb] q={list(quantiles)} done ({time.time() - t0:.1f}s)")
+    return model
+
+
+def load_quantile_model():
+    """The saved quantile model, or None if the pipeline hasn't produced one."""
+    path = os.path.join(MODEL_DIR, "xgb_quantile_model.joblib")
+    return joblib.load(path) if os.path.exists(path) else None
+
+
 # ---------------------------------------------------------------------------
 # 6. EVALUATION
 # ---------------------------------------------------------------------------
@@ -225,6 +386,29 @@ def evaluate_model(model, X_test, y_test, name: str) -> dict:
     return {"mae": mae, "rmse": rmse, "r2": r2}
 
 
+def evaluate_quantiles(model, X_test, y_test, quantiles=QUANTILES) -> dict:
+    """Empirical coverage of the predicted band plus pinball loss per quantile."""
+    preds = model.predict(X_test).reshape(len(y_test), -1)
+    lo, hi = preds[:, 0], preds[:, -1]
+    coverage = float(np.mean((y_test >= lo) & (y_test <= hi)))
+    width = float(np.mean(hi - lo))
+    pinball = {}
+    for j, q in enumerate(quantiles):
+        diff = y_test - preds[:, j]
+        pinball[q] = float(np.mean(np.maximum(q * diff, (q - 1) * diff)))
+
+    print(f"\n{'=' * 50}")
+    print("  Quantile XGBoost — Test Set Evaluation")
+    print(f"{'=' * 50}")
+    print(f"  Coverage [{quantiles[0]:.0%}, {quantiles[-1]:.0%}] : {coverage:.3f} "
+          f"(target {quantiles[-1] - quantiles[0]:.2f})")
+    print(f"  Mean width : {width:.6f}")
+    for q, loss in pinball.items():
+        print(f"  Pinball q={q:<4}: {loss:.6f}")
+    return {"coverage": coverage, "width": width,
+            "pinball": {str(q): v for q, v in pinball.items()}}
+
+
 # ---------------------------------------------------------------------------
 # 7. FEATURE IMPORTANCE + SHAP
 # ---------------------------------------------------------------------------
@@ -261,30 +445,81 @@ def shap_analysis(model, X_test: np.ndarray, feature_names: list[str], name: str
         print(f"  {rank:>2}. {feature_names[i]:<22s}  {mean_abs_shap[i]:.6f}")
 
 
+def zip_shap_values(model, X: np.ndarray, chunk_size: int = SHAP_CHUNK_ROWS,
+                    workers: int = 1):
+    """
+    Exact TreeSHAP values for every row of X, computed in `chunk_size`
+    batches (spread over `workers` threads). XGBoost models use the
+    booster's native pred_contribs; other models need the shap package.
+
+    Returns (values (n_rows, n_features), base_value), or None if the model
+    can't be explained here.
+    """
+    if isinstance(model, XGBRegressor):
+        booster = model.get_booster()
+
+        def explain(chunk):
+            return booster.predict(DMatrix(chunk), pred_contribs=True)
+    else:
+        try:
+            import shap
+        except ImportError:
+            return None
+        explainer = shap.TreeExplainer(model)
+
+        def explain(chunk):
+            vals = explainer.shap_values(chunk)
+            base = np.full((chunk.shape[0], 1), explainer.expected_value)
+            return np.hstack([vals, base])
+
+    chunks = [X[i:i + chunk_size] for i in range(0, X.shape[0], chunk_size)]
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(explain, chunks))
+    else:
+        parts = [explain(c) for c in chunks]
+    contribs = np.concatenate(parts)  # last column is the bias term
+    return contribs[:, :-1], float(contribs[0, -1])
+
+
 # ---------------------------------------------------------------------------
 # 8. ZIP CODE RANKINGS
 # ---------------------------------------------------------------------------
 
+def latest_valid_month(features: np.ndarray, dates: pd.DatetimeIndex,
+                       min_zips: int = 100):
+    """Most recent month with more than `min_zips` complete feature rows."""
+    for t in range(len(dates) - 1, -1, -1):
+        valid = np.isfinite(features[:, t, :]).all(axis=1)
+        if valid.sum() > min_zips:
+            break
+    return t, valid
+
+
 def rank_zip_codes(model, meta: pd.DataFrame, features: np.ndarray,
-                   dates: pd.DatetimeIndex) -> pd.DataFrame:
+                   dates: pd.DatetimeIndex, quantile_model=None) -> pd.DataFrame:
     """
     Score every ZIP at the most recent month with valid features.
-    Returns ranked DataFrame.
+    Returns ranked DataFrame. With a quantile model, adds the P10/P90 band
+    (widened where needed so it always contains the point estimate).
     """
-    for t in range(len(dates) - 1, -1, -1):
-        feat_slice = features[:, t, :]  # (n_zips, 6)
-        valid = np.isfinite(feat_slice).all(axis=1)
-        if valid.sum() > 100:
-            break
+    t, valid = latest_valid_month(features, dates)
 
-    X_latest = feat_slice[valid]
+    X_latest = features[:, t, :][valid]
     preds = model.predict(X_latest)
 
     rankings = meta.loc[valid].copy()
     rankings["predicted_12m_appreciation"] = preds
+    columns = ["RegionName", "City", "StateName", "Metro",
+               "predicted_12m_appreciation"]
+    if quantile_model is not None:
+        band = np.sort(quantile_model.predict(X_latest).reshape(len(preds), -1), axis=1)
+        rankings["p10_12m_appreciation"] = np.minimum(band[:, 0], preds)
+        rankings["p90_12m_appreciation"] = np.maximum(band[:, -1], preds)
+        columns += ["p10_12m_appreciation", "p90_12m_appreciation"]
+
     rankings = (
-        rankings[["RegionName", "City", "StateName", "Metro",
-                  "predicted_12m_appreciation"]]
+        rankings[columns]
         .sort_values("predicted_12m_appreciation", ascending=False)
         .reset_index(drop=True)
     )
@@ -296,46 +531,469 @@ def rank_zip_codes(model, meta: pd.DataFrame, features: np.ndarray,
     return rankings
 
 
+def save_zip_shap(model, meta: pd.DataFrame, features: np.ndarray,
+                  dates: pd.DatetimeIndex, workers: int = 1) -> str | None:
+    """
+    Precompute SHAP values for the latest-month feature row of every ranked
+    ZIP and save them next to zip_rankings.csv as zip_shap.npz (float32),
+    for the /appreciation/{zip}/explain lookup.
+
+    `model` must be the one the rankings were scored with. If it can't be
+    explained, any earlier zip_shap.npz is removed rather than left to
+    describe a different model's predictions.
+    """
+    t0 = time.time()
+    t, valid = latest_valid_month(features, dates)
+    X = np.asarray(features[:, t, :][valid])
+
+    path = os.path.join(MODEL_DIR, "zip_shap.npz")
+    result = zip_shap_values(model, X, workers=workers)
+    if result is None:
+        if os.path.exists(path):
+            os.remove(path)
+        print(f"[zip_shap] shap not installed — cannot explain "
+              f"{type(model).__name__}; no per-ZIP explanations written")
+        return None
+    values, base_value = result
+
+    np.savez(
+        path,
+        region=meta.loc[valid, "RegionName"].astype(str).str.zfill(5).to_numpy("U5"),
+        shap=values.astype(np.float32),
+        features=X.astype(np.float32),
+        base_value=np.float32(base_value),
+        feature_cols=np.array(FEATURE_COLS),
+        as_of=np.array(dates[t].strftime("%Y-%m-%d")),
+    )
+    print(f"[zip_shap] {X.shape[0]:,} ZIPs explained ({time.time() - t0:.1f}s)")
+    print(f"[saved] {path}")
+    return path
+
+
 # ---------------------------------------------------------------------------
-# 9. MAIN ORCHESTRATION
+# 9. INCREMENTAL MONTHLY UPDATE  (feature store + warm-started XGBoost)
 # ---------------------------------------------------------------------------
 
-def main():
+def save_feature_store(store: FeatureStore, meta: pd.DataFrame,
+                       features: np.ndarray, target: np.ndarray,
+                       dates: pd.DatetimeIndex, model_name: str):
+    """
+    Seed the store from a full pipeline run. `model_name` is the model the
+    run ranked ZIPs with; incremental runs keep ranking with it.
+    """
+    t0 = time.time()
+    store.create(meta, FEATURE_COLS, features.dtype, model=model_name)
+    for j, date in enumerate(dates):
+        store.write_month(date, features[:, j])
+        if j < len(dates) - FORWARD_HORIZON:
+            store.write_target(date, target[:, j])
+    store.save_manifest()
+    print(f"[feature_store] wrote {len(dates)} months to {store.root} "
+          f"({time.time() - t0:.1f}s)")
+
+
+def update_feature_store(store: FeatureStore, filepath: str) -> pd.DatetimeIndex:
+    """
+    Append features for every month in `filepath` newer than the store, and
+    targets for the months whose 12-month forward window just closed.
+
+    Only the metadata and the trailing FEATURE_LOOKBACK months needed by the
+    new columns are parsed from the CSV, plus MAX_FILL_GAP + 1 months before
+    them: interpolating a gap only reads the observations either side of it,
+    so with that margin the window is gap-filled exactly as clean_prices
+    fills the whole matrix in a full run. Returns the newly labelled months.
+    """
+    t0 = time.time()
+    header = pd.read_csv(filepath, nrows=0).columns
+    date_cols = [c for c in header if c not in META_COLS]
+    dates = pd.to_datetime(date_cols)
+
+    first_new = int(dates.searchsorted(store.months[-1], side="right"))
+    if first_new == len(dates):
+        print(f"[feature_store] up to date through "
+              f"{store.months[-1].strftime('%Y-%m-%d')}")
+        return pd.DatetimeIndex([])
+
+    start = max(0, first_new - FEATURE_LOOKBACK)
+    clean_start = max(0, start - (MAX_FILL_GAP + 1))
+    window_cols = date_cols[clean_start:]
+    raw = pd.read_csv(filepath, usecols=META_COLS + window_cols, low_memory=False)
+    rows = store.align_zips(raw[META_COLS])
+
+    prices = np.full((store.n_zips, len(window_cols)), np.nan, dtype=store.dtype)
+    prices[rows] = raw[window_cols].apply(pd.to_numeric, errors="coerce").to_numpy(
+        dtype=store.dtype)
+    del raw
+    prices = clean_prices(prices).prices[:, start - clean_start:]
+    window_cols = window_cols[start - clean_start:]
+
+    features, target, _ = engineer_features(prices, dates[start:], dtype=store.dtype)
+    newly_labelled = _write_store_months(store, features, target, dates[start:],
+                                         first_new - start)
+
+    print(f"[feature_store] appended {len(window_cols) - (first_new - start)} "
+          f"month(s), labelled {len(newly_labelled)} "
+          f"({time.time() - t0:.1f}s)")
+    return newly_labelled
+
+
+def refresh_feature_store(store: FeatureStore, meta: pd.DataFrame,
+                          prices: np.ndarray, dates: pd.DatetimeIndex,
+                          first_month: int) -> pd.DatetimeIndex:
+    """
+    Recompute stored features from `first_month` on, and every target whose
+    forward window reaches it, after prices changed from that month (new
+    months appended or earlier months revised in the price store).
+
+    `prices` is the full, cleaned (n_zips, n_months) matrix; only the
+    trailing FEATURE_LOOKBACK months before `first_month` are used.
+    Returns the newly labelled months.
+    """
+    t0 = time.time()
+    start = max(0, first_month - FEATURE_LOOKBACK)
+    rows = store.align_zips(meta)
+    window = np.full((store.n_zips, len(dates) - start), np.nan, dtype=store.dtype)
+    window[rows] = prices[:, start:]
+
+    features, target, _ = engineer_features(window, dates[start:], dtype=store.dtype)
+    newly_labelled = _write_store_months(store, features, target, dates[start:],
+                                         first_month - start)
+
+    print(f"[feature_store] refreshed {len(dates) - first_month} month(s) from "
+          f"{dates[first_month].strftime('%Y-%m-%d')}, labelled "
+          f"{len(newly_labelled)} ({time.time() - t0:.1f}s)")
+    return newly_labelled
+
+
+def sync_feature_store(store: FeatureStore, prices_dir: str,
+                       first_changed: int | None = None) -> pd.DatetimeIndex:
+    """
+    Bring the feature store in line with a price store: from the month after
+    the feature store's last month, or from `first_changed` (a revision
+    reported by PriceStore.ingest) if that is earlier.
+    """
+    meta, prices, dates = PriceStore(prices_dir).read()
+    first = int(dates.searchsorted(store.months[-1], side="right"))
+    if first_changed is not None:
+        first = min(first, first_changed)
+    if first >= len(dates):
+        print(f"[feature_store] up to date through "
+              f"{store.months[-1].strftime('%Y-%m-%d')}")
+        return pd.DatetimeIndex([])
+    cleaned = clean_prices(prices, dtype=store.dtype).prices
+    return refresh_feature_store(store, meta, cleaned, dates, first)
+
+
+def _write_store_months(store: FeatureStore, features: np.ndarray,
+                        target: np.ndarray, dates: pd.DatetimeIndex,
+                        first: int) -> pd.DatetimeIndex:
+    """
+    Write features for dates[first:] and the targets that depend on them
+    (from FORWARD_HORIZON months earlier). Returns months labelled for the
+    first time.
+    """
+    labelled = set(store.labelled_months)
+    newly_labelled = []
+    for j in range(first, len(dates)):
+        store.write_month(dates[j], features[:, j])
+    for k in range(max(0, first - FORWARD_HORIZON), len(dates) - FORWARD_HORIZON):
+        store.write_target(dates[k], target[:, k])
+        if dates[k] not in labelled:
+            newly_labelled.append(dates[k])
+    store.save_manifest()
+    return pd.DatetimeIndex(newly_labelled)
+
+
+def warm_start_xgb(model: XGBRegressor, X: np.ndarray, y: np.ndarray,
+                   n_new_trees: int = WARM_START_TREES) -> XGBRegressor:
+    """Continue boosting `model` on (X, y), appending `n_new_trees` trees."""
+    t0 = time.time()
+    updated = XGBRegressor(**{**model.get_params(), "n_estimators": n_new_trees})
+    updated.fit(X, y, xgb_model=model.get_booster(), verbose=False)
+    print(f"[warm_start_xgb] +{n_new_trees} trees on {X.shape[0]:,} rows "
+          f"→ {updated.get_booster().num_boosted_rounds()} total "
+          f"({time.time() - t0:.1f}s)")
+    return updated
+
+
+def refit_rf(model: RandomForestRegressor, X: np.ndarray,
+             y: np.ndarray) -> RandomForestRegressor:
+    """Refit a RandomForest with `model`'s params on (X, y); forests can't be warm-started."""
+    t0 = time.time()
+    X, y = subsample(X, y)
+    updated = RandomForestRegressor(**model.get_params())
+    updated.fit(X, y)
+    print(f"[refit_rf] {X.shape[0]:,} rows ({time.time() - t0:.1f}s)")
+    return updated
+
+
+def record_ranking_model(name: str, store: FeatureStore | None = None):
+    """
+    Note in the feature store (if one exists) which model zip_rankings.csv
+    now comes from, so incremental runs keep updating that model.
+    """
+    store = store or FeatureStore(FEATURE_STORE_DIR)
+    if store.exists() and store.model != name:
+        store.model = name
+        print(f"[feature_store] rankings now served from {name}")
+
+
+def run_incremental(args: argparse.Namespace, store: FeatureStore,
+                    newly_labelled: pd.DatetimeIndex | None = None) -> bool:
+    """
+    Fold newly published months into the store, update the saved models on
+    the newly labelled rows and re-rank with the model the store records.
+    Returns False if a model to continue from is missing.
+
+    XGBoost (and the quantile model) are warm-started on the new rows. When
+    the rankings come from RandomForest, which can't be warm-started, it is
+    refit with its saved params on the store's labelled rows (subsampled to
+    MAX_TRAIN) — still skipping the CSV parse and feature engineering.
+
+    Pass `newly_labelled` when the store was already refreshed (e.g. by
+    ingest_zhvi.py) to skip reading `args.data`.
+    """
+    xgb_path = os.path.join(MODEL_DIR, "xgb_model.joblib")
+    quantile_path = os.path.join(MODEL_DIR, "xgb_quantile_model.joblib")
+    if store.model is None:
+        # Stores seeded before the ranking model was recorded
+        print("[incremental] no ranking model recorded in the store — using XGBoost")
+        store.model = "XGBoost"
+    ranking_path = os.path.join(MODEL_DIR, RANKING_MODEL_FILES[store.model])
+    if not (os.path.exists(xgb_path) and os.path.exists(ranking_path)):
+        return False
+
+    if newly_labelled is None and os.path.isdir(args.data):
+        newly_labelled = sync_feature_store(store, args.data)
+    elif newly_labelled is None:
+        newly_labelled = update_feature_store(store, args.data)
+    if len(newly_labelled):
+        features = store.read_features(newly_labelled)
+        target = store.read_target(newly_labelled)
+        valid = np.isfinite(features).all(axis=-1) & np.isfinite(target)
+        xgb_model = warm_start_xgb(joblib.load(xgb_path),
+                                   features[valid], target[valid])
+        joblib.dump(xgb_model, xgb_path)
+        print(f"[saved] {xgb_path}")
+
+        quantile_model = load_quantile_model()
+        if quantile_model is not None:
+            quantile_model = warm_start_xgb(quantile_model,
+                                            features[valid], target[valid])
+            joblib.dump(quantile_model, quantile_path)
+            print(f"[saved] {quantile_path}")
+
+        if store.model == "RandomForest":
+            labelled = store.labelled_months
+            table = build_table(store.meta, store.read_features(labelled),
+                                store.read_target(labelled), labelled)
+            ranking_model = refit_rf(joblib.load(ranking_path), table.X, table.y)
+            del table
+            joblib.dump(ranking_model, ranking_path)
+            print(f"[saved] {ranking_path}")
+        else:
+            ranking_model = xgb_model
+    else:
+        ranking_model = joblib.load(ranking_path)
+        quantile_model = load_quantile_model()
+
+    print(f"[incremental] ranking with {store.model}")
+    latest = store.months[-1:]
+    latest_features = store.read_features(latest)
+    rankings = rank_zip_codes(ranking_model, store.meta, latest_features, latest,
+                              quantile_model)
+    save_rankings(rankings)
+    save_zip_shap(ranking_model, store.meta, latest_features, latest,
+                  workers=args.shap_workers)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# 10. MAIN ORCHESTRATION
+# ---------------------------------------------------------------------------
+
+def _clean_stage(meta: pd.DataFrame, prices: np.ndarray, dtype) -> dict:
+    """Gap-fill the price matrix and write the per-ZIP coverage report."""
+    cleaned = clean_prices(prices, dtype=dtype)
+    coverage_path = os.path.join(MODEL_DIR, "zip_coverage.csv")
+    cleaned.summary(meta["RegionName"].astype(str).str.zfill(5)).to_csv(
+        coverage_path, index=False)
+    print(f"[clean_prices] filled {cleaned.n_filled.sum():,} months, rejected "
+          f"{cleaned.n_invalid.sum():,} values → {coverage_path}")
+    return vars(cleaned)
+
+
+def prepare_data(cache: StageCache, filepath: str, dtype,
+                 profiler: PipelineProfiler | None = None):
+    """
+    load_data → clean_prices → engineer_features → build_table, each served
+    from the stage cache when its inputs and code are unchanged. Keys chain
+    on the upstream stage's key, so nothing is rehashed but the source CSV.
+    """
+    profiler = profiler or PipelineProfiler(enabled=False)
+    dtype_name = np.dtype(dtype).name
+
+    with profiler.stage("load_data") as rec:
+        # A price store's manifest changes on every ingest, so it keys the data
+        source = (os.path.join(filepath, "manifest.json") if os.path.isdir(filepath)
+                  else filepath)
+        load_key = cache.key("load_data", hash_file(source), dtype_name,
+                             hash_code(load_data))
+        loaded = cache.run("load_data", load_key, lambda: dict(
+            zip(("meta", "prices", "dates"), load_data(filepath, dtype=dtype))))
+        meta, dates = loaded["meta"], loaded["dates"]
+        rec["rows"] = len(meta)
+
+    with profiler.stage("clean_prices", rows=len(meta) * len(dates)):
+        clean_key = cache.key("clean_prices", load_key,
+                              hash_code(clean_prices, CleanPrices))
+        cleaned = cache.run("clean_prices", clean_key, lambda: _clean_stage(
+            meta, loaded["prices"], dtype))
+        profiler.context["n_months_filled"] = int(np.sum(cleaned["n_filled"]))
+
+    with profiler.stage("engineer_features", rows=len(meta) * len(dates)):
+        feat_key = cache.key("engineer_features", clean_key, dtype_name,
+                             hash_code(engineer_features, _rolling_nanstd, _window_sums))
+        engineered = cache.run("engineer_features", feat_key, lambda: dict(
+            zip(("features", "target"),
+                engineer_features(cleaned["prices"], dates, dtype=dtype)[:2])))
+        features, target = engineered["features"], engineered["target"]
+
+    with profiler.stage("build_table", rows=len(meta) * len(dates)):
+        table_key = cache.key("build_table", feat_key,
+                              hash_code(build_table, TrainingTable))
+        table = TrainingTable(**cache.run("build_table", table_key, lambda: vars(
+            build_table(meta, features, target, dates))))
+
+    profiler.context.update(
+        n_zips=len(meta), n_months=len(dates), n_table_rows=len(table),
+        dtype=dtype_name, cache_hits=sorted(cache.hits),
+    )
+    return meta, features, target, dates, table
+
+
+def save_rankings(rankings: pd.DataFrame):
+    rankings_path = os.path.join(MODEL_DIR, "zip_rankings.csv")
+    rankings.to_csv(rankings_path)
+    print(f"[saved] {rankings_path}")
+
+    print(f"\n{'=' * 50}")
+    print("  Top 25 ZIPs by Predicted 12-Month Appreciation")
+    print(f"{'=' * 50}")
+    print(rankings.head(25).to_string())
+
+    print(f"\n{'=' * 50}")
+    print("  Bottom 10 ZIPs")
+    print(f"{'=' * 50}")
+    print(rankings.tail(10).to_string())
+
+
+PROFILED_STAGES = [
+    "load_data", "clean_prices", "engineer_features", "build_table", "split_temporal",
+    "train_xgb", "train_rf", "train_quantile", "evaluate_xgb", "evaluate_rf",
+    "evaluate_quantile",
+    "shap_analysis", "rank_zip_codes", "zip_shap", "incremental_update",
+]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--data", default=DATA_PATH, help="wide-format ZHVI CSV")
+    parser.add_argument(
+        "--float32", action="store_true",
+        help="hold prices, features and the training table in float32 "
+             "(halves memory; XGBoost trains in float32 regardless)",
+    )
+    parser.add_argument(
+        "--force-recompute", action="store_true",
+        help="ignore cached load/feature/table stages and recompute them",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="neither read nor write the stage cache",
+    )
+    parser.add_argument(
+        "--cprofile", choices=PROFILED_STAGES, metavar="STAGE",
+        help="also dump a cProfile .prof for one stage "
+             f"({', '.join(PROFILED_STAGES)})",
+    )
+    parser.add_argument(
+        "--shap-workers", type=int, default=1,
+        help="threads for per-ZIP SHAP batches (XGBoost is already multithreaded)",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="append only new months to the feature store and warm-start the "
+             "saved XGBoost model; falls back to (and seeds the store from) a "
+             "full run when no store or model exists yet. A RandomForest "
+             "ranking model is refit on the store's rows instead",
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true",
+        help="with --incremental, ignore the existing store and do a full run",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    dtype = np.float32 if args.float32 else np.float64
     t_start = time.time()
     os.makedirs(MODEL_DIR, exist_ok=True)
 
-    # --- load ---
-    meta, prices, dates = load_data(DATA_PATH)
-
-    # --- features ---
-    features, target, dates = engineer_features(prices, dates)
+    profiler = PipelineProfiler(cprofile_stage=args.cprofile, out_dir=PROFILE_DIR)
+    profiler.context.update(
+        data=os.path.abspath(args.data),
+        data_bytes=os.path.getsize(args.data),
+        argv=list(argv) if argv is not None else None,
+    )
 
-    # --- flatten to table ---
-    df = build_table(meta, features, target, dates)
+    store = FeatureStore(FEATURE_STORE_DIR)
+    if args.incremental and not args.rebuild and store.exists():
+        with profiler.stage("incremental_update"):
+            done = run_incremental(args, store)
+        if done:
+            profiler.write()
+            print(f"\n✓ Incremental update complete in {time.time() - t_start:.1f}s "
+                  f"(peak RSS {peak_rss_mb():,.0f} MB)")
+            return
+        print("[incremental] no saved model to warm-start — running full pipeline")
+
+    # --- load → features → flatten to table (cached) ---
+    cache = StageCache(CACHE_DIR, force=args.force_recompute,
+                       enabled=not args.no_cache)
+    meta, features, target, dates, table = prepare_data(cache, args.data, dtype,
+                                                        profiler)
 
     # --- split ---
-    X_train, X_test, y_train, y_test, test_df = split_temporal(df)
+    with profiler.stage("split_temporal", rows=len(table)):
+        X_train, X_test, y_train, y_test, test_table = split_temporal(table, dates)
 
     # --- subsample training data if huge (keeps memory manageable) ---
-    MAX_TRAIN = 500_000
-    if X_train.shape[0] > MAX_TRAIN:
-        rng = np.random.RandomState(42)
-        idx = rng.choice(X_train.shape[0], MAX_TRAIN, replace=False)
-        X_train_s, y_train_s = X_train[idx], y_train[idx]
-        print(f"[subsample] training on {MAX_TRAIN:,} / {X_train.shape[0]:,} rows")
-    else:
-        X_train_s, y_train_s = X_train, y_train
+    X_train_s, y_train_s = subsample(X_train, y_train)
 
     # --- train ---
     print("\nTraining XGBoost …")
-    xgb_model = train_xgb(X_train_s, y_train_s)
+    with profiler.stage("train_xgb", rows=X_train_s.shape[0]):
+        xgb_model = train_xgb(X_train_s, y_train_s)
 
     print("Training RandomForest …")
-    rf_model = train_rf(X_train_s, y_train_s)
+    with profiler.stage("train_rf", rows=X_train_s.shape[0]):
+        rf_model = train_rf(X_train_s, y_train_s)
+
+    print("Training quantile XGBoost …")
+    with profiler.stage("train_quantile", rows=X_train_s.shape[0]):
+        quantile_model = train_quantile_xgb(X_train_s, y_train_s)
 
     # --- evaluate ---
-    xgb_metrics = evaluate_model(xgb_model, X_test, y_test, "XGBoost")
-    rf_metrics = evaluate_model(rf_model, X_test, y_test, "RandomForest")
+    with profiler.stage("evaluate_xgb", rows=X_test.shape[0]):
+        xgb_metrics = evaluate_model(xgb_model, X_test, y_test, "XGBoost")
+    with profiler.stage("evaluate_rf", rows=X_test.shape[0]):
+        rf_metrics = evaluate_model(rf_model, X_test, y_test, "RandomForest")
+    with profiler.stage("evaluate_quantile", rows=X_test.shape[0]):
+        quantile_metrics = evaluate_quantiles(quantile_model, X_test, y_test)
+    profiler.context["metrics"] = {"XGBoost": xgb_metrics, "RandomForest": rf_metrics,
+                                   "QuantileXGBoost": quantile_metrics}
 
     # --- pick best ---
     best_name, best_model = (
@@ -347,33 +1005,43 @@ def main():
     # --- feature importance ---
     show_feature_importance(xgb_model, FEATURE_COLS, "XGBoost")
     show_feature_importance(rf_model, FEATURE_COLS, "RandomForest")
-    shap_analysis(xgb_model, X_test, FEATURE_COLS, "XGBoost")
+    with profiler.stage("shap_analysis", rows=min(500, X_test.shape[0])):
+        shap_analysis(xgb_model, X_test, FEATURE_COLS, "XGBoost")
 
     # --- save models ---
     xgb_path = os.path.join(MODEL_DIR, "xgb_model.joblib")
     rf_path = os.path.join(MODEL_DIR, "rf_model.joblib")
+    quantile_path = os.path.join(MODEL_DIR, "xgb_quantile_model.joblib")
     joblib.dump(xgb_model, xgb_path)
     joblib.dump(rf_model, rf_path)
+    joblib.dump(quantile_model, quantile_path)
     print(f"\n[saved] {xgb_path}")
     print(f"[saved] {rf_path}")
+    print(f"[saved] {quantile_path}")
 
-    # --- ZIP rankings (using best model) ---
-    rankings = rank_zip_codes(best_model, meta, features, dates)
-    rankings_path = os.path.join(MODEL_DIR, "zip_rankings.csv")
-    rankings.to_csv(rankings_path)
-    print(f"[saved] {rankings_path}")
+    # --- ZIP rankings (using best model, P10/P90 from the quantile model) ---
+    with profiler.stage("rank_zip_codes", rows=len(meta)):
+        rankings = rank_zip_codes(best_model, meta, features, dates, quantile_model)
+    save_rankings(rankings)
 
-    print(f"\n{'=' * 50}")
-    print("  Top 25 ZIPs by Predicted 12-Month Appreciation")
-    print(f"{'=' * 50}")
-    print(rankings.head(25).to_string())
+    # --- per-ZIP SHAP explanations of the ranking model ---
+    with profiler.stage("zip_shap", rows=len(rankings)):
+        save_zip_shap(best_model, meta, features, dates, workers=args.shap_workers)
+
+    # --- seed the feature store for later incremental runs ---
+    if args.incremental:
+        save_feature_store(store, meta, features, target, dates, best_name)
+    else:
+        record_ranking_model(best_name, store)
 
     print(f"\n{'=' * 50}")
-    print("  Bottom 10 ZIPs")
+    print("  Stage profile")
     print(f"{'=' * 50}")
-    print(rankings.tail(10).to_string())
+    print(profiler.summary())
+    profiler.write()
 
-    print(f"\n✓ Pipeline complete in {time.time() - t_start:.1f}s")
+    print(f"\n✓ Pipeline complete in {time.time() - t_start:.1f}s "
+          f"(peak RSS {peak_rss_mb():,.0f} MB)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+"""
+One-time validation and gap-filling of the wide ZHVI price matrix.
+
+Shared by the training pipeline (trainedmodel.prepare_data) and the API
+(app.services.zhvi_loader), so both see exactly the same prices:
+
+  * non-numeric, non-finite and non-positive values become missing;
+  * interior gaps of up to MAX_FILL_GAP months are filled by log-linear
+    interpolation between the neighbouring observations; longer gaps stay
+    NaN ("masked");
+  * per-ZIP offsets are recorded so a ZIP's usable history is the single
+    NaN-free slice ``prices[i, start[i]:last_valid[i] + 1]``.
+
+Everything is vectorized over all ZIPs; nothing loops per row.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Longest interior run of missing months that is interpolated
+MAX_FILL_GAP = 6
+
+
+@dataclass
+class CleanPrices:
+    prices: np.ndarray       # (n_zips, n_months) gap-filled, NaN where masked
+    first_valid: np.ndarray  # (n_zips,) first observed month, -1 if none
+    last_valid: np.ndarray   # (n_zips,) last observed month, -1 if none
+    start: np.ndarray        # (n_zips,) first month of the final NaN-free run
+    n_observed: np.ndarray   # (n_zips,) months with a raw observation
+    n_filled: np.ndarray     # (n_zips,) months filled by interpolation
+    n_invalid: np.ndarray    # (n_zips,) raw values rejected (≤ 0 / non-finite)
+
+    @property
+    def coverage(self) -> np.ndarray:
+        """Observed share of each ZIP's [first_valid, last_valid] span."""
+        span = np.where(self.last_valid >= 0, self.last_valid - self.first_valid + 1, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(span > 0, self.n_observed / span, 0.0)
+
+    def summary(self, zips) -> pd.DataFrame:
+        return pd.DataFrame({
+            "RegionName": zips,
+            "first_valid": self.first_valid,
+            "last_valid": self.last_valid,
+            "start": self.start,
+            "n_observed": self.n_observed,
+            "n_filled": self.n_filled,
+            "n_invalid": self.n_invalid,
+            "coverage": self.coverage.round(4),
+        })
+
+
+def clean_prices(prices: np.ndarray, max_gap: int = MAX_FILL_GAP,
+                 dtype=None) -> CleanPrices:
+    """Validate and gap-fill a wide (n_zips, n_months) price matrix."""
+    dtype = dtype or prices.dtype
+    raw = np.asarray(prices, dtype=np.float64)
+    n_zips, n_months = raw.shape
+    cols = np.arange(n_months, dtype=np.int32)
+
+    with np.errstate(invalid="ignore"):
+        invalid = ~np.isnan(raw) & ~(np.isfinite(raw) & (raw > 0))
+    observed = np.isfinite(raw) & ~invalid
+    n_observed = observed.sum(axis=1)
+
+    # Index of the previous / next observation for every cell (-1 / n_months if none)
+    prev = np.maximum.accumulate(np.where(observed, cols, -1), axis=1)
+    nxt = np.minimum.accumulate(
+        np.where(observed, cols, n_months)[:, ::-1], axis=1)[:, ::-1]
+
+    gap = nxt - prev - 1
+    fill = ~observed & (prev >= 0) & (nxt < n_months) & (gap <= max_gap)
+
+    out = np.where(observed, raw, np.nan)
+    if fill.any():
+        r, c = np.nonzero(fill)
+        p, q = prev[r, c], nxt[r, c]
+        lo, hi = np.log(raw[r, p]), np.log(raw[r, q])
+        out[r, c] = np.exp(lo + (c - p) / (q - p) * (hi - lo))
+
+    has_any = n_observed > 0
+    first_valid = np.where(has_any, observed.argmax(axis=1), -1)
+    last_valid = np.where(has_any, n_months - 1 - observed[:, ::-1].argmax(axis=1), -1)
+
+    # Final NaN-free run ends at last_valid and starts after the last masked month
+    masked_before_last = np.isnan(out) & (cols < last_valid[:, None])
+    start = np.where(has_any,
+                     np.where(masked_before_last, cols, -1).max(axis=1) + 1, 0)
+
+    return CleanPrices(
+        prices=out.astype(dtype, copy=False),
+        first_valid=first_valid.astype(np.int32),
+        last_valid=last_valid.astype(np.int32),
+        start=start.astype(np.int32),
+        n_observed=n_observed.astype(np.int32),
+        n_filled=fill.sum(axis=1).astype(np.int32),
+        n_invalid=invalid.sum(axis=1).astype(np.int32),
+    )
@@ -0,0 +1,53 @@
+"""
+Shared fixtures: a throwaway local HTTP server for stubbing upstream APIs.
+
+Tests that talk to Zillow or the chat model never leave the machine; they
+point the client at ``stub_server(Handler)`` instead, using the same
+ZILLOW_BASE_URL / HF_BASE_URL hooks that deployments use.
+"""
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# app.deps.db builds its engine at import; keep it off any real database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def send_body(self, status: int, body: bytes, headers: dict | None = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def stub_server():
+    """Start `handler` on a free local port; returns its base URL."""
+    servers = []
+
+    def start(handler: type[BaseHTTPRequestHandler]) -> str:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
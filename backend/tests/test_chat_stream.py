@@ -0,0 +1,129 @@
+"""/chat/stream SSE events, against a local OpenAI-compatible fake of the chat model."""
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from huggingface_hub import InferenceClient
+
+from app.deps.db import get_db
+from app.routers import chat as chat_router
+from app.services import chatbot
+from app.services.hedge import Hedger
+from tests.conftest import StubHandler
+
+WORDS = ["Hello", " there,", " buyer", "."]
+
+
+def fake_model(words: list[str], error: str | None = None, status: int = 200):
+    """
+    Handler streaming `words` as chat.completion chunks. With `error`, the
+    stream breaks after the first word; with a non-200 `status`, the request
+    fails before any token.
+    """
+
+    class Handler(StubHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            if status != 200:
+                self.send_body(status, b'{"error": "unavailable"}',
+                               {"Content-Type": "application/json"})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for i, word in enumerate(words):
+                if error is not None and i == 1:
+                    self.wfile.write(b"data: " + json.dumps({"error": error}).encode() + b"\n\n")
+                    return
+                chunk = {
+                    "id": "x", "object": "chat.completion.chunk", "created": 0, "model": "m",
+                    "choices": [{"index": 0, "delta": {"role": "assistant", "content": word},
+                                 "finish_reason": None}],
+                }
+                self.wfile.write(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+
+    return Handler
+
+
+def parse_sse(text: str) -> list[tuple[str | None, dict]]:
+    events = []
+    for block in text.strip().split("\n\n"):
+        event, data = None, None
+        for line in block.splitlines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+        events.append((event, data))
+    return events
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app = FastAPI()
+    app.include_router(chat_router.router)
+    app.dependency_overrides[get_db] = lambda: None
+    monkeypatch.setattr(chatbot, "chat_hedger", Hedger(deadline=5))
+    return TestClient(app)
+
+
+@pytest.fixture
+def model(stub_server, monkeypatch):
+    def start(handler):
+        monkeypatch.setattr(chatbot, "_client", InferenceClient(base_url=stub_server(handler)))
+
+    return start
+
+
+def stream(client: TestClient) -> tuple[str, list[tuple[str | None, dict]]]:
+    response = client.post("/chat/stream",
+                           json={"messages": [{"role": "user", "content": "Is now a good time?"}]})
+    assert response.status_code == 200
+    return response.headers["content-type"], parse_sse(response.text)
+
+
+def test_deltas_then_done(client, model):
+    model(fake_model(WORDS))
+
+    content_type, events = stream(client)
+
+    assert content_type.startswith("text/event-stream")
+    assert events[:-1] == [(None, {"delta": w}) for w in WORDS]
+    assert events[-1] == ("done", {"reply": "".join(WORDS)})
+
+
+def test_error_mid_stream(client, model):
+    model(fake_model(WORDS, error="model overloaded"))
+
+    _, events = stream(client)
+
+    assert events[0] == (None, {"delta": WORDS[0]})
+    assert events[-1][0] == "error"
+    assert "model overloaded" in events[-1][1]["detail"]
+    assert all(event != "done" for event, _ in events)
+
+
+def test_failure_before_first_token_streams_fallback(client, model):
+    model(fake_model(WORDS, status=500))
+
+    _, events = stream(client)
+
+    fallback = chatbot.fallback_reply()
+    assert events == [(None, {"delta": fallback}), ("done", {"reply": fallback})]
+    assert chatbot.chat_hedger.stats.fallbacks == 1
+
+
+def test_session_fallback_reply_is_not_recorded(client, model):
+    model(fake_model(WORDS, status=500))
+    session_id = client.post("/chat/sessions", json={}).json()["session_id"]
+
+    response = client.post(f"/chat/sessions/{session_id}/messages/stream",
+                           json={"message": "Is now a good time?"})
+
+    assert parse_sse(response.text)[-1] == ("done", {"reply": chatbot.fallback_reply()})
+    messages = client.get(f"/chat/sessions/{session_id}").json()["messages"]
+    assert messages == [{"role": "user", "content": "Is now a good time?"}]
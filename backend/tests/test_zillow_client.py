@@ -0,0 +1,96 @@
+"""Zillow client retries, against a local stub of the RapidAPI search endpoint."""
+import json
+import time
+
+import pytest
+
+from app.services import zillow_client
+from app.services.zillow_client import ZillowError, build_client, fetch_search, set_client
+from tests.conftest import StubHandler
+
+pytestmark = pytest.mark.anyio
+
+RESULTS = {"searchResults": [{"property": {"zpid": 1}}, {"property": {"zpid": 2}}, {"other": 1}]}
+
+
+def scripted(responses: list[tuple[int, dict, bytes]]):
+    """Handler class that answers successive GETs from `responses` and logs them."""
+    log = []
+
+    class Handler(StubHandler):
+        def do_GET(self):
+            log.append((time.monotonic(), self.path))
+            status, headers, body = responses[min(len(log), len(responses)) - 1]
+            self.send_body(status, body, headers)
+
+    return Handler, log
+
+
+OK = (200, {"Content-Type": "application/json"}, json.dumps(RESULTS).encode())
+
+
+@pytest.fixture
+async def zillow(stub_server, monkeypatch):
+    """Point the shared client at a stub answering with the given script."""
+    monkeypatch.setattr(zillow_client, "ZILLOW_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(zillow_client, "ZILLOW_MAX_RETRIES", 3)
+
+    def start(responses):
+        handler, log = scripted(responses)
+        set_client(build_client(base_url=stub_server(handler)))
+        return log
+
+    yield start
+    await zillow_client.close_client()
+
+
+async def test_retries_429_after_retry_after(zillow):
+    log = zillow([(429, {"Retry-After": "0.3"}, b"slow down"), OK])
+
+    properties = await fetch_search("Irvine, CA", "FOR_SALE", 1)
+
+    assert [p["zpid"] for p in properties] == [1, 2]
+    assert len(log) == 2
+    assert log[1][0] - log[0][0] >= 0.3
+    assert "location=Irvine" in log[0][1] and "page=1" in log[0][1]
+
+
+async def test_retries_5xx_with_backoff(zillow):
+    log = zillow([(500, {}, b"oops"), (503, {}, b"down"), (502, {}, b"bad gateway"), OK])
+
+    properties = await fetch_search("Irvine, CA", "FOR_SALE", 1)
+
+    assert len(properties) == 2
+    assert len(log) == 4
+
+
+async def test_gives_up_after_max_retries(zillow):
+    log = zillow([(503, {"Retry-After": "0"}, b"still down")])
+
+    with pytest.raises(ZillowError) as exc:
+        await fetch_search("Irvine, CA", "FOR_SALE", 1)
+
+    assert exc.value.status_code == 503
+    assert exc.value.detail == "still down"
+    assert len(log) == zillow_client.ZILLOW_MAX_RETRIES + 1
+
+
+async def test_client_errors_are_not_retried(zillow):
+    log = zillow([(400, {}, b"bad request"), OK])
+
+    with pytest.raises(ZillowError) as exc:
+        await fetch_search("Irvine, CA", "FOR_SALE", 1)
+
+    assert exc.value.status_code == 400
+    assert len(log) == 1
+
+
+async def test_retry_after_is_capped(zillow, monkeypatch):
+    monkeypatch.setattr(zillow_client, "MAX_BACKOFF_SECONDS", 0.05)
+    log = zillow([(429, {"Retry-After": "120"}, b"slow down"), OK])
+
+    start = time.monotonic()
+    await fetch_search("Irvine, CA", "FOR_SALE", 1)
+
+    assert len(log) == 2
+    assert time.monotonic() - start < 5